@@ -0,0 +1,157 @@
+"""recipients index
+
+Revision ID: 65e326c4d8bb
+Revises: 005e7e62e48c
+Create Date: 2026-10-19 15:36:40.452685
+
+"""
+from datetime import timezone
+from email.utils import getaddresses
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '65e326c4d8bb'
+down_revision: Union[str, Sequence[str], None] = '005e7e62e48c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+
+
+def _email_table(name):
+    return sa.table(
+        name,
+        sa.column('id', sa.Integer),
+        sa.column('to', sa.String),
+        sa.column('sent_at', sa.DateTime(timezone=True)),
+        sa.column('send_count', sa.Integer),
+        sa.column('responded', sa.Boolean),
+        sa.column('responded_at', sa.DateTime(timezone=True)),
+    )
+
+
+emails = _email_table('emails')
+archived_emails = _email_table('archived_emails')
+recipients = sa.table(
+    'recipients',
+    sa.column('id', sa.Integer),
+    sa.column('address', sa.String),
+    sa.column('domain', sa.String),
+    sa.column('name', sa.String),
+    sa.column('sent_count', sa.Integer),
+    sa.column('replied_count', sa.Integer),
+    sa.column('response_seconds_total', sa.BigInteger),
+    sa.column('first_sent_at', sa.DateTime(timezone=True)),
+    sa.column('last_sent_at', sa.DateTime(timezone=True)),
+    sa.column('last_replied_at', sa.DateTime(timezone=True)),
+)
+email_recipients = sa.table('email_recipients', sa.column('email_id', sa.Integer), sa.column('recipient_id', sa.Integer))
+
+
+def _addresses(to):
+    """(address, domain, name) per recipient; same rules as recipient_service.parse_recipients."""
+    seen = {}
+    for name, addr in getaddresses([to or '']):
+        address = addr.strip().lower()
+        local, _, domain = address.rpartition('@')
+        if local and domain and address not in seen:
+            seen[address] = (address[:320], domain[:255], name.strip()[:255] or None)
+    return list(seen.values())
+
+
+def _utc(value):
+    if value is None:
+        return None
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def _batches(conn, table):
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(table).where(table.c.id > last_id).order_by(table.c.id).limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1].id
+
+
+def _backfill(conn) -> None:
+    """Build recipients and their counters from emails and archived_emails, then the links."""
+    stats = {}
+    for table in (emails, archived_emails):
+        for rows in _batches(conn, table):
+            for r in rows:
+                sent_at = _utc(r.sent_at)
+                for address, domain, name in _addresses(r.to):
+                    s = stats.setdefault(address, {
+                        'address': address, 'domain': domain, 'name': None,
+                        'sent_count': 0, 'replied_count': 0, 'response_seconds_total': 0,
+                        'first_sent_at': sent_at, 'last_sent_at': sent_at, 'last_replied_at': None,
+                    })
+                    s['name'] = name or s['name']
+                    s['sent_count'] += r.send_count or 1
+                    s['first_sent_at'] = min(s['first_sent_at'], sent_at)
+                    s['last_sent_at'] = max(s['last_sent_at'], sent_at)
+                    if r.responded:
+                        s['replied_count'] += 1
+                        responded_at = _utc(r.responded_at)
+                        if responded_at is not None:
+                            s['response_seconds_total'] += max(0, int((responded_at - sent_at).total_seconds()))
+                            s['last_replied_at'] = max(s['last_replied_at'] or responded_at, responded_at)
+
+    rows = list(stats.values())
+    for start in range(0, len(rows), BATCH_SIZE):
+        conn.execute(recipients.insert(), rows[start:start + BATCH_SIZE])
+    ids = dict(conn.execute(sa.select(recipients.c.address, recipients.c.id)).all())
+
+    for table in (emails, archived_emails):
+        for rows in _batches(conn, table):
+            links = [{'email_id': r.id, 'recipient_id': ids[a[0]]} for r in rows for a in _addresses(r.to)]
+            if links:
+                conn.execute(email_recipients.insert(), links)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.create_table('recipients',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('address', sa.String(length=320), nullable=False),
+    sa.Column('domain', sa.String(length=255), nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=True),
+    sa.Column('sent_count', sa.Integer(), nullable=False),
+    sa.Column('replied_count', sa.Integer(), nullable=False),
+    sa.Column('response_seconds_total', sa.BigInteger(), nullable=False),
+    sa.Column('first_sent_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('last_sent_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('last_replied_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('address')
+    )
+    op.create_index(op.f('ix_recipients_domain'), 'recipients', ['domain'], unique=False)
+    op.create_table('email_recipients',
+    sa.Column('email_id', sa.Integer(), nullable=False),
+    sa.Column('recipient_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['recipient_id'], ['recipients.id'], ),
+    sa.PrimaryKeyConstraint('email_id', 'recipient_id')
+    )
+    op.create_index('ix_email_recipients_recipient_email', 'email_recipients', ['recipient_id', 'email_id'], unique=False)
+    # ### end Alembic commands ###
+    _backfill(op.get_bind())
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.drop_index('ix_email_recipients_recipient_email', table_name='email_recipients')
+    op.drop_table('email_recipients')
+    op.drop_index(op.f('ix_recipients_domain'), table_name='recipients')
+    op.drop_table('recipients')
+    # ### end Alembic commands ###
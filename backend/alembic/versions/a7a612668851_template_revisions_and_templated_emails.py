@@ -0,0 +1,132 @@
+"""template revisions and templated emails
+
+Revision ID: a7a612668851
+Revises: e40cfd184cd1
+Create Date: 2026-10-19 15:15:20.786157
+
+"""
+import json
+import re
+import zlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7a612668851'
+down_revision: Union[str, Sequence[str], None] = 'e40cfd184cd1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+PLACEHOLDER_RE = re.compile(r"\{\{\s*([a-zA-Z0-9_]+)\s*\}\}")
+
+emails = sa.table(
+    'emails',
+    sa.column('id', sa.Integer),
+    sa.column('template_id', sa.Integer),
+    sa.column('template_version', sa.Integer),
+    sa.column('template_values', sa.Text),
+)
+template_revisions = sa.table(
+    'template_revisions',
+    sa.column('template_id', sa.Integer),
+    sa.column('version', sa.Integer),
+    sa.column('body_text_template', sa.Text),
+    sa.column('body_html_template', sa.Text),
+)
+email_bodies = sa.table(
+    'email_bodies',
+    sa.column('email_id', sa.Integer),
+    sa.column('encoding', sa.String),
+    sa.column('text_data', sa.LargeBinary),
+    sa.column('html_data', sa.LargeBinary),
+)
+
+
+def _render_compressed(text, values):
+    if text is None:
+        return None
+    rendered = PLACEHOLDER_RE.sub(lambda m: values.get(m.group(1), m.group(0)), text)
+    return zlib.compress(rendered.encode('utf-8'), 6)
+
+
+def _materialize_templated_bodies(conn) -> None:
+    """Render templated emails into email_bodies before the references are dropped."""
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(
+                emails.c.id,
+                emails.c.template_values,
+                template_revisions.c.body_text_template,
+                template_revisions.c.body_html_template,
+            )
+            .select_from(
+                emails.join(
+                    template_revisions,
+                    sa.and_(
+                        template_revisions.c.template_id == emails.c.template_id,
+                        template_revisions.c.version == emails.c.template_version,
+                    ),
+                )
+            )
+            .where(emails.c.id > last_id)
+            .order_by(emails.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            return
+        values = []
+        for r in rows:
+            placeholders = json.loads(r.template_values) if r.template_values else {}
+            values.append(
+                {
+                    'email_id': r.id,
+                    'encoding': 'zlib',
+                    'text_data': _render_compressed(r.body_text_template, placeholders),
+                    'html_data': _render_compressed(r.body_html_template, placeholders),
+                }
+            )
+        conn.execute(email_bodies.insert(), values)
+        last_id = rows[-1].id
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.create_table('template_revisions',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('template_id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('subject_template', sa.Text(), nullable=True),
+    sa.Column('body_text_template', sa.Text(), nullable=True),
+    sa.Column('body_html_template', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('template_id', 'version')
+    )
+    op.add_column('emails', sa.Column('template_id', sa.Integer(), nullable=True))
+    op.add_column('emails', sa.Column('template_version', sa.Integer(), nullable=True))
+    op.add_column('emails', sa.Column('template_values', sa.Text(), nullable=True))
+    op.create_index(op.f('ix_emails_template_id'), 'emails', ['template_id'], unique=False)
+    if op.get_bind().dialect.name == 'sqlite':
+        # SQLite reuses the highest deleted rowid unless the table is AUTOINCREMENT
+        with op.batch_alter_table('templates', recreate='always', table_kwargs={'sqlite_autoincrement': True}):
+            pass
+    # ### end Alembic commands ###
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # ### commands auto generated by Alembic - please adjust! ###
+    _materialize_templated_bodies(op.get_bind())
+    op.drop_index(op.f('ix_emails_template_id'), table_name='emails')
+    with op.batch_alter_table('emails') as batch_op:
+        batch_op.drop_column('template_values')
+        batch_op.drop_column('template_version')
+        batch_op.drop_column('template_id')
+    op.drop_table('template_revisions')
+    # ### end Alembic commands ###
@@ -0,0 +1,114 @@
+"""move email bodies to compressed email_bodies
+
+Revision ID: e40cfd184cd1
+Revises: 3a487d45383a
+Create Date: 2026-10-19 15:11:58.031313
+
+"""
+import zlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e40cfd184cd1'
+down_revision: Union[str, Sequence[str], None] = '3a487d45383a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+emails = sa.table(
+    'emails',
+    sa.column('id', sa.Integer),
+    sa.column('body_text', sa.Text),
+    sa.column('body_html', sa.Text),
+)
+email_bodies = sa.table(
+    'email_bodies',
+    sa.column('email_id', sa.Integer),
+    sa.column('encoding', sa.String),
+    sa.column('text_data', sa.LargeBinary),
+    sa.column('html_data', sa.LargeBinary),
+)
+
+
+def _compress(value):
+    return zlib.compress(value.encode('utf-8'), 6) if value is not None else None
+
+
+def _decompress(data):
+    return zlib.decompress(data).decode('utf-8') if data is not None else None
+
+
+def _copy_bodies_out(conn) -> None:
+    """Compress emails.body_* into email_bodies, keyset-paginated by id."""
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(emails.c.id, emails.c.body_text, emails.c.body_html)
+            .where(emails.c.id > last_id)
+            .order_by(emails.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            return
+        values = [
+            {'email_id': r.id, 'encoding': 'zlib', 'text_data': _compress(r.body_text), 'html_data': _compress(r.body_html)}
+            for r in rows
+            if r.body_text is not None or r.body_html is not None
+        ]
+        if values:
+            conn.execute(email_bodies.insert(), values)
+        last_id = rows[-1].id
+
+
+def _copy_bodies_back(conn) -> None:
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(email_bodies.c.email_id, email_bodies.c.text_data, email_bodies.c.html_data)
+            .where(email_bodies.c.email_id > last_id)
+            .order_by(email_bodies.c.email_id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            return
+        conn.execute(
+            emails.update().where(emails.c.id == sa.bindparam('b_id')),
+            [
+                {'b_id': r.email_id, 'body_text': _decompress(r.text_data), 'body_html': _decompress(r.html_data)}
+                for r in rows
+            ],
+        )
+        last_id = rows[-1].email_id
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.create_table('email_bodies',
+    sa.Column('email_id', sa.Integer(), nullable=False),
+    sa.Column('encoding', sa.String(length=16), nullable=False),
+    sa.Column('text_data', sa.LargeBinary(), nullable=True),
+    sa.Column('html_data', sa.LargeBinary(), nullable=True),
+    sa.ForeignKeyConstraint(['email_id'], ['emails.id'], ),
+    sa.PrimaryKeyConstraint('email_id')
+    )
+    _copy_bodies_out(op.get_bind())
+    with op.batch_alter_table('emails') as batch_op:
+        batch_op.drop_column('body_html')
+        batch_op.drop_column('body_text')
+    # ### end Alembic commands ###
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.add_column('emails', sa.Column('body_text', sa.TEXT(), nullable=True))
+    op.add_column('emails', sa.Column('body_html', sa.TEXT(), nullable=True))
+    _copy_bodies_back(op.get_bind())
+    op.drop_table('email_bodies')
+    # ### end Alembic commands ###
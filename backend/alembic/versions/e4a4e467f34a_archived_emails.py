@@ -0,0 +1,128 @@
+"""archived emails
+
+Revision ID: e4a4e467f34a
+Revises: a7a612668851
+Create Date: 2026-10-19 15:18:47.152041
+
+"""
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a4e467f34a'
+down_revision: Union[str, Sequence[str], None] = 'a7a612668851'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+EMAIL_COLUMNS = (
+    'id', 'gmail_message_id', 'gmail_thread_id', 'account_id', 'to', 'subject', 'sent_at',
+    'send_count', 'responded', 'responded_at', 'responded_source',
+    'template_id', 'template_version', 'template_values',
+)
+
+archived_emails = sa.table(
+    'archived_emails',
+    *(sa.column(c) for c in EMAIL_COLUMNS),
+    sa.column('body_encoding', sa.String),
+    sa.column('body_text_data', sa.LargeBinary),
+    sa.column('body_html_data', sa.LargeBinary),
+    sa.column('attachments', sa.Text),
+)
+emails = sa.table('emails', *(sa.column(c) for c in EMAIL_COLUMNS))
+email_bodies = sa.table(
+    'email_bodies',
+    sa.column('email_id', sa.Integer),
+    sa.column('encoding', sa.String),
+    sa.column('text_data', sa.LargeBinary),
+    sa.column('html_data', sa.LargeBinary),
+)
+email_attachments = sa.table(
+    'email_attachments',
+    sa.column('email_id', sa.Integer),
+    sa.column('filename', sa.String),
+    sa.column('mime_type', sa.String),
+    sa.column('size_bytes', sa.Integer),
+    sa.column('storage_path', sa.String),
+    sa.column('disposition', sa.String),
+    sa.column('content_id', sa.String),
+)
+
+
+def _restore_archived(conn) -> None:
+    """Move archived rows back into the live tables, keyset-paginated by id."""
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(archived_emails)
+            .where(archived_emails.c.id > last_id)
+            .order_by(archived_emails.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            return
+        conn.execute(emails.insert(), [{c: getattr(r, c) for c in EMAIL_COLUMNS} for r in rows])
+        bodies = [
+            {'email_id': r.id, 'encoding': r.body_encoding, 'text_data': r.body_text_data, 'html_data': r.body_html_data}
+            for r in rows
+            if r.body_encoding is not None
+        ]
+        if bodies:
+            conn.execute(email_bodies.insert(), bodies)
+        attachments = [
+            {'email_id': r.id, **a} for r in rows if r.attachments for a in json.loads(r.attachments)
+        ]
+        if attachments:
+            conn.execute(email_attachments.insert(), attachments)
+        last_id = rows[-1].id
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.create_table('archived_emails',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('gmail_message_id', sa.String(length=128), nullable=True),
+    sa.Column('gmail_thread_id', sa.String(length=128), nullable=True),
+    sa.Column('account_id', sa.Integer(), nullable=True),
+    sa.Column('to', sa.String(length=320), nullable=False),
+    sa.Column('subject', sa.String(length=998), nullable=False),
+    sa.Column('sent_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('send_count', sa.Integer(), nullable=False),
+    sa.Column('responded', sa.Boolean(), nullable=False),
+    sa.Column('responded_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('responded_source', sa.String(length=16), nullable=True),
+    sa.Column('template_id', sa.Integer(), nullable=True),
+    sa.Column('template_version', sa.Integer(), nullable=True),
+    sa.Column('template_values', sa.Text(), nullable=True),
+    sa.Column('body_encoding', sa.String(length=16), nullable=True),
+    sa.Column('body_text_data', sa.LargeBinary(), nullable=True),
+    sa.Column('body_html_data', sa.LargeBinary(), nullable=True),
+    sa.Column('attachments', sa.Text(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('id', 'sent_at'),
+    # One partition per year, created by the retention job as needed
+    postgresql_partition_by='RANGE (sent_at)',
+    )
+    op.create_index(op.f('ix_archived_emails_sent_at'), 'archived_emails', ['sent_at'], unique=False)
+    op.create_index(op.f('ix_emails_sent_at'), 'emails', ['sent_at'], unique=False)
+    if op.get_bind().dialect.name == 'sqlite':
+        # Archived ids must never be handed out again to new emails
+        with op.batch_alter_table('emails', recreate='always', table_kwargs={'sqlite_autoincrement': True}):
+            pass
+    # ### end Alembic commands ###
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # ### commands auto generated by Alembic - please adjust! ###
+    _restore_archived(op.get_bind())
+    op.drop_index(op.f('ix_emails_sent_at'), table_name='emails')
+    op.drop_index(op.f('ix_archived_emails_sent_at'), table_name='archived_emails')
+    op.drop_table('archived_emails')
+    # ### end Alembic commands ###
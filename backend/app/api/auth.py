@@ -1,16 +1,19 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import RedirectResponse
+from sqlalchemy.orm import Session
 
 from app.core.config import get_settings
+from app.db.deps import get_db
+from app.gmail.gmail_client import forget_gmail_service, get_gmail_service
 from app.gmail.oauth_service import exchange_code_for_token, get_login_url, get_saved_credentials
+from app.gmail.reply_detector import get_my_email
 from app.gmail.token_store import delete_credentials
+from app.services.account_service import register_account
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 
-settings = get_settings()
-
 
 @router.get("/status")
 def auth_status():
@@ -35,17 +38,27 @@ def auth_login():
 def auth_callback(
     code: str = Query(...),
     state: str | None = Query(default=None),
+    db: Session = Depends(get_db),
 ):
     try:
-        exchange_code_for_token(code=code, state=state)
+        creds = exchange_code_for_token(code=code, state=state)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"OAuth exchange failed: {e}")
 
+    # The default token was just replaced; also keep it as a sender account.
+    forget_gmail_service()
+    service = get_gmail_service()
+    email_address = get_my_email(service) if service else ""
+    if email_address:
+        register_account(db, email_address, creds)
+
     # For now, redirect to frontend. Vite runs on 5173.
     return RedirectResponse(url="http://localhost:5173/#auth-callback")
 
 
 @router.post("/logout")
 def auth_logout():
-    delete_credentials(settings.google_oauth_token_file)
+    token_file = get_settings().google_oauth_token_file
+    delete_credentials(token_file)
+    forget_gmail_service(token_file)
     return {"ok": True}
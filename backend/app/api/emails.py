@@ -5,58 +5,181 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, UploadFile, status
+from fastapi import APIRouter, Depends, File, Form, Header, HTTPException, Query, Request, Response, UploadFile, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from app.db.deps import get_db
-from app.gmail.gmail_client import get_gmail_service
-from app.gmail.gmail_sender import send_email_via_gmail
+from app.core.etag import etag_matches, make_etag, not_modified, set_etag
+from app.core.events import BROKER
+from app.core.responses import FastJSONResponse, dumps
+from app.db.deps import get_db, get_read_db
+from app.db.session import ReadSessionLocal
+from app.db.table_markers import get_table_markers
 from app.schemas.email import (
     EmailActionResponse,
+    EmailBulkMarkRespondedRequest,
+    EmailBulkRequest,
+    EmailBulkResendResponse,
+    EmailBulkResponse,
     EmailHistoryResponse,
     EmailMarkRespondedRequest,
     EmailSendRequest,
     EmailSendResponse,
+    EmailUploadRef,
+    RetentionRunResponse,
 )
 
 from app.services.email_service import (
+    BULK_RESEND_LIMIT,
+    apply_template,
+    bulk_check_replies,
+    bulk_delete,
+    bulk_mark_responded,
+    bulk_resend,
     check_reply,
     create_email,
+    get_bulk_resend_job,
     list_history,
     mark_responded,
     resend_email,
-    delete_email
+    delete_email,
+    send_with_account_pool,
+)
+from app.gmail.image_optimizer import optimize_inline_image
+from app.services.account_service import can_send
+from app.services.dedup_service import (
+    attachment_digest,
+    claim_send,
+    complete_send,
+    file_digest,
+    release_send,
+    send_fingerprint,
+)
+from app.services.retention_service import run_retention
+from app.services.upload_service import resolve_uploads
+from app.services.export_service import (
+    EXPORT_FORMATS,
+    encode_csv,
+    encode_ndjson,
+    export_fields,
+    iter_export_rows,
 )
 
 STORAGE_DIR = Path("./storage")
+UPLOAD_DIR = STORAGE_DIR / "uploads"
+IMAGE_CACHE_DIR = STORAGE_DIR / "image_cache"
+
+# Comment lines keep idle streams open through proxies
+STREAM_HEARTBEAT_SECONDS = 15
+STREAM_RESYNC = b"event: resync\ndata: {}\n\n"
 
 router = APIRouter(prefix="/api/emails", tags=["emails"])
 
 @router.post("/send", response_model=EmailSendResponse, status_code=status.HTTP_201_CREATED)
-def send_email(payload: EmailSendRequest, db: Session = Depends(get_db)):
-    service = get_gmail_service()
-    if not service:
-        raise HTTPException(status_code=401, detail="Not authenticated. Complete OAuth login first.")
-
-    data = payload.model_dump()
-
-    ids = send_email_via_gmail(
-        service=service,
-        to=data["to"],
-        subject=data["subject"],
-        body_text=data.get("body_text"),
-        body_html=data.get("body_html"),
-        attachments=data.get("attachments") or [],
+def send_email(payload: EmailSendRequest, response: Response, db: Session = Depends(get_db)):
+    data = apply_template(db, payload.model_dump())
+    data["attachments"] = (data.get("attachments") or []) + resolve_uploads(db, data.pop("uploads", None) or [])
+
+    fingerprint = send_fingerprint(
+        data["to"],
+        data["subject"],
+        data.get("body_text"),
+        data.get("body_html"),
+        [(a["filename"], attachment_digest(a)) for a in data.get("attachments") or []],
     )
+    duplicate = claim_send(db, fingerprint)
+    if duplicate is not None:
+        return _collapsed_send(duplicate, response)
+
+    try:
+        ids, account_id = send_with_account_pool(
+            db,
+            to=data["to"],
+            subject=data["subject"],
+            body_text=data.get("body_text"),
+            body_html=data.get("body_html"),
+            attachments=data.get("attachments") or [],
+        )
+    except Exception:
+        release_send(db, fingerprint)
+        raise
 
     email = create_email(
         db,
         data,
         gmail_message_id=ids.get("gmail_message_id") or None,
         gmail_thread_id=ids.get("gmail_thread_id") or None,
+        account_id=account_id,
     )
+    complete_send(db, fingerprint, email.id)
     return email
 
+
+def _collapsed_send(email, response: Response):
+    """The earlier identical send, returned as-is instead of sending again."""
+    response.status_code = status.HTTP_200_OK
+    response.headers["X-Duplicate-Of"] = str(email.id)
+    return email
+
+@router.post("/bulk/mark-responded", response_model=EmailBulkResponse)
+def bulk_mark_responded_route(payload: EmailBulkMarkRespondedRequest, db: Session = Depends(get_db)):
+    return bulk_mark_responded(
+        db,
+        ids=payload.ids,
+        filters=payload.filter.model_dump() if payload.filter else None,
+        responded=payload.responded,
+    )
+
+@router.post("/bulk/delete", response_model=EmailBulkResponse)
+def bulk_delete_route(payload: EmailBulkRequest, db: Session = Depends(get_db)):
+    return bulk_delete(
+        db,
+        ids=payload.ids,
+        filters=payload.filter.model_dump() if payload.filter else None,
+    )
+
+@router.post("/bulk/resend", response_model=EmailBulkResendResponse, status_code=status.HTTP_202_ACCEPTED)
+def bulk_resend_route(payload: EmailBulkRequest, db: Session = Depends(get_db)):
+    """Queue the selection on the send worker pool; poll GET /bulk/resend/{job_id} for results."""
+    if not can_send(db):
+        raise HTTPException(status_code=401, detail="Not authenticated. Complete OAuth login first.")
+
+    result = bulk_resend(
+        db,
+        ids=payload.ids,
+        filters=payload.filter.model_dump() if payload.filter else None,
+    )
+    if result is None:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Selection too large. Bulk resend is limited to {BULK_RESEND_LIMIT} emails per request.",
+        )
+    return result
+
+@router.get("/bulk/resend/{job_id}", response_model=EmailBulkResendResponse)
+def bulk_resend_job_route(job_id: str):
+    job = get_bulk_resend_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Bulk resend job not found")
+    return job
+
+@router.post("/bulk/check-replies", response_model=EmailBulkResponse)
+def bulk_check_replies_route(payload: EmailBulkRequest, db: Session = Depends(get_db)):
+    """Search-based reply check for the selection; see reply_search_service."""
+    return bulk_check_replies(
+        db,
+        ids=payload.ids,
+        filters=payload.filter.model_dump() if payload.filter else None,
+    )
+
+@router.post("/retention", response_model=RetentionRunResponse)
+def run_retention_route(
+    max_batches: int | None = Query(default=None, ge=1),
+    db: Session = Depends(get_db),
+):
+    """Archive emails due under the retention policy and prune orphaned uploads."""
+    return run_retention(db, UPLOAD_DIR, max_batches=max_batches)
+
 @router.post("/{email_id}/resend", response_model=EmailActionResponse, status_code=status.HTTP_201_CREATED)
 def resend(
     email_id: int,
@@ -69,23 +192,60 @@ def resend(
 
 @router.post("/send-multipart", response_model=EmailSendResponse, status_code=status.HTTP_201_CREATED)
 def send_email_multipart(
+    response: Response,
     to: Annotated[str, Form()],
-    subject: Annotated[str, Form()],
+    subject: Annotated[str | None, Form()] = None,
     body_text: Annotated[str | None, Form()] = None,
     body_html: Annotated[str | None, Form()] = None,
+    template_id: Annotated[int | None, Form()] = None,
+    template_values: Annotated[str | None, Form()] = None,
     inline_meta: Annotated[str | None, Form()] = None,
+    uploads: Annotated[str | None, Form()] = None,
     inline_images: list[UploadFile] = File(default=[]),
     attachments: list[UploadFile] = File(default=[]),
     db: Session = Depends(get_db),
 ):
-    service = get_gmail_service()
-    if not service:
+    if not can_send(db):
         raise HTTPException(status_code=401, detail="Not authenticated. Complete OAuth login first.")
 
-    STORAGE_DIR.mkdir(parents=True, exist_ok=True)
-    upload_dir = STORAGE_DIR / "uploads"
-    upload_dir.mkdir(parents=True, exist_ok=True)
+    values = {}
+    if template_values:
+        try:
+            values = json.loads(template_values)
+        except Exception:
+            raise HTTPException(status_code=400, detail="Invalid template_values JSON")
+        if not isinstance(values, dict):
+            raise HTTPException(status_code=400, detail="template_values must be a JSON object")
+        values = {str(k): str(v) for k, v in values.items()}
 
+    if template_id is None and not subject:
+        raise HTTPException(status_code=400, detail="subject is required unless template_id is given")
+    if template_id is not None and (subject or body_text or body_html):
+        raise HTTPException(status_code=400, detail="subject and bodies come from the template when template_id is given")
+
+    data = apply_template(
+        db,
+        {
+            "to": to,
+            "subject": subject,
+            "body_text": body_text,
+            "body_html": body_html,
+            "template_id": template_id,
+            "template_values": values,
+        },
+    )
+
+    # Files sent earlier through /api/uploads, referenced by id
+    upload_refs = []
+    if uploads:
+        try:
+            upload_refs = [EmailUploadRef.model_validate(r).model_dump() for r in json.loads(uploads)]
+        except Exception:
+            raise HTTPException(status_code=400, detail="Invalid uploads JSON")
+    uploaded = resolve_uploads(db, upload_refs)
+
+    # Validated before the send is claimed: a 400 here must not leave a
+    # reservation behind that blocks the corrected retry.
     inline_meta_list = []
     if inline_meta:
         try:
@@ -99,82 +259,185 @@ def send_email_multipart(
         if filename:
             meta_by_filename[filename] = m
 
-    stored_attachments = []
-
-    # Save inline images
     for f in inline_images:
-        content = f.file.read()
         filename = f.filename or "inline"
-        meta = meta_by_filename.get(filename, {})
-        content_id = str(meta.get("content_id") or "").strip()
-        if not content_id:
+        if not str(meta_by_filename.get(filename, {}).get("content_id") or "").strip():
             raise HTTPException(status_code=400, detail=f"Missing content_id for inline image: {filename}")
 
-        dest = upload_dir / f"{int(datetime.now(timezone.utc).timestamp())}_{filename}"
-        dest.write_bytes(content)
-
-        stored_attachments.append(
-            {
-                "filename": filename,
-                "mime_type": f.content_type or str(meta.get("mime_type") or "application/octet-stream"),
-                "size_bytes": len(content),
-                "storage_path": str(dest),
-                "disposition": "inline",
-                "content_id": content_id,
-            }
-        )
-
-    # Save normal attachments
-    for f in attachments:
-        content = f.file.read()
-        filename = f.filename or "attachment"
-        dest = upload_dir / f"{int(datetime.now(timezone.utc).timestamp())}_{filename}"
-        dest.write_bytes(content)
-
-        stored_attachments.append(
-            {
-                "filename": filename,
-                "mime_type": f.content_type or "application/octet-stream",
-                "size_bytes": len(content),
-                "storage_path": str(dest),
-                "disposition": "attachment",
-                "content_id": None,
-            }
-        )
-
-    # Send via Gmail
-    ids = send_email_via_gmail(
-        service=service,
-        to=to,
-        subject=subject,
-        body_text=body_text,
-        body_html=body_html,
-        attachments=stored_attachments,
+    # Checked on the uploaded bytes, before anything is optimized, stored or sent
+    fingerprint = send_fingerprint(
+        to,
+        data["subject"],
+        data.get("body_text"),
+        data.get("body_html"),
+        [(f"inline:{f.filename}", file_digest(f.file)) for f in inline_images]
+        + [(f"attachment:{f.filename}", file_digest(f.file)) for f in attachments]
+        + [(a["filename"], attachment_digest(a)) for a in uploaded],
     )
-
-    data = {
-        "to": to,
-        "subject": subject,
-        "body_text": body_text,
-        "body_html": body_html,
-        "attachments": stored_attachments,
-    }
+    duplicate = claim_send(db, fingerprint)
+    if duplicate is not None:
+        return _collapsed_send(duplicate, response)
+
+    # Anything failing from here until Gmail accepts the message drops the reservation
+    try:
+        STORAGE_DIR.mkdir(parents=True, exist_ok=True)
+        upload_dir = UPLOAD_DIR
+        upload_dir.mkdir(parents=True, exist_ok=True)
+
+        stored_attachments = list(uploaded)
+
+        # Save inline images
+        for f in inline_images:
+            content = f.file.read()
+            filename = f.filename or "inline"
+            meta = meta_by_filename[filename]
+            content_id = str(meta["content_id"]).strip()
+            mime_type = f.content_type or str(meta.get("mime_type") or "application/octet-stream")
+
+            # Downscaled/re-encoded copy; the content_id, and so the cid: reference, is unchanged
+            optimized = optimize_inline_image(content, mime_type, filename, IMAGE_CACHE_DIR)
+            if optimized is not None:
+                content, mime_type, filename = optimized.data, optimized.mime_type, optimized.filename
+
+            dest = upload_dir / f"{int(datetime.now(timezone.utc).timestamp())}_{filename}"
+            dest.write_bytes(content)
+
+            stored_attachments.append(
+                {
+                    "filename": filename,
+                    "mime_type": mime_type,
+                    "size_bytes": len(content),
+                    "storage_path": str(dest),
+                    "disposition": "inline",
+                    "content_id": content_id,
+                }
+            )
+
+        # Save normal attachments
+        for f in attachments:
+            content = f.file.read()
+            filename = f.filename or "attachment"
+            dest = upload_dir / f"{int(datetime.now(timezone.utc).timestamp())}_{filename}"
+            dest.write_bytes(content)
+
+            stored_attachments.append(
+                {
+                    "filename": filename,
+                    "mime_type": f.content_type or "application/octet-stream",
+                    "size_bytes": len(content),
+                    "storage_path": str(dest),
+                    "disposition": "attachment",
+                    "content_id": None,
+                }
+            )
+
+        # Send via Gmail
+        ids, account_id = send_with_account_pool(
+            db,
+            to=to,
+            subject=data["subject"],
+            body_text=data.get("body_text"),
+            body_html=data.get("body_html"),
+            attachments=stored_attachments,
+        )
+    except Exception:
+        release_send(db, fingerprint)
+        raise
+    data["attachments"] = stored_attachments
 
     email = create_email(
         db,
         data,
         gmail_message_id=ids.get("gmail_message_id") or None,
         gmail_thread_id=ids.get("gmail_thread_id") or None,
+        account_id=account_id,
     )
+    complete_send(db, fingerprint, email.id)
     return email
 
 @router.get("/history", response_model=EmailHistoryResponse)
 def read_history(
+    request: Request,
     limit: int = Query(default=50, ge=1, le=200),
     offset: int = Query(default=0, ge=0),
-    db: Session = Depends(get_db),
+    include_archived: bool = Query(default=False),
+    db: Session = Depends(get_read_db),
+):
+    # Relative times and status colors move with the clock, so the tag also
+    # changes every minute (their finest granularity).
+    minute = int(datetime.now(timezone.utc).timestamp() // 60)
+    tables = ("emails", "settings", "archived_emails") if include_archived else ("emails", "settings")
+    etag = make_etag("history", limit, offset, include_archived, minute, *get_table_markers(db, *tables))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    # list_history already returns plain dicts in the EmailHistoryResponse shape
+    response = FastJSONResponse(list_history(db, limit=limit, offset=offset, include_archived=include_archived))
+    set_etag(response, etag)
+    return response
+
+@router.get("/export")
+def export_history(
+    export_format: str = Query(default="csv", alias="format", pattern="^(csv|ndjson)$"),
+    include_bodies: bool = Query(default=False),
+    include_attachments: bool = Query(default=False),
 ):
-    return list_history(db, limit=limit, offset=offset)
+    def stream():
+        # The response outlives the request scope, so the stream owns its session.
+        db = ReadSessionLocal()
+        try:
+            rows = iter_export_rows(
+                db,
+                include_bodies=include_bodies,
+                include_attachments=include_attachments,
+            )
+            if export_format == "ndjson":
+                yield from encode_ndjson(rows)
+            else:
+                fields = export_fields(
+                    include_bodies=include_bodies,
+                    include_attachments=include_attachments,
+                )
+                yield from encode_csv(rows, fields)
+        finally:
+            db.close()
+
+    return StreamingResponse(
+        stream(),
+        media_type=EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f'attachment; filename="emails.{export_format}"'},
+    )
+
+@router.get("/stream")
+async def stream_changes(request: Request, last_event_id: int | None = Header(default=None)):
+    """
+    Server-sent events for history rows: sent, resent, responded, status,
+    deleted and archived carry the row (or its id); imported and resync mean
+    reload the history. Reconnects with Last-Event-ID replay what was missed.
+    """
+
+    async def events():
+        sub, resync = BROKER.subscribe(last_event_id)
+        try:
+            yield b"retry: 3000\n\n" + (STREAM_RESYNC if resync else b"")
+            while not await request.is_disconnected():
+                batch, overflowed = await sub.get(STREAM_HEARTBEAT_SECONDS)
+                if overflowed:
+                    yield STREAM_RESYNC
+                elif batch:
+                    yield b"".join(
+                        b"id: %d\nevent: %s\ndata: %s\n\n" % (e.id, e.type.encode(), dumps(e.data)) for e in batch
+                    )
+                else:
+                    yield b": keep-alive\n\n"
+        finally:
+            BROKER.unsubscribe(sub)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 @router.post("/{email_id}/mark-responded", response_model=EmailActionResponse)
 def manual_mark_responded(
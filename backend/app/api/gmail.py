@@ -1,8 +1,29 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, HTTPException
+import secrets
 
+from fastapi import APIRouter, BackgroundTasks, Body, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.db.deps import get_db
 from app.gmail.gmail_client import get_gmail_service
+from app.schemas.gmail_account import GmailAccountRead, GmailAccountUpdate, GmailWatchResult
+from app.schemas.import_job import ImportJobRead
+from app.services.account_service import (
+    get_account,
+    list_accounts,
+    remaining_quota,
+    remove_account,
+    update_account,
+)
+from app.services.push_service import decode_push_message, get_push_coalescer, renew_watches
+from app.services.import_service import (
+    get_import_job,
+    get_or_create_import_job,
+    is_import_running,
+    run_import_job,
+)
 
 router = APIRouter(prefix="/api/gmail", tags=["gmail"])
 
@@ -20,3 +41,84 @@ def gmail_profile():
         "threadsTotal": profile.get("threadsTotal"),
         "historyId": profile.get("historyId"),
     }
+
+
+def _account_response(account) -> GmailAccountRead:
+    data = GmailAccountRead.model_validate(account)
+    data.remaining_today = remaining_quota(account) if account.active else 0
+    return data
+
+
+@router.get("/accounts", response_model=list[GmailAccountRead])
+def gmail_accounts(db: Session = Depends(get_db)):
+    return [_account_response(a) for a in list_accounts(db)]
+
+
+@router.patch("/accounts/{account_id}", response_model=GmailAccountRead)
+def gmail_account_update(account_id: int, payload: GmailAccountUpdate, db: Session = Depends(get_db)):
+    account = get_account(db, account_id)
+    if account is None:
+        raise HTTPException(status_code=404, detail="Gmail account not found")
+    account = update_account(db, account, payload.model_dump(exclude_unset=True, exclude_none=True))
+    return _account_response(account)
+
+
+@router.delete("/accounts/{account_id}", status_code=status.HTTP_204_NO_CONTENT)
+def gmail_account_remove(account_id: int, db: Session = Depends(get_db)):
+    account = get_account(db, account_id)
+    if account is None:
+        raise HTTPException(status_code=404, detail="Gmail account not found")
+    remove_account(db, account)
+    return None
+
+
+@router.post("/push", status_code=status.HTTP_204_NO_CONTENT)
+def gmail_push(payload: dict = Body(...), token: str = Query(default="")):
+    """
+    Pub/Sub push endpoint for users.watch notifications. Acknowledges at once;
+    the reply sync runs after a short debounce that coalesces bursts.
+    """
+    expected = get_settings().gmail_push_token
+    if not expected or not secrets.compare_digest(token, expected):
+        raise HTTPException(status_code=403, detail="Invalid push token")
+
+    decoded = decode_push_message(payload)
+    if decoded is None:
+        # Still 2xx: Pub/Sub would otherwise redeliver a message we can never parse
+        return None
+    get_push_coalescer().notify(*decoded)
+    return None
+
+
+@router.post("/watch", response_model=list[GmailWatchResult])
+def gmail_watch(db: Session = Depends(get_db)):
+    """Start or renew users.watch on every active account now."""
+    if not get_settings().gmail_pubsub_topic:
+        raise HTTPException(status_code=400, detail="GMAIL_PUBSUB_TOPIC is not configured")
+    return renew_watches(db, force=True)
+
+
+def _job_response(job) -> ImportJobRead:
+    data = ImportJobRead.model_validate(job)
+    data.running = is_import_running(job.id)
+    return data
+
+
+@router.post("/import-sent", response_model=ImportJobRead, status_code=status.HTTP_202_ACCEPTED)
+def import_sent(background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+    if not get_gmail_service():
+        raise HTTPException(status_code=401, detail="Not authenticated. Complete OAuth login first.")
+
+    # Resumes the last unfinished job from its checkpoint, if there is one
+    job = get_or_create_import_job(db)
+    if not is_import_running(job.id):
+        background_tasks.add_task(run_import_job, job.id)
+    return _job_response(job)
+
+
+@router.get("/import-sent/{job_id}", response_model=ImportJobRead)
+def import_sent_progress(job_id: int, db: Session = Depends(get_db)):
+    job = get_import_job(db, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return _job_response(job)
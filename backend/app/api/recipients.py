@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.db.deps import get_read_db
+from app.schemas.recipient import RecipientDetail, RecipientRead
+from app.services.recipient_service import get_recipient, recipient_emails, search_recipients
+
+router = APIRouter(prefix="/api/recipients", tags=["recipients"])
+
+
+@router.get("", response_model=list[RecipientRead])
+def read_recipients(
+    q: str | None = Query(default=None, max_length=320),
+    limit: int = Query(default=10, ge=1, le=100),
+    db: Session = Depends(get_read_db),
+):
+    """Autocomplete: recipients by address or domain prefix, most contacted first."""
+    return search_recipients(db, q, limit)
+
+
+@router.get("/{address}", response_model=RecipientDetail)
+def read_recipient(
+    address: str,
+    limit: int = Query(default=50, ge=1, le=500),
+    db: Session = Depends(get_read_db),
+):
+    """Send and reply statistics for one address, with the emails sent to it."""
+    recipient = get_recipient(db, address)
+    if recipient is None:
+        raise HTTPException(status_code=404, detail="Recipient not found")
+    return {**RecipientRead.model_validate(recipient).model_dump(), "emails": recipient_emails(db, recipient.id, limit)}
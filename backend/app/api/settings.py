@@ -1,10 +1,12 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 
 from sqlalchemy.orm import Session
 
+from app.core.etag import etag_matches, make_etag, not_modified, set_etag
 from app.db.deps import get_db
+from app.db.table_markers import get_table_markers
 from app.schemas.settings import SettingsRead, SettingsUpdate
 from app.services.settings_service import get_or_create_settings, update_settings
 
@@ -12,7 +14,12 @@ router = APIRouter(prefix="/api/settings", tags=["settings"])
 
 
 @router.get("", response_model=SettingsRead)
-def read_settings(db: Session = Depends(get_db)):
+def read_settings(request: Request, response: Response, db: Session = Depends(get_db)):
+    etag = make_etag("settings", *get_table_markers(db, "settings"))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    set_etag(response, etag)
     return get_or_create_settings(db)
 
 
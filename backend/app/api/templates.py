@@ -1,15 +1,19 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
 
-from app.db.deps import get_db
+from app.core.etag import etag_matches, make_etag, not_modified, set_etag
+from app.core.responses import FastJSONResponse
+from app.db.deps import get_db, get_read_db
+from app.db.table_markers import get_table_markers
 from app.schemas.template import TemplateCreate, TemplateRead, TemplateUpdate
 from app.schemas.template_placeholder import TemplatePlaceholderRead
 from app.services.template_service import (
     create_template,
     delete_template,
     get_template,
+    get_template_version,
     list_placeholders,
     list_templates,
     update_template,
@@ -17,10 +21,21 @@ from app.services.template_service import (
 
 router = APIRouter(prefix="/api/templates", tags=["templates"])
 
+TEMPLATE_FIELDS = tuple(TemplateRead.model_fields)
+
 
 @router.get("", response_model=list[TemplateRead])
-def read_templates(db: Session = Depends(get_db)):
-    return list_templates(db)
+def read_templates(request: Request, db: Session = Depends(get_read_db)):
+    etag = make_etag("templates", *get_table_markers(db, "templates"))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    # Plain column dicts through orjson; bodies can be large HTML.
+    response = FastJSONResponse(
+        [{field: getattr(t, field) for field in TEMPLATE_FIELDS} for t in list_templates(db)]
+    )
+    set_etag(response, etag)
+    return response
 
 
 @router.post("", response_model=TemplateRead, status_code=status.HTTP_201_CREATED)
@@ -29,7 +44,16 @@ def write_template(payload: TemplateCreate, db: Session = Depends(get_db)):
 
 
 @router.get("/{template_id}", response_model=TemplateRead)
-def read_template(template_id: int, db: Session = Depends(get_db)):
+def read_template(template_id: int, request: Request, response: Response, db: Session = Depends(get_read_db)):
+    version = get_template_version(db, template_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Template not found")
+
+    etag = make_etag("template", template_id, version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    set_etag(response, etag)
     template = get_template(db, template_id)
     if template is None:
         raise HTTPException(status_code=404, detail="Template not found")
@@ -53,7 +77,16 @@ def remove_template(template_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/{template_id}/placeholders", response_model=list[TemplatePlaceholderRead])
-def read_placeholders(template_id: int, db: Session = Depends(get_db)):
+def read_placeholders(template_id: int, request: Request, response: Response, db: Session = Depends(get_read_db)):
+    version = get_template_version(db, template_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Template not found")
+
+    etag = make_etag("placeholders", template_id, version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    set_etag(response, etag)
     items = list_placeholders(db, template_id)
     if items is None:
         raise HTTPException(status_code=404, detail="Template not found")
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.api.emails import UPLOAD_DIR
+from app.db.deps import get_db
+from app.schemas.upload import UploadCreate, UploadRead
+from app.services.upload_service import (
+    complete_upload,
+    create_upload,
+    delete_upload,
+    get_open_upload,
+    get_upload,
+    offset_conflict,
+    parse_content_range,
+    receive_range,
+    record_range,
+)
+
+router = APIRouter(prefix="/api/uploads", tags=["uploads"])
+
+
+@router.post("", response_model=UploadRead, status_code=status.HTTP_201_CREATED)
+def create_upload_session(payload: UploadCreate, db: Session = Depends(get_db)):
+    """Start a resumable upload; send the bytes with PUT, then POST .../complete."""
+    return create_upload(db, payload.model_dump(), UPLOAD_DIR)
+
+
+@router.get("/{upload_id}", response_model=UploadRead)
+def read_upload(upload_id: str, db: Session = Depends(get_db)):
+    """Where an interrupted upload continues: received_bytes."""
+    upload = get_upload(db, upload_id)
+    if upload is None:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return upload
+
+
+@router.put("/{upload_id}", response_model=UploadRead)
+async def upload_range(
+    upload_id: str,
+    request: Request,
+    content_range: str = Header(...),
+    x_chunk_sha256: str | None = Header(default=None),
+    db: Session = Depends(get_db),
+):
+    """
+    Append "Content-Range: bytes <first>-<last>/<total>" to the upload. Ranges
+    must follow each other; a 409 carries the offset to continue from in
+    Upload-Offset. With X-Chunk-SHA256 the range is checked before it counts.
+
+    Async so a slow client only holds the event loop between chunks, not a
+    worker thread; database calls go to the thread pool.
+    """
+    upload = await run_in_threadpool(get_open_upload, db, upload_id)
+    start, end = parse_content_range(content_range, upload.size_bytes)
+    if start != upload.received_bytes:
+        raise offset_conflict(upload)
+
+    part, sha256 = await receive_range(Path(upload.storage_path), start, end, request.stream(), x_chunk_sha256)
+    return await run_in_threadpool(record_range, db, upload_id, start, end, part, sha256)
+
+
+@router.post("/{upload_id}/complete", response_model=UploadRead)
+def complete_upload_session(upload_id: str, db: Session = Depends(get_db)):
+    """Verify size and sha256; the upload id can then be used in sends."""
+    return complete_upload(db, get_open_upload(db, upload_id))
+
+
+@router.delete("/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_upload_session(upload_id: str, db: Session = Depends(get_db)):
+    upload = get_upload(db, upload_id)
+    if upload is None:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    delete_upload(db, upload)
+    return None
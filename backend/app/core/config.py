@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import os
 from dataclasses import dataclass
+from functools import lru_cache
 
 
 from dotenv import load_dotenv
@@ -11,15 +12,88 @@ load_dotenv()
 @dataclass(frozen=True)
 class Settings:
     database_url: str
+    # Optional read-only replica for history, export and template reads
+    database_replica_url: str | None
+
+    # Per-process connection pool for server databases (SQLite ignores these)
+    db_pool_size: int
+    db_max_overflow: int
+    db_pool_timeout: float
+    db_pool_recycle: int
+    db_pool_pre_ping: bool
+    # psycopg 3 server-side prepare threshold; None disables prepared
+    # statements (required behind PgBouncer in transaction mode)
+    db_prepare_threshold: int | None
 
     google_oauth_client_secrets_file: str
     google_oauth_token_file: str
     google_oauth_redirect_uri: str
     google_oauth_scopes: list[str]
+    # One token file per connected sender account
+    google_oauth_accounts_dir: str
+    # Overrides the Gmail API root URL, e.g. to point at bench/fake_gmail.py
+    gmail_api_endpoint: str | None
+
+    send_workers: int
+    # Processes for MIME build + base64 encode; 0 builds in the request thread
+    mime_workers: int
+    metrics_enabled: bool
+
+    # gzip/brotli for responses of at least compression_min_size bytes
+    compression_enabled: bool
+    compression_min_size: int
+
+    # Per-account send limits used to route sends across accounts
+    gmail_daily_send_limit: int
+    gmail_sends_per_second: float
+
+    # Push notifications: Pub/Sub topic for users.watch (empty disables), the
+    # shared token expected as ?token= on the push endpoint, and how long to
+    # coalesce a burst of notifications before syncing
+    gmail_pubsub_topic: str | None
+    gmail_push_token: str | None
+    gmail_push_debounce_seconds: float
+
+    # Inline images wider than this are downscaled and re-encoded before
+    # sending (needs Pillow); 0 sends them as uploaded
+    inline_image_max_width: int
+    # auto (JPEG for photos, palette PNG otherwise), jpeg, png or webp
+    inline_image_format: str
+    inline_image_quality: int
+
+    # Emails older than retention_days (or answered and older than
+    # retention_responded_days) move to archived_emails; 0 disables a rule
+    retention_days: int
+    retention_responded_days: int
+    retention_batch_size: int
+    # Background retention run every N hours; 0 runs it only via the API
+    retention_interval_hours: float
+
+    # An identical send (same recipients, subject, bodies and attachments)
+    # within this many seconds is collapsed into the first one or rejected;
+    # 0 disables the guard
+    duplicate_send_window_seconds: int
+    # collapse (return the earlier email) or reject (409)
+    duplicate_send_action: str
+
+    # Resumable uploads (/api/uploads): largest accepted file, and how long an
+    # upload session may stay unused before the retention run drops it
+    upload_max_bytes: int
+    upload_session_ttl_hours: float
 
 
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
     database_url = os.getenv("DATABASE_URL", "sqlite:///./mail_orchestrator.db")
+    database_replica_url = os.getenv("DATABASE_REPLICA_URL") or None
+
+    db_pool_size = int(os.getenv("DB_POOL_SIZE", "5"))
+    db_max_overflow = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    db_pool_timeout = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    db_pool_recycle = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    db_pool_pre_ping = os.getenv("DB_POOL_PRE_PING", "true").strip().lower() in ("1", "true", "yes")
+    prepare_threshold_raw = os.getenv("DB_PREPARE_THRESHOLD", "5").strip().lower()
+    db_prepare_threshold = None if prepare_threshold_raw in ("", "none") else int(prepare_threshold_raw)
 
     client_secrets_file = os.getenv("GOOGLE_OAUTH_CLIENT_SECRETS_FILE", "./secrets/credentials.json")
     token_file = os.getenv("GOOGLE_OAUTH_TOKEN_FILE", "./secrets/token.json")
@@ -29,11 +103,78 @@ def get_settings() -> Settings:
         "https://www.googleapis.com/auth/gmail.send https://www.googleapis.com/auth/gmail.readonly",
     )
     scopes = [s.strip() for s in scopes_raw.split() if s.strip()]
+    accounts_dir = os.getenv("GOOGLE_OAUTH_ACCOUNTS_DIR", "./secrets/accounts")
+
+    gmail_api_endpoint = os.getenv("GMAIL_API_ENDPOINT") or None
+
+    send_workers = int(os.getenv("SEND_WORKERS", "4"))
+    mime_workers = int(os.getenv("MIME_WORKERS", "0"))
+    metrics_enabled = os.getenv("METRICS_ENABLED", "true").strip().lower() in ("1", "true", "yes")
+    compression_enabled = os.getenv("COMPRESSION_ENABLED", "true").strip().lower() in ("1", "true", "yes")
+    compression_min_size = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+
+    # Gmail allows ~500 sends/day on consumer accounts (2000 on Workspace) and
+    # 250 quota units/s per user; messages.send costs 100 units.
+    gmail_daily_send_limit = int(os.getenv("GMAIL_DAILY_SEND_LIMIT", "500"))
+    gmail_sends_per_second = float(os.getenv("GMAIL_SENDS_PER_SECOND", "2.5"))
+
+    gmail_pubsub_topic = os.getenv("GMAIL_PUBSUB_TOPIC") or None
+    gmail_push_token = os.getenv("GMAIL_PUSH_TOKEN") or None
+    gmail_push_debounce_seconds = float(os.getenv("GMAIL_PUSH_DEBOUNCE_SECONDS", "2"))
+
+    inline_image_max_width = int(os.getenv("INLINE_IMAGE_MAX_WIDTH", "1200"))
+    inline_image_format = os.getenv("INLINE_IMAGE_FORMAT", "auto").strip().lower()
+    if inline_image_format not in ("auto", "jpeg", "png", "webp"):
+        raise ValueError(f"INLINE_IMAGE_FORMAT must be auto, jpeg, png or webp, not {inline_image_format!r}")
+    inline_image_quality = int(os.getenv("INLINE_IMAGE_QUALITY", "82"))
+
+    retention_days = int(os.getenv("RETENTION_DAYS", "365"))
+    retention_responded_days = int(os.getenv("RETENTION_RESPONDED_DAYS", "90"))
+    retention_batch_size = int(os.getenv("RETENTION_BATCH_SIZE", "500"))
+    retention_interval_hours = float(os.getenv("RETENTION_INTERVAL_HOURS", "0"))
+
+    duplicate_send_window_seconds = int(os.getenv("DUPLICATE_SEND_WINDOW_SECONDS", "60"))
+    duplicate_send_action = os.getenv("DUPLICATE_SEND_ACTION", "collapse").strip().lower()
+    if duplicate_send_action not in ("collapse", "reject"):
+        raise ValueError(f"DUPLICATE_SEND_ACTION must be collapse or reject, not {duplicate_send_action!r}")
+
+    upload_max_bytes = int(os.getenv("UPLOAD_MAX_BYTES", str(25 * 1024 * 1024)))
+    upload_session_ttl_hours = float(os.getenv("UPLOAD_SESSION_TTL_HOURS", "24"))
 
     return Settings(
         database_url=database_url,
+        database_replica_url=database_replica_url,
+        db_pool_size=db_pool_size,
+        db_max_overflow=db_max_overflow,
+        db_pool_timeout=db_pool_timeout,
+        db_pool_recycle=db_pool_recycle,
+        db_pool_pre_ping=db_pool_pre_ping,
+        db_prepare_threshold=db_prepare_threshold,
         google_oauth_client_secrets_file=client_secrets_file,
         google_oauth_token_file=token_file,
         google_oauth_redirect_uri=redirect_uri,
         google_oauth_scopes=scopes,
+        google_oauth_accounts_dir=accounts_dir,
+        gmail_api_endpoint=gmail_api_endpoint,
+        send_workers=send_workers,
+        mime_workers=mime_workers,
+        metrics_enabled=metrics_enabled,
+        compression_enabled=compression_enabled,
+        compression_min_size=compression_min_size,
+        gmail_daily_send_limit=gmail_daily_send_limit,
+        gmail_sends_per_second=gmail_sends_per_second,
+        gmail_pubsub_topic=gmail_pubsub_topic,
+        gmail_push_token=gmail_push_token,
+        gmail_push_debounce_seconds=gmail_push_debounce_seconds,
+        inline_image_max_width=inline_image_max_width,
+        inline_image_format=inline_image_format,
+        inline_image_quality=inline_image_quality,
+        retention_days=retention_days,
+        retention_responded_days=retention_responded_days,
+        retention_batch_size=retention_batch_size,
+        retention_interval_hours=retention_interval_hours,
+        duplicate_send_window_seconds=duplicate_send_window_seconds,
+        duplicate_send_action=duplicate_send_action,
+        upload_max_bytes=upload_max_bytes,
+        upload_session_ttl_hours=upload_session_ttl_hours,
     )
\ No newline at end of file
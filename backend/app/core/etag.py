@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import hashlib
+
+from fastapi import Request, Response
+
+
+def make_etag(*parts: object) -> str:
+    """Strong ETag from version counters or other markers that change with the content."""
+    digest = hashlib.sha1(":".join(str(p) for p in parts).encode("utf-8")).hexdigest()[:20]
+    return f'"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag in candidates
+
+
+def set_etag(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    # Cacheable, but the browser must revalidate each time (and gets a 304 if unchanged).
+    response.headers["Cache-Control"] = "no-cache"
+
+
+def not_modified(etag: str) -> Response:
+    response = Response(status_code=304)
+    set_etag(response, etag)
+    return response
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import threading
+import time
+from collections import deque
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from app.core.metrics import STREAM_EVENTS_DROPPED, STREAM_SUBSCRIBERS
+
+# Events a subscriber may fall behind by before it is told to resync instead.
+SUBSCRIBER_QUEUE_SIZE = 1000
+# Recent events kept for clients reconnecting with Last-Event-ID.
+REPLAY_SIZE = 1000
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    id: int
+    type: str
+    data: dict
+
+
+class Subscription:
+    """
+    One client's queue. Writers only append under a lock and never wait; if
+    the client falls SUBSCRIBER_QUEUE_SIZE events behind, its backlog is
+    dropped and the next read reports overflowed=True so it reloads instead.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, max_queue: int):
+        self._loop = loop
+        self._max_queue = max_queue
+        self._queue: deque[ChangeEvent] = deque()
+        self._overflowed = False
+        self._signalled = False
+        self._lock = threading.Lock()
+        self._ready = asyncio.Event()
+
+    def offer(self, events: list[ChangeEvent]) -> None:
+        """Queue events from any thread."""
+        with self._lock:
+            if self._overflowed:
+                return
+            if len(self._queue) + len(events) > self._max_queue:
+                STREAM_EVENTS_DROPPED.inc(amount=len(self._queue) + len(events))
+                self._queue.clear()
+                self._overflowed = True
+            else:
+                self._queue.extend(events)
+            if self._signalled:
+                return
+            self._signalled = True
+        try:
+            self._loop.call_soon_threadsafe(self._ready.set)
+        except RuntimeError:
+            # Event loop already closed (shutdown)
+            pass
+
+    async def get(self, timeout: float) -> tuple[list[ChangeEvent], bool]:
+        """Wait up to timeout seconds; returns (events, overflowed), empty on timeout."""
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return [], False
+        with self._lock:
+            self._ready.clear()
+            self._signalled = False
+            events = list(self._queue)
+            self._queue.clear()
+            overflowed, self._overflowed = self._overflowed, False
+        return events, overflowed
+
+
+class EventBroker:
+    """In-process pub/sub for row-level change events."""
+
+    def __init__(self, max_queue: int = SUBSCRIBER_QUEUE_SIZE, replay_size: int = REPLAY_SIZE):
+        self._max_queue = max_queue
+        self._lock = threading.Lock()
+        self._subscribers: set[Subscription] = set()
+        # Ids start at the current time in ms, so ids from before a restart are
+        # older than the first one and the reconnecting client resyncs.
+        first_id = int(time.time() * 1000)
+        self._ids = itertools.count(first_id)
+        self._recent: deque[ChangeEvent] = deque(maxlen=replay_size)
+        # Events published while nobody listened are not kept; a client that
+        # reconnects from before such a gap has to resync.
+        self._gap_before = first_id
+
+    def listening(self) -> bool:
+        return bool(self._subscribers)
+
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, event_type: str, payloads: Iterable[dict]) -> None:
+        """
+        Fan out one event per payload. payloads is only consumed if someone is
+        subscribed, so callers can pass a generator that reads the rows lazily.
+        """
+        if not self._subscribers:
+            with self._lock:
+                self._recent.clear()
+                self._gap_before = next(self._ids)
+            return
+
+        items = list(payloads)
+        if not items:
+            return
+        with self._lock:
+            events = [ChangeEvent(next(self._ids), event_type, data) for data in items]
+            self._recent.extend(events)
+            subscribers = list(self._subscribers)
+        for sub in subscribers:
+            sub.offer(events)
+
+    def subscribe(self, last_event_id: int | None = None) -> tuple[Subscription, bool]:
+        """
+        Register a subscriber on the running event loop. With last_event_id,
+        missed events are queued first; returns resync=True if they are no
+        longer available.
+        """
+        sub = Subscription(asyncio.get_running_loop(), self._max_queue)
+        resync = False
+        with self._lock:
+            if last_event_id is not None:
+                oldest = self._recent[0].id if self._recent else None
+                if last_event_id < self._gap_before or (oldest is not None and oldest > last_event_id + 1):
+                    resync = True
+                else:
+                    missed = [e for e in self._recent if e.id > last_event_id]
+                    if missed:
+                        sub.offer(missed)
+            self._subscribers.add(sub)
+        return sub, resync
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(sub)
+
+
+BROKER = EventBroker()
+STREAM_SUBSCRIBERS.set_function(fn=BROKER.subscriber_count)
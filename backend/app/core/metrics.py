@@ -0,0 +1,338 @@
+"""
+Minimal Prometheus-style metrics registry.
+
+Only what the app needs: counters, gauges (optionally backed by a callback)
+and fixed-bucket histograms, all with labels, rendered in the text
+exposition format served at /metrics.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import AsyncIterator, Callable, Iterable
+
+from starlette.requests import Request
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: tuple[str, ...]) -> tuple[str, ...]:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        return tuple(str(v) for v in labels)
+
+    def _samples(self) -> list[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        lines += self._samples()
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in items]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+        self._functions: dict[tuple[str, ...], Callable[[], float]] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels: str, value: float) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def set_function(self, *labels: str, fn: Callable[[], float]) -> None:
+        """Read the value from fn at scrape time, e.g. a queue size."""
+        key = self._key(labels)
+        with self._lock:
+            self._functions[key] = fn
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            items = dict(self._values)
+            functions = list(self._functions.items())
+        for key, fn in functions:
+            try:
+                items[key] = float(fn())
+            except Exception:
+                continue
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in items.items()]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [bucket counts..., +Inf count], sum
+        self._values: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+
+    def observe(self, *labels: str, value: float) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            entry[0][index] += 1
+            entry[1][0] += value
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            items = [(k, list(counts), total[0]) for k, (counts, total) in self._values.items()]
+
+        lines = []
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: list[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(m.render() for m in self._metrics) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_REQUEST_DURATION = REGISTRY.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "HTTP request latency by route template.",
+        ("method", "route", "status"),
+    )
+)
+HTTP_REQUESTS_IN_FLIGHT = REGISTRY.register(
+    Gauge(
+        "http_requests_in_flight",
+        "HTTP requests currently being served, by route template.",
+        ("method", "route"),
+    )
+)
+
+DB_QUERY_DURATION = REGISTRY.register(
+    Histogram(
+        "db_query_duration_seconds",
+        "SQL statement execution time by statement type.",
+        ("statement",),
+        buckets=DB_BUCKETS,
+    )
+)
+DB_QUERY_ERRORS = REGISTRY.register(
+    Counter(
+        "db_query_errors_total",
+        "SQL statements that raised, by statement type.",
+        ("statement",),
+    )
+)
+
+GMAIL_CALL_DURATION = REGISTRY.register(
+    Histogram(
+        "gmail_call_duration_seconds",
+        "Gmail API call latency by method.",
+        ("method",),
+    )
+)
+GMAIL_QUOTA_UNITS = REGISTRY.register(
+    Counter(
+        "gmail_quota_units_total",
+        "Gmail API quota units consumed, by method.",
+        ("method",),
+    )
+)
+GMAIL_CALL_ERRORS = REGISTRY.register(
+    Counter(
+        "gmail_call_errors_total",
+        "Gmail API calls that failed, by method and HTTP status.",
+        ("method", "status"),
+    )
+)
+
+BACKGROUND_QUEUE_DEPTH = REGISTRY.register(
+    Gauge(
+        "background_queue_depth",
+        "Background work items queued or running, by queue.",
+        ("queue",),
+    )
+)
+
+STREAM_SUBSCRIBERS = REGISTRY.register(
+    Gauge(
+        "stream_subscribers",
+        "Clients connected to the change event stream.",
+    )
+)
+STREAM_EVENTS_DROPPED = REGISTRY.register(
+    Counter(
+        "stream_events_dropped_total",
+        "Change events dropped for stream clients that fell behind.",
+    )
+)
+
+DUPLICATE_SENDS = REGISTRY.register(
+    Counter(
+        "duplicate_sends_total",
+        "Sends stopped by the duplicate-send guard, by outcome (collapsed, rejected, in_flight).",
+        ("action",),
+    )
+)
+
+
+def _route_template(scope: Scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording per-route request latency.
+    Routes are labelled by their template (/api/emails/{email_id}), never the raw path.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUEST_DURATION.observe(
+                scope["method"],
+                _route_template(scope),
+                str(status_code),
+                value=time.perf_counter() - start,
+            )
+
+
+async def track_in_flight(request: Request) -> AsyncIterator[None]:
+    """
+    App-level dependency for the in-flight gauge. Unlike the middleware it
+    runs after routing, so the route template is already known.
+    """
+    method = request.method
+    route = _route_template(request.scope)
+    HTTP_REQUESTS_IN_FLIGHT.inc(method, route)
+    try:
+        yield
+    finally:
+        HTTP_REQUESTS_IN_FLIGHT.dec(method, route)
+
+
+def _statement_type(statement: str) -> str:
+    head = statement.lstrip().split(None, 1)
+    return head[0].upper() if head else "OTHER"
+
+
+def instrument_engine(engine) -> None:
+    """Record count, duration and errors of every statement run on engine."""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        start = conn.info["metrics_query_start"].pop()
+        DB_QUERY_DURATION.observe(_statement_type(statement), value=time.perf_counter() - start)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        starts = context.connection.info.get("metrics_query_start") if context.connection else None
+        if starts:
+            starts.pop()
+        DB_QUERY_ERRORS.inc(_statement_type(context.statement or ""))
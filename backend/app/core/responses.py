@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+# OPT_UTC_Z matches Pydantic's "Z" suffix for UTC datetimes.
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, option=ORJSON_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson, for list endpoints that build plain
+    dicts. Returning it skips response_model validation, so the content must
+    already match the declared schema.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import re
+import threading
+from collections import OrderedDict
+
+PLACEHOLDER_RE = re.compile(r"\{\{\s*([a-zA-Z0-9_]+)\s*\}\}")
+
+# Compiled form: literal text and (key, raw placeholder) pairs, in order.
+CompiledTemplate = tuple[str | tuple[str, str], ...]
+
+
+def compile_template(text: str) -> CompiledTemplate:
+    parts: list[str | tuple[str, str]] = []
+    last = 0
+    for match in PLACEHOLDER_RE.finditer(text):
+        if match.start() > last:
+            parts.append(text[last : match.start()])
+        parts.append((match.group(1), match.group(0)))
+        last = match.end()
+    if last < len(text):
+        parts.append(text[last:])
+    return tuple(parts)
+
+
+def render_compiled(compiled: CompiledTemplate, values: dict[str, str]) -> str:
+    # Placeholders without a value are left as written, like the compose page does.
+    return "".join(
+        part if isinstance(part, str) else values.get(part[0], part[1])
+        for part in compiled
+    )
+
+
+class CompiledTemplateCache:
+    """Thread-safe LRU of compiled templates keyed by (template_id, version, field)."""
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._items: OrderedDict[tuple, CompiledTemplate] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple, text: str) -> CompiledTemplate:
+        with self._lock:
+            compiled = self._items.get(key)
+            if compiled is not None:
+                self._items.move_to_end(key)
+                return compiled
+
+        compiled = compile_template(text)
+        with self._lock:
+            self._items[key] = compiled
+            if len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+        return compiled
+
+
+TEMPLATE_CACHE = CompiledTemplateCache()
+
+
+def render_template_text(
+    template_id: int,
+    version: int,
+    field: str,
+    text: str | None,
+    values: dict[str, str],
+) -> str | None:
+    """Render one field of a template version; (template_id, version) content never changes."""
+    if text is None:
+        return None
+    return render_compiled(TEMPLATE_CACHE.get((template_id, version, field), text), values)
@@ -1,18 +1,25 @@
 from __future__ import annotations
 
+from bisect import bisect_left
+from collections.abc import Sequence
 from datetime import datetime, timezone
+from itertools import accumulate
 
+STATUS_EMOJIS = ("⚪", "🔵", "🟡", "🔴")
+RESPONDED_EMOJI = "🟢"
 
-def format_relative_time(sent_at: datetime, now: datetime | None = None) -> str:
-    if now is None:
-        now = datetime.now(timezone.utc)
-    if sent_at.tzinfo is None:
-        sent_at = sent_at.replace(tzinfo=timezone.utc)
-    delta = now - sent_at
-    seconds = int(delta.total_seconds())
-    if seconds < 0:
-        seconds = 0
-    minutes = seconds // 60
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def to_epoch(dt: datetime) -> float:
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def _format_elapsed_minutes(minutes: int) -> str:
     hours = minutes // 60
     days = hours // 24
     if minutes < 1:
@@ -30,6 +37,38 @@ def format_relative_time(sent_at: datetime, now: datetime | None = None) -> str:
         return f"{days} day{'s' if days != 1 else ''} and {remaining_hours} hour{'s' if remaining_hours != 1 else ''} ago"
 
 
+def format_relative_time(sent_at: datetime, now: datetime | None = None) -> str:
+    if now is None:
+        now = datetime.now(timezone.utc)
+    if sent_at.tzinfo is None:
+        sent_at = sent_at.replace(tzinfo=timezone.utc)
+    delta = now - sent_at
+    seconds = int(delta.total_seconds())
+    if seconds < 0:
+        seconds = 0
+    return _format_elapsed_minutes(seconds // 60)
+
+
+def _status_bounds(thresholds: dict) -> list[int]:
+    # Running max keeps bisect equivalent to the sequential checks in
+    # pick_status_emoji even if the thresholds are not ascending.
+    return list(
+        accumulate(
+            (
+                int(thresholds["t_white_minutes"]),
+                int(thresholds["t_blue_minutes"]),
+                int(thresholds["t_yellow_minutes"]),
+            ),
+            max,
+        )
+    )
+
+
+def status_change_minutes(thresholds: dict) -> list[int]:
+    """Elapsed minutes after which an unanswered email moves to the next color, ascending."""
+    return sorted(set(_status_bounds(thresholds)))
+
+
 def pick_status_emoji(elapsed_minutes: int, thresholds: dict) -> str:
     """
     thresholds expects:
@@ -49,3 +88,40 @@ def pick_status_emoji(elapsed_minutes: int, thresholds: dict) -> str:
     if elapsed_minutes <= t_red:
         return "🔴"
     return "🔴"
+
+
+def batch_status_and_relative_time(
+    sent_at_epochs: Sequence[float],
+    thresholds: dict,
+    now: datetime | None = None,
+) -> tuple[list[int], list[str]]:
+    """
+    Batch version of pick_status_emoji + format_relative_time.
+
+    Takes sent_at values as epoch seconds and returns, per row, the index
+    into STATUS_EMOJIS and the relative time string. Labels are built once
+    per distinct display value, so large pages mostly hit the cache.
+    """
+    if now is None:
+        now = datetime.now(timezone.utc)
+    now_epoch = to_epoch(now)
+    bounds = _status_bounds(thresholds)
+
+    labels: dict[int, str] = {}
+    buckets: list[int] = []
+    relative_times: list[str] = []
+
+    for sent_epoch in sent_at_epochs:
+        seconds = int(now_epoch - sent_epoch)
+        minutes = seconds // 60 if seconds > 0 else 0
+
+        buckets.append(bisect_left(bounds, minutes))
+
+        # Past the first hour the label only changes once per hour.
+        key = minutes if minutes < 60 else minutes - minutes % 60
+        label = labels.get(key)
+        if label is None:
+            label = labels[key] = _format_elapsed_minutes(key)
+        relative_times.append(label)
+
+    return buckets, relative_times
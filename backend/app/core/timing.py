@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import json
+import logging
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+
+class RequestTimings:
+    """Per-request stage durations, summed when a stage runs more than once."""
+
+    def __init__(self):
+        self.stages: dict[str, float] = {}
+        self.counts: dict[str, int] = {}
+
+    def add(self, stage: str, seconds: float) -> None:
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+        self.counts[stage] = self.counts.get(stage, 0) + 1
+
+
+_current: ContextVar[RequestTimings | None] = ContextVar("request_timings", default=None)
+
+
+@contextmanager
+def timed(stage: str) -> Iterator[None]:
+    """
+    Time a block as one stage of the current request.
+    A no-op outside a request (scripts, worker threads).
+    """
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(stage, time.perf_counter() - start)
+
+
+def _server_timing_header(timings: RequestTimings, total: float) -> str:
+    parts = [f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in timings.stages.items()]
+    parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+
+class ServerTimingMiddleware:
+    """
+    Collects stages recorded with timed() during a request. When any were
+    recorded, returns them in a Server-Timing header and logs one JSON line.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _current.set(timings)
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and timings.stages:
+                total = time.perf_counter() - start
+                MutableHeaders(scope=message).append("Server-Timing", _server_timing_header(timings, total))
+                route = scope.get("route")
+                logger.info(
+                    "request_timing %s",
+                    json.dumps(
+                        {
+                            "method": scope["method"],
+                            "route": getattr(route, "path", None) or scope["path"],
+                            "path": scope["path"],
+                            "status": message["status"],
+                            "total_ms": round(total * 1000, 1),
+                            "stages_ms": {k: round(v * 1000, 1) for k, v in timings.stages.items()},
+                            "stage_counts": timings.counts,
+                        }
+                    ),
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import multiprocessing
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+from app.core.config import get_settings
+from app.core.metrics import BACKGROUND_QUEUE_DEPTH
+
+_send_executor: ThreadPoolExecutor | None = None
+_mime_executor: ProcessPoolExecutor | None = None
+_lock = threading.Lock()
+
+
+class _QueueDepthMixin(Executor):
+    queue_name: str
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        BACKGROUND_QUEUE_DEPTH.inc(self.queue_name)
+        future = super().submit(fn, *args, **kwargs)
+        future.add_done_callback(lambda _: BACKGROUND_QUEUE_DEPTH.dec(self.queue_name))
+        return future
+
+
+class TrackedExecutor(_QueueDepthMixin, ThreadPoolExecutor):
+    """ThreadPoolExecutor that reports queued + running items as a queue depth gauge."""
+
+    def __init__(self, queue_name: str, **kwargs):
+        super().__init__(**kwargs)
+        self.queue_name = queue_name
+
+
+class TrackedProcessExecutor(_QueueDepthMixin, ProcessPoolExecutor):
+    """ProcessPoolExecutor with the same queue depth gauge as TrackedExecutor."""
+
+    def __init__(self, queue_name: str, **kwargs):
+        super().__init__(**kwargs)
+        self.queue_name = queue_name
+
+
+def get_send_executor() -> ThreadPoolExecutor:
+    """
+    Shared pool for Gmail sends issued in the background or in bulk.
+    Sized by SEND_WORKERS; created on first use.
+    """
+    global _send_executor
+    if _send_executor is None:
+        with _lock:
+            if _send_executor is None:
+                _send_executor = TrackedExecutor(
+                    "send",
+                    max_workers=max(1, get_settings().send_workers),
+                    thread_name_prefix="send",
+                )
+    return _send_executor
+
+
+def get_mime_executor() -> ProcessPoolExecutor | None:
+    """
+    Process pool that builds and encodes raw MIME messages off the GIL.
+    Sized by MIME_WORKERS; None when it is 0 (build in the calling thread).
+    """
+    global _mime_executor
+    workers = get_settings().mime_workers
+    if workers <= 0:
+        return None
+
+    if _mime_executor is None:
+        with _lock:
+            if _mime_executor is None:
+                # spawn, not fork: the API process runs threads that fork would copy mid-flight.
+                _mime_executor = TrackedProcessExecutor(
+                    "mime",
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _mime_executor
+
+
+def shutdown_executors() -> None:
+    global _send_executor, _mime_executor
+    with _lock:
+        for executor in (_send_executor, _mime_executor):
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+        _send_executor = None
+        _mime_executor = None
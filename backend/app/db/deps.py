@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from collections.abc import Generator
 
-from app.db.session import SessionLocal
+from app.db.session import ReadSessionLocal, SessionLocal
 
 
 def get_db() -> Generator:
@@ -11,3 +11,15 @@ def get_db() -> Generator:
         yield db
     finally:
         db.close()
+
+
+def get_read_db() -> Generator:
+    """
+    Session for endpoints that only read (history, export, template reads).
+    Uses DATABASE_REPLICA_URL when set, so results may lag the primary slightly.
+    """
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
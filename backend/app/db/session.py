@@ -1,16 +1,50 @@
 from __future__ import annotations
 
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import get_settings
+from app.db.table_markers import track_deletions
 
 settings = get_settings()
 
-# SQLite needs check_same_thread=False when used with FastAPI in dev.
-engine = create_engine(
-    settings.database_url,
-    connect_args={"check_same_thread": False} if settings.database_url.startswith("sqlite") else {},
-)
+
+def engine_options(url: str) -> dict:
+    """create_engine options for url: SQLite dev defaults, or the tuned server pool."""
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite":
+        # SQLite needs check_same_thread=False when used with FastAPI in dev.
+        return {"connect_args": {"check_same_thread": False}}
+
+    options = {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        # Reuse the most recent connection so idle ones age out under pool_recycle
+        "pool_use_lifo": True,
+    }
+    if parsed.get_driver_name() == "psycopg":
+        options["connect_args"] = {"prepare_threshold": settings.db_prepare_threshold}
+    return options
+
+
+engine = create_engine(settings.database_url, **engine_options(settings.database_url))
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Deletes are what the ETag markers cannot see in the tables themselves
+track_deletions(SessionLocal)
+
+# Read-only paths use the replica when one is configured, else the primary.
+if settings.database_replica_url:
+    replica_options = engine_options(settings.database_replica_url)
+    if make_url(settings.database_replica_url).get_backend_name() == "postgresql":
+        replica_options["execution_options"] = {"postgresql_readonly": True}
+    replica_engine = create_engine(settings.database_replica_url, **replica_options)
+    ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+else:
+    replica_engine = None
+    ReadSessionLocal = SessionLocal
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from sqlalchemy import event, func, insert, select
+from sqlalchemy.orm import ORMExecuteState, Session, sessionmaker
+
+from app.core.time_utils import utcnow
+from app.models.archived_email import ArchivedEmail
+from app.models.email import Email
+from app.models.row_deletion import RowDeletion
+from app.models.settings import Settings
+from app.models.template import Template
+
+_first_settings = select(Settings).order_by(Settings.id).limit(1).subquery()
+
+
+def _last_deletion(name: str):
+    return select(func.max(RowDeletion.id)).where(RowDeletion.table_name == name)
+
+
+# Read from the tables themselves, each an index lookup, so writers share no
+# counter row and Core statements count as much as ORM flushes:
+# - updated_at (emails, templates) is set by a column default/onupdate on every write,
+# - archived emails are only ever inserted, with archived_at set,
+# - deletes leave a row_deletions entry, whose newest id moves,
+# - settings is a single row, so its values are the marker.
+_MARKERS = {
+    "emails": (select(func.max(Email.updated_at)), _last_deletion("emails")),
+    "archived_emails": (select(func.max(ArchivedEmail.archived_at)), _last_deletion("archived_emails")),
+    "templates": (select(func.max(Template.updated_at)), _last_deletion("templates")),
+    "settings": tuple(select(column) for column in _first_settings.c),
+}
+
+_DELETE_TRACKED = frozenset(name for name in _MARKERS if name != "settings")
+
+
+def _record_deletions(session: Session, names: set[str]) -> None:
+    # On the session's connection, so it commits or rolls back with the delete
+    now = utcnow()
+    session.connection().execute(
+        insert(RowDeletion.__table__), [{"table_name": name, "deleted_at": now} for name in sorted(names)]
+    )
+
+
+def _after_flush(session: Session, flush_context) -> None:
+    names = {obj.__table__.name for obj in session.deleted} & _DELETE_TRACKED
+    if names:
+        _record_deletions(session, names)
+
+
+def _do_orm_execute(state: ORMExecuteState) -> None:
+    # Bulk and Core DELETEs skip the flush; statement.table covers both
+    if state.is_delete and state.statement.table.name in _DELETE_TRACKED:
+        _record_deletions(state.session, {state.statement.table.name})
+
+
+def track_deletions(session_factory: sessionmaker) -> None:
+    """Record DELETEs on marker tables run through sessions from session_factory."""
+    event.listen(session_factory, "after_flush", _after_flush)
+    event.listen(session_factory, "do_orm_execute", _do_orm_execute)
+
+
+def get_table_markers(db: Session, *names: str) -> tuple:
+    """Change markers for names, in order, read in one round trip."""
+    columns = [query.scalar_subquery() for name in names for query in _MARKERS[name]]
+    return tuple(db.execute(select(*columns)).one())
@@ -1,16 +1,17 @@
 from __future__ import annotations
 
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
+from typing import TYPE_CHECKING
 
 from app.core.config import get_settings
 from app.gmail.token_store import load_credentials, save_credentials
 
-settings = get_settings()
+if TYPE_CHECKING:
+    from google.oauth2.credentials import Credentials
 
 
-def get_valid_credentials() -> Credentials | None:
-    creds = load_credentials(settings.google_oauth_token_file)
+def get_valid_credentials(token_file: str | None = None) -> Credentials | None:
+    token_file = token_file or get_settings().google_oauth_token_file
+    creds = load_credentials(token_file)
     if not creds:
         return None
 
@@ -18,8 +19,11 @@ def get_valid_credentials() -> Credentials | None:
         return creds
 
     if creds.expired and creds.refresh_token:
+        # google.auth.transport pulls in requests/urllib3; only load it when a refresh is due.
+        from google.auth.transport.requests import Request
+
         creds.refresh(Request())
-        save_credentials(settings.google_oauth_token_file, creds)
+        save_credentials(token_file, creds)
         return creds
 
     return None
@@ -1,15 +1,86 @@
 from __future__ import annotations
 
-from googleapiclient.discovery import build
-from googleapiclient.discovery import Resource
+import json
+import threading
+from typing import TYPE_CHECKING
 
+from app.core.config import get_settings
+from app.core.timing import timed
 from app.gmail.credentials_provider import get_valid_credentials
+from app.gmail.instrumentation import instrumented_request_class
 
+if TYPE_CHECKING:
+    from google.oauth2.credentials import Credentials
+    from googleapiclient.discovery import Resource
 
-def get_gmail_service() -> Resource | None:
-    creds = get_valid_credentials()
-    if not creds:
-        return None
+# Resource objects are not thread-safe (httplib2), so each thread keeps its own
+# per token file. Bumping a file's generation makes every thread rebuild it.
+_local = threading.local()
+_generations: dict[str, int] = {}
+
+
+def warm_gmail_stack() -> None:
+    """
+    Import the Google client libraries ahead of the first Gmail call.
+    They are imported lazily, so the API can start serving before this finishes.
+    """
+    import googleapiclient.discovery  # noqa: F401
+    import googleapiclient.http  # noqa: F401
+    import google.auth.transport.requests  # noqa: F401
+    import google.oauth2.credentials  # noqa: F401
+    import google_auth_oauthlib.flow  # noqa: F401
+
+
+def forget_gmail_service(token_file: str | None = None) -> None:
+    """Drop cached services for token_file after its credentials change or are removed."""
+    token_file = token_file or get_settings().google_oauth_token_file
+    _generations[token_file] = _generations.get(token_file, 0) + 1
+
+
+def get_gmail_service(token_file: str | None = None) -> Resource | None:
+    """
+    Gmail service for the account stored in token_file (the default token when omitted).
+    Services are cached per thread and rebuilt when the credentials expire.
+    """
+    token_file = token_file or get_settings().google_oauth_token_file
+    cache: dict[str, tuple[int, Credentials, Resource]] = _local.__dict__.setdefault("services", {})
+    generation = _generations.get(token_file, 0)
+
+    cached = cache.get(token_file)
+    if cached is not None and cached[0] == generation and cached[1].valid:
+        return cached[2]
+
+    with timed("gmail_auth"):
+        creds = get_valid_credentials(token_file)
+        if not creds:
+            cache.pop(token_file, None)
+            return None
+
+        service = _build_service(creds)
+
+    cache[token_file] = (generation, creds, service)
+    return service
+
+
+def _build_service(creds: Credentials) -> Resource:
+    from googleapiclient.discovery import build, build_from_document
+    from googleapiclient.discovery_cache import get_static_doc
+    from googleapiclient.http import HttpRequest
+
+    settings = get_settings()
+    request_builder = instrumented_request_class() if settings.metrics_enabled else HttpRequest
+
+    if settings.gmail_api_endpoint:
+        # Rewriting rootUrl (rather than client_options.api_endpoint) also redirects batch calls.
+        document = json.loads(get_static_doc("gmail", "v1"))
+        document["rootUrl"] = settings.gmail_api_endpoint.rstrip("/") + "/"
+        return build_from_document(document, credentials=creds, requestBuilder=request_builder)
 
     # cache_discovery=False avoids creating cache files locally.
-    return build("gmail", "v1", credentials=creds, cache_discovery=False)
+    return build(
+        "gmail",
+        "v1",
+        credentials=creds,
+        cache_discovery=False,
+        requestBuilder=request_builder,
+    )
@@ -1,18 +1,89 @@
 from __future__ import annotations
 
 import base64
-from typing import Any
-
-from googleapiclient.discovery import Resource
+from typing import TYPE_CHECKING, Any
 
+from app.core.timing import timed
+from app.core.workers import get_mime_executor
 from app.gmail.mime_builder import build_email_message
 
+if TYPE_CHECKING:
+    from googleapiclient.discovery import Resource
+
 
 def _base64url_encode(raw_bytes: bytes) -> str:
     # Gmail expects base64url. Padding is optional but we strip it.
     return base64.urlsafe_b64encode(raw_bytes).decode("utf-8").rstrip("=")
 
 
+def build_raw_message(
+    *,
+    to: str,
+    subject: str,
+    body_text: str | None,
+    body_html: str | None,
+    attachments: list[dict[str, Any]] | None = None,
+) -> str:
+    """
+    Build, serialize and base64url-encode a message for messages.send.
+    Runs in the MIME process pool, so arguments and result must be picklable.
+    """
+    with timed("mime_build"):
+        msg = build_email_message(
+            to=to,
+            subject=subject,
+            body_text=body_text,
+            body_html=body_html,
+            attachments=attachments,
+        )
+
+    with timed("serialize"):
+        raw_bytes = msg.as_bytes()
+
+    with timed("encode"):
+        return _base64url_encode(raw_bytes)
+
+
+def prepare_raw_message(
+    *,
+    to: str,
+    subject: str,
+    body_text: str | None,
+    body_html: str | None,
+    attachments: list[dict[str, Any]] | None = None,
+) -> str:
+    """build_raw_message, in the MIME process pool when one is configured."""
+    message = {
+        "to": to,
+        "subject": subject,
+        "body_text": body_text,
+        "body_html": body_html,
+        "attachments": attachments,
+    }
+
+    executor = get_mime_executor()
+    if executor is None:
+        return build_raw_message(**message)
+    # Attachments are read in the worker; only paths cross the process boundary.
+    with timed("mime_pool"):
+        return executor.submit(build_raw_message, **message).result()
+
+
+def send_raw_message(service: Resource, raw: str) -> dict[str, str]:
+    with timed("gmail_send"):
+        result = (
+            service.users()
+            .messages()
+            .send(userId="me", body={"raw": raw})
+            .execute()
+        )
+
+    return {
+        "gmail_message_id": result.get("id", ""),
+        "gmail_thread_id": result.get("threadId", ""),
+    }
+
+
 def send_email_via_gmail(
     *,
     service: Resource,
@@ -22,24 +93,27 @@ def send_email_via_gmail(
     body_html: str | None,
     attachments: list[dict[str, Any]] | None = None,
 ) -> dict[str, str]:
-    msg = build_email_message(
+    raw = prepare_raw_message(
         to=to,
         subject=subject,
         body_text=body_text,
         body_html=body_html,
         attachments=attachments,
     )
+    return send_raw_message(service, raw)
 
-    raw = _base64url_encode(msg.as_bytes())
 
-    result = (
-        service.users()
-        .messages()
-        .send(userId="me", body={"raw": raw})
-        .execute()
-    )
+def send_was_rejected(exc: BaseException) -> bool:
+    """
+    True when a failed messages.send certainly did not deliver: Gmail answered
+    with a 4xx other than 429, or the credentials could not be refreshed.
+    Timeouts, dropped connections, 429 and 5xx are ambiguous; Gmail may have
+    accepted the message.
+    """
+    # Only reached on a failed send, so the imports stay off the startup path
+    from google.auth.exceptions import RefreshError
+    from googleapiclient.errors import HttpError
 
-    return {
-        "gmail_message_id": result.get("id", ""),
-        "gmail_thread_id": result.get("threadId", ""),
-    }
+    if isinstance(exc, RefreshError):
+        return True
+    return isinstance(exc, HttpError) and 400 <= exc.resp.status < 500 and exc.resp.status != 429
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parseaddr
+from typing import TYPE_CHECKING, Any
+
+from app.core.timing import timed
+from app.gmail.reply_detector import internal_date_to_dt
+
+if TYPE_CHECKING:
+    from googleapiclient.discovery import Resource
+
+# Partial responses: history.list otherwise returns full message resources.
+HISTORY_FIELDS = "history(messagesAdded(message(id,threadId,labelIds))),nextPageToken,historyId"
+MESSAGE_FIELDS = "id,threadId,internalDate,payload/headers"
+
+
+class HistoryExpired(Exception):
+    """startHistoryId is older than Gmail keeps (about a week); a full check is needed."""
+
+
+@dataclass(frozen=True)
+class WatchState:
+    history_id: str
+    expires_at: datetime
+
+
+@dataclass(frozen=True)
+class AddedMessage:
+    id: str
+    thread_id: str
+
+
+@dataclass(frozen=True)
+class HistoryChanges:
+    # Messages added to the mailbox that we did not send ourselves
+    incoming: list[AddedMessage]
+    history_id: str
+
+
+@dataclass(frozen=True)
+class IncomingMeta:
+    id: str
+    thread_id: str
+    from_addr: str
+    received_at: datetime | None
+
+
+def start_watch(service: Resource, topic_name: str) -> WatchState:
+    """Start (or renew) push notifications for the mailbox to a Pub/Sub topic."""
+    result = (
+        service.users()
+        .watch(userId="me", body={"topicName": topic_name, "labelIds": ["INBOX"], "labelFilterBehavior": "INCLUDE"})
+        .execute()
+    )
+    expires_at = datetime.fromtimestamp(int(result["expiration"]) / 1000, tz=timezone.utc)
+    return WatchState(history_id=str(result["historyId"]), expires_at=expires_at)
+
+
+def list_history_since(service: Resource, start_history_id: str) -> HistoryChanges:
+    """All messageAdded records after start_history_id, across pages."""
+    incoming: list[AddedMessage] = []
+    latest = start_history_id
+    page_token: str | None = None
+
+    while True:
+        kwargs: dict[str, Any] = {
+            "userId": "me",
+            "startHistoryId": start_history_id,
+            "historyTypes": ["messageAdded"],
+            "fields": HISTORY_FIELDS,
+        }
+        if page_token:
+            kwargs["pageToken"] = page_token
+
+        try:
+            with timed("gmail_history"):
+                result = service.users().history().list(**kwargs).execute()
+        except Exception as exc:
+            if getattr(getattr(exc, "resp", None), "status", None) == 404:
+                raise HistoryExpired(start_history_id) from exc
+            raise
+
+        for record in result.get("history") or []:
+            for added in record.get("messagesAdded") or []:
+                msg = added.get("message") or {}
+                labels = msg.get("labelIds") or []
+                if msg.get("id") and "SENT" not in labels and "DRAFT" not in labels:
+                    incoming.append(AddedMessage(id=msg["id"], thread_id=msg.get("threadId") or ""))
+
+        latest = str(result.get("historyId") or latest)
+        page_token = result.get("nextPageToken")
+        if not page_token:
+            return HistoryChanges(incoming=incoming, history_id=latest)
+
+
+def fetch_incoming_meta(service: Resource, message_ids: list[str]) -> list[IncomingMeta]:
+    """From address and receive time of the given messages (deleted ones are skipped)."""
+    metas: list[IncomingMeta] = []
+    for message_id in message_ids:
+        try:
+            with timed("gmail_message"):
+                msg = (
+                    service.users()
+                    .messages()
+                    .get(userId="me", id=message_id, format="metadata", metadataHeaders=["From"], fields=MESSAGE_FIELDS)
+                    .execute()
+                )
+        except Exception as exc:
+            if getattr(getattr(exc, "resp", None), "status", None) == 404:
+                continue
+            raise
+
+        from_raw = ""
+        for h in (msg.get("payload") or {}).get("headers") or []:
+            if (h.get("name") or "").lower() == "from":
+                from_raw = h.get("value") or ""
+        metas.append(
+            IncomingMeta(
+                id=msg.get("id") or message_id,
+                thread_id=msg.get("threadId") or "",
+                from_addr=(parseaddr(from_raw)[1] or "").strip().lower(),
+                received_at=internal_date_to_dt(msg),
+            )
+        )
+    return metas
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import logging
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+from app.core.config import get_settings
+from app.core.timing import timed
+
+logger = logging.getLogger(__name__)
+
+# Raster formats worth re-encoding; GIF (often animated) and SVG pass through.
+OPTIMIZABLE_TYPES = ("image/png", "image/jpeg", "image/webp", "image/bmp", "image/tiff")
+
+OUTPUT_TYPES = {"JPEG": ("image/jpeg", ".jpg"), "PNG": ("image/png", ".png"), "WEBP": ("image/webp", ".webp")}
+
+CACHE_MAX_AGE_SECONDS = 30 * 24 * 3600
+_CACHE_PRUNE_INTERVAL_SECONDS = 3600
+_last_cache_prune = 0.0
+_prune_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def _pil():
+    """PIL's Image and ImageOps, or None; imported on first use to keep startup fast."""
+    try:
+        from PIL import Image, ImageOps
+    except ImportError:  # optional: pip install pillow
+        return None
+    return Image, ImageOps
+
+
+@dataclass(frozen=True)
+class OptimizedImage:
+    data: bytes
+    mime_type: str
+    filename: str
+
+
+def _settings_signature() -> str:
+    s = get_settings()
+    return f"w{s.inline_image_max_width}-{s.inline_image_format}-q{s.inline_image_quality}"
+
+
+def _has_alpha(img) -> bool:
+    return img.mode in ("RGBA", "LA", "PA") or (img.mode == "P" and "transparency" in img.info)
+
+
+def _choose_format(img, source_type: str) -> str:
+    fmt = get_settings().inline_image_format
+    if fmt != "auto":
+        return fmt.upper()
+    # Photos stay JPEG; screenshots and anything transparent become palette PNGs,
+    # which keep text sharp where JPEG would smear it.
+    if source_type == "image/jpeg" and not _has_alpha(img):
+        return "JPEG"
+    return "PNG"
+
+
+def _encode(Image, img, fmt: str) -> bytes:
+    quality = get_settings().inline_image_quality
+    out = io.BytesIO()
+    if fmt == "JPEG":
+        if img.mode != "RGB":
+            img = img.convert("RGBA").convert("RGB") if _has_alpha(img) else img.convert("RGB")
+        img.save(out, "JPEG", quality=quality, optimize=True, progressive=True)
+    elif fmt == "WEBP":
+        img.save(out, "WEBP", quality=quality, method=4)
+    else:
+        if img.mode not in ("P", "L", "1"):
+            # 256-color quantization; FASTOCTREE keeps the alpha channel
+            rgba = img.convert("RGBA")
+            img = rgba.quantize(colors=256, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.FLOYDSTEINBERG)
+        img.save(out, "PNG", optimize=True)
+    return out.getvalue()
+
+
+def _cache_path(cache_dir: Path, digest: str, fmt: str) -> Path:
+    return cache_dir / f"{digest}{OUTPUT_TYPES[fmt][1]}"
+
+
+def _write_cache(path: Path, data: bytes) -> None:
+    # A temp file of its own per writer: concurrent sends of the same image
+    # each rename a complete file into place instead of sharing one.
+    with tempfile.NamedTemporaryFile(dir=path.parent, prefix=f"{path.stem}.", suffix=".tmp", delete=False) as tmp:
+        tmp.write(data)
+    try:
+        os.replace(tmp.name, path)
+    except OSError:
+        Path(tmp.name).unlink(missing_ok=True)
+        raise
+
+
+def _prune_cache(cache_dir: Path) -> None:
+    """Drop cache entries unused for CACHE_MAX_AGE_SECONDS; runs at most hourly."""
+    global _last_cache_prune
+    now = time.time()
+    with _prune_lock:
+        if now - _last_cache_prune < _CACHE_PRUNE_INTERVAL_SECONDS:
+            return
+        _last_cache_prune = now
+    for path in cache_dir.iterdir():
+        if path.is_file() and path.stat().st_mtime < now - CACHE_MAX_AGE_SECONDS:
+            path.unlink(missing_ok=True)
+
+
+def optimize_inline_image(data: bytes, mime_type: str, filename: str, cache_dir: Path) -> OptimizedImage | None:
+    """
+    Downscale an inline image to INLINE_IMAGE_MAX_WIDTH and re-encode it.
+    Results are cached in cache_dir by a hash of the input and the settings.
+    Returns None to keep the original: optimization off, Pillow missing,
+    unsupported or animated image, or nothing saved.
+    """
+    max_width = get_settings().inline_image_max_width
+    if max_width <= 0 or mime_type not in OPTIMIZABLE_TYPES or _pil() is None:
+        return None
+    Image, ImageOps = _pil()
+
+    digest = hashlib.sha256(data + _settings_signature().encode("ascii")).hexdigest()
+    stem = Path(filename).stem or "inline"
+
+    keep_marker = cache_dir / f"{digest}.keep"
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        if keep_marker.exists():
+            os.utime(keep_marker)
+            return None
+        for fmt in OUTPUT_TYPES:
+            cached = _cache_path(cache_dir, digest, fmt)
+            if cached.exists():
+                # mtime marks last use for pruning
+                os.utime(cached)
+                out_type, ext = OUTPUT_TYPES[fmt]
+                return OptimizedImage(cached.read_bytes(), out_type, f"{stem}{ext}")
+    except OSError:
+        # Unreadable cache, or an entry pruned under us: optimize again
+        pass
+
+    with timed("image_optimize"):
+        try:
+            img = Image.open(io.BytesIO(data))
+            if getattr(img, "is_animated", False):
+                return None
+            img = ImageOps.exif_transpose(img)
+            if img.width > max_width:
+                img.thumbnail((max_width, img.height), Image.Resampling.LANCZOS)
+            fmt = _choose_format(img, mime_type)
+            encoded = _encode(Image, img, fmt)
+        except (OSError, ValueError, Image.DecompressionBombError):
+            return None
+
+    smaller = len(encoded) < len(data)
+    try:
+        if smaller:
+            _write_cache(_cache_path(cache_dir, digest, fmt), encoded)
+            _prune_cache(cache_dir)
+        else:
+            # Remember that re-encoding doesn't pay off for this image
+            keep_marker.touch()
+    except OSError as exc:
+        # The cache only saves work; a failed write never fails the send
+        logger.warning("inline image cache write failed in %s: %s", cache_dir, exc)
+    if not smaller:
+        return None
+
+    out_type, ext = OUTPUT_TYPES[fmt]
+    return OptimizedImage(encoded, out_type, f"{stem}{ext}")
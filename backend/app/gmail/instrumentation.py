@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import time
+from functools import lru_cache
+
+from app.core.metrics import GMAIL_CALL_DURATION, GMAIL_CALL_ERRORS, GMAIL_QUOTA_UNITS
+
+# Quota units per call, from the Gmail API usage limits table.
+GMAIL_QUOTA_COST = {
+    "gmail.users.getProfile": 1,
+    "gmail.users.watch": 100,
+    "gmail.users.stop": 50,
+    "gmail.users.history.list": 2,
+    "gmail.users.messages.get": 5,
+    "gmail.users.messages.list": 5,
+    "gmail.users.messages.send": 100,
+    "gmail.users.threads.get": 10,
+    "gmail.users.threads.list": 10,
+}
+
+
+def _method_name(method_id: str | None) -> str:
+    return (method_id or "unknown").removeprefix("gmail.users.") or "unknown"
+
+
+def record_gmail_call(method_id: str | None, seconds: float, error: Exception | None = None) -> None:
+    method = _method_name(method_id)
+    GMAIL_CALL_DURATION.observe(method, value=seconds)
+    GMAIL_QUOTA_UNITS.inc(method, amount=GMAIL_QUOTA_COST.get(method_id or "", 5))
+    if error is not None:
+        # HttpError carries the response; avoids importing googleapiclient here.
+        resp = getattr(error, "resp", None)
+        status = str(getattr(resp, "status", None) or type(error).__name__)
+        GMAIL_CALL_ERRORS.inc(method, status)
+
+
+@lru_cache(maxsize=1)
+def instrumented_request_class() -> type:
+    """
+    HttpRequest subclass that records latency, quota units and errors per
+    Gmail method. Built on first use so googleapiclient stays a lazy import.
+    """
+    from googleapiclient.http import HttpRequest
+
+    class InstrumentedHttpRequest(HttpRequest):
+        def execute(self, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                result = super().execute(*args, **kwargs)
+            except Exception as e:
+                record_gmail_call(self.methodId, time.perf_counter() - start, e)
+                raise
+            record_gmail_call(self.methodId, time.perf_counter() - start)
+            return result
+
+    return InstrumentedHttpRequest
+
+
+def record_gmail_batch(method_id: str, size: int, seconds: float, failed: int = 0) -> None:
+    """Batched calls skip HttpRequest.execute, so they are recorded per batch."""
+    method = _method_name(method_id)
+    GMAIL_CALL_DURATION.observe("batch", value=seconds)
+    GMAIL_QUOTA_UNITS.inc(method, amount=GMAIL_QUOTA_COST.get(method_id, 5) * size)
+    if failed:
+        GMAIL_CALL_ERRORS.inc(method, "batch", amount=failed)
@@ -7,6 +7,8 @@ from typing import Any
 from email.message import EmailMessage
 from email.utils import formatdate
 
+from app.core.timing import timed
+
 
 def _split_mime(mime_type: str) -> tuple[str, str]:
     if "/" not in mime_type:
@@ -68,7 +70,8 @@ def build_email_message(
                 maintype, subtype = _split_mime(mime_type)
                 content_id = (a.get("content_id") or "").strip()
 
-                data = path.read_bytes()
+                with timed("attachments_read"):
+                    data = path.read_bytes()
 
                 # EmailMessage will set Content-ID when cid is provided
                 html_part.add_related(
@@ -87,7 +90,8 @@ def build_email_message(
         mime_type = a.get("mime_type") or mimetypes.guess_type(filename)[0] or "application/octet-stream"
         maintype, subtype = _split_mime(mime_type)
 
-        data = path.read_bytes()
+        with timed("attachments_read"):
+            data = path.read_bytes()
 
         msg.add_attachment(
             data,
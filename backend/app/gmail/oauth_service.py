@@ -1,15 +1,20 @@
 from __future__ import annotations
 
-from google_auth_oauthlib.flow import Flow
-from google.oauth2.credentials import Credentials
+from typing import TYPE_CHECKING
 
 from app.core.config import get_settings
 from app.gmail.token_store import load_credentials, save_credentials
 
-settings = get_settings()
+if TYPE_CHECKING:
+    from google.oauth2.credentials import Credentials
+    from google_auth_oauthlib.flow import Flow
 
 
 def get_flow(state: str | None = None) -> Flow:
+    # google_auth_oauthlib is the slowest import in the app; load it on first login.
+    from google_auth_oauthlib.flow import Flow
+
+    settings = get_settings()
     flow = Flow.from_client_secrets_file(
         settings.google_oauth_client_secrets_file,
         scopes=settings.google_oauth_scopes,
@@ -24,7 +29,8 @@ def get_login_url() -> tuple[str, str]:
     auth_url, state = flow.authorization_url(
         access_type="offline",
         include_granted_scopes="true",
-        prompt="consent",
+        # select_account lets the user connect another sender account
+        prompt="consent select_account",
     )
     return auth_url, state
 
@@ -33,9 +39,9 @@ def exchange_code_for_token(code: str, state: str | None = None) -> Credentials:
     flow = get_flow(state=state)
     flow.fetch_token(code=code)
     creds: Credentials = flow.credentials
-    save_credentials(settings.google_oauth_token_file, creds)
+    save_credentials(get_settings().google_oauth_token_file, creds)
     return creds
 
 
 def get_saved_credentials() -> Credentials | None:
-    return load_credentials(settings.google_oauth_token_file)
+    return load_credentials(get_settings().google_oauth_token_file)
@@ -1,11 +1,20 @@
 from __future__ import annotations
 
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from email.utils import parseaddr
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-from googleapiclient.discovery import Resource
+from app.core.timing import timed
+
+if TYPE_CHECKING:
+    from googleapiclient.discovery import Resource
+
+# Partial responses: only what the reply check reads.
+THREAD_FIELDS = "historyId,messages(internalDate,payload/headers)"
+THREAD_PROBE_FIELDS = "historyId"
 
 
 @dataclass(frozen=True)
@@ -28,7 +37,8 @@ def _parse_from_header(headers: list[dict[str, str]]) -> str:
     return ""
 
 
-def _internal_date_to_dt(msg: dict[str, Any]) -> datetime | None:
+def internal_date_to_dt(msg: dict[str, Any]) -> datetime | None:
+    """A message's internalDate (epoch milliseconds) as a UTC datetime, or None."""
     internal_date = msg.get("internalDate")
     if not internal_date:
         return None
@@ -40,6 +50,89 @@ def _internal_date_to_dt(msg: dict[str, Any]) -> datetime | None:
         return None
 
 
+@dataclass(frozen=True)
+class ThreadSummary:
+    """What a reply check needs from a thread, as of the thread's historyId."""
+
+    history_id: str
+    # Address of the mailbox owning the thread
+    my_email: str
+    # (internalDate, lower-cased From address) per message
+    messages: tuple[tuple[datetime | None, str], ...]
+
+
+class ThreadSummaryCache:
+    """Thread-safe LRU of thread summaries keyed by Gmail thread id."""
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self._items: OrderedDict[str, ThreadSummary] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, thread_id: str) -> ThreadSummary | None:
+        with self._lock:
+            summary = self._items.get(thread_id)
+            if summary is not None:
+                self._items.move_to_end(thread_id)
+            return summary
+
+    def put(self, thread_id: str, summary: ThreadSummary) -> None:
+        with self._lock:
+            self._items[thread_id] = summary
+            self._items.move_to_end(thread_id)
+            if len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+
+THREAD_CACHE = ThreadSummaryCache()
+
+
+def _thread_history_id(service: Resource, thread_id: str) -> str:
+    with timed("gmail_thread"):
+        thread = (
+            service.users()
+            .threads()
+            .get(userId="me", id=thread_id, format="minimal", fields=THREAD_PROBE_FIELDS)
+            .execute()
+        )
+    return str(thread.get("historyId") or "")
+
+
+def _fetch_thread_summary(service: Resource, thread_id: str, my_email: str) -> ThreadSummary:
+    with timed("gmail_thread"):
+        thread = (
+            service.users()
+            .threads()
+            .get(userId="me", id=thread_id, format="metadata", metadataHeaders=["From"], fields=THREAD_FIELDS)
+            .execute()
+        )
+    messages = tuple(
+        (internal_date_to_dt(m), _parse_from_header((m.get("payload") or {}).get("headers") or []))
+        for m in thread.get("messages") or []
+    )
+    return ThreadSummary(history_id=str(thread.get("historyId") or ""), my_email=my_email, messages=messages)
+
+
+def get_thread_summary(service: Resource, thread_id: str) -> ThreadSummary:
+    """
+    Cached summary of a thread. A cached one is revalidated with a
+    historyId-only request and the messages are refetched only if it moved.
+    """
+    cached = THREAD_CACHE.get(thread_id)
+    if cached is not None and cached.history_id and _thread_history_id(service, thread_id) == cached.history_id:
+        return cached
+
+    if cached is not None:
+        my_email = cached.my_email
+    else:
+        with timed("gmail_profile"):
+            my_email = get_my_email(service)
+
+    summary = _fetch_thread_summary(service, thread_id, my_email)
+    THREAD_CACHE.put(thread_id, summary)
+    return summary
+
+
 def check_thread_for_reply(
     *,
     service: Resource,
@@ -49,37 +142,18 @@ def check_thread_for_reply(
     if sent_at.tzinfo is None:
         sent_at = sent_at.replace(tzinfo=timezone.utc)
 
-    my_email = get_my_email(service)
-
-    thread = (
-        service.users()
-        .threads()
-        .get(
-            userId="me",
-            id=thread_id,
-            format="metadata",
-            metadataHeaders=["From", "Date", "Message-Id", "In-Reply-To", "References"],
-        )
-        .execute()
-    )
-
-    messages: list[dict[str, Any]] = thread.get("messages") or []
-    if not messages:
+    summary = get_thread_summary(service, thread_id)
+    if not summary.messages:
         return ReplyCheckResult(replied=False, replied_at=None, reason="thread_has_no_messages")
 
     newest_reply_dt: datetime | None = None
 
-    for m in messages:
-        payload = m.get("payload") or {}
-        headers = payload.get("headers") or []
-        from_addr = _parse_from_header(headers)
-
-        msg_dt = _internal_date_to_dt(m)
+    for msg_dt, from_addr in summary.messages:
         if not msg_dt:
             continue
 
         is_after_send = msg_dt > sent_at
-        is_from_other = bool(from_addr) and (from_addr != my_email)
+        is_from_other = bool(from_addr) and (from_addr != summary.my_email)
 
         if is_after_send and is_from_other:
             if newest_reply_dt is None or msg_dt > newest_reply_dt:
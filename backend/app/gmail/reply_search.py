@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import TYPE_CHECKING, Any
+
+from app.core.timing import timed
+from app.gmail.instrumentation import record_gmail_batch
+from app.gmail.reply_detector import internal_date_to_dt
+
+if TYPE_CHECKING:
+    from googleapiclient.discovery import Resource
+
+# Gmail does not document a query length limit; long ones start failing
+# somewhere past 2000 characters.
+MAX_QUERY_CHARS = 1500
+SEARCH_PAGE_SIZE = 500
+SEARCH_FIELDS = "messages(id,threadId),nextPageToken"
+DATE_FIELDS = "id,threadId,internalDate"
+DATE_BATCH_SIZE = 50
+
+
+@dataclass(frozen=True)
+class FoundMessage:
+    id: str
+    thread_id: str
+
+
+def build_reply_queries(addresses: list[str], after: datetime, max_chars: int = MAX_QUERY_CHARS) -> list[str]:
+    """
+    Searches for mail from any of the addresses since `after`:
+    "from:(a OR b OR c) after:<epoch seconds>", split to stay under max_chars.
+    """
+    suffix = f") after:{int(after.timestamp())}"
+    queries: list[str] = []
+    chunk: list[str] = []
+    length = len("from:(") + len(suffix)
+    for address in sorted(set(addresses)):
+        extra = len(address) + (len(" OR ") if chunk else 0)
+        if chunk and length + extra > max_chars:
+            queries.append("from:(" + " OR ".join(chunk) + suffix)
+            chunk, length = [], len("from:(") + len(suffix)
+            extra = len(address)
+        chunk.append(address)
+        length += extra
+    if chunk:
+        queries.append("from:(" + " OR ".join(chunk) + suffix)
+    return queries
+
+
+def search_messages(service: Resource, query: str) -> list[FoundMessage]:
+    """All (id, threadId) matching a search query, newest first, across pages."""
+    found: list[FoundMessage] = []
+    page_token: str | None = None
+    while True:
+        kwargs: dict[str, Any] = {
+            "userId": "me",
+            "q": query,
+            "maxResults": SEARCH_PAGE_SIZE,
+            "fields": SEARCH_FIELDS,
+        }
+        if page_token:
+            kwargs["pageToken"] = page_token
+        with timed("gmail_search"):
+            result = service.users().messages().list(**kwargs).execute()
+        found += [
+            FoundMessage(id=m["id"], thread_id=m.get("threadId") or "")
+            for m in result.get("messages") or []
+            if m.get("id")
+        ]
+        page_token = result.get("nextPageToken")
+        if not page_token:
+            return found
+
+
+def fetch_message_dates(
+    service: Resource,
+    message_ids: list[str],
+    batch_size: int = DATE_BATCH_SIZE,
+) -> dict[str, datetime]:
+    """internalDate of each message id, with batched minimal gets. Failed ids are left out."""
+    dates: dict[str, datetime] = {}
+    failed = 0
+
+    def on_response(request_id: str, response: dict[str, Any], exception: Exception | None) -> None:
+        nonlocal failed
+        received_at = None if exception is not None else internal_date_to_dt(response)
+        if received_at is None or not response.get("id"):
+            failed += 1
+        else:
+            dates[response["id"]] = received_at
+
+    messages = service.users().messages()
+    for start in range(0, len(message_ids), batch_size):
+        chunk = message_ids[start : start + batch_size]
+        batch = service.new_batch_http_request(callback=on_response)
+        for message_id in chunk:
+            batch.add(messages.get(userId="me", id=message_id, format="minimal", fields=DATE_FIELDS))
+
+        failed_before = failed
+        batch_start = time.perf_counter()
+        with timed("gmail_message"):
+            batch.execute()
+        record_gmail_batch(
+            "gmail.users.messages.get",
+            len(chunk),
+            time.perf_counter() - batch_start,
+            failed - failed_before,
+        )
+    return dates
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import threading
+import time
+
+from app.core.config import get_settings
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, bursting up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+    def release(self) -> None:
+        """Give back a token that was not used for a send."""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens + 1)
+
+    def acquire(self) -> None:
+        """Block until a token is available."""
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+_buckets: dict[int, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def get_send_bucket(account_id: int) -> TokenBucket:
+    """Per-account send rate limiter, shared by every worker in this process."""
+    with _buckets_lock:
+        bucket = _buckets.get(account_id)
+        if bucket is None:
+            rate = get_settings().gmail_sends_per_second
+            bucket = TokenBucket(rate=rate, capacity=max(1.0, rate * 2))
+            _buckets[account_id] = bucket
+        return bucket
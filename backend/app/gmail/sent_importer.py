@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from email.utils import getaddresses
+from typing import TYPE_CHECKING, Any
+
+from app.gmail.instrumentation import record_gmail_batch
+from app.gmail.reply_detector import internal_date_to_dt
+
+if TYPE_CHECKING:
+    from googleapiclient.discovery import Resource
+
+# Gmail accepts up to 100 calls per batch but throttles above ~50.
+METADATA_BATCH_SIZE = 50
+LIST_PAGE_SIZE = 100
+
+
+@dataclass(frozen=True)
+class SentPage:
+    message_ids: list[str]
+    next_page_token: str | None
+    result_size_estimate: int | None
+
+
+@dataclass(frozen=True)
+class SentMessageMeta:
+    gmail_message_id: str
+    gmail_thread_id: str
+    to: str
+    subject: str
+    sent_at: datetime
+
+
+def list_sent_page(
+    service: Resource,
+    page_token: str | None = None,
+    page_size: int = LIST_PAGE_SIZE,
+) -> SentPage:
+    kwargs: dict[str, Any] = {"userId": "me", "labelIds": ["SENT"], "maxResults": page_size}
+    if page_token:
+        kwargs["pageToken"] = page_token
+
+    result = service.users().messages().list(**kwargs).execute()
+
+    return SentPage(
+        message_ids=[m["id"] for m in result.get("messages") or [] if m.get("id")],
+        next_page_token=result.get("nextPageToken") or None,
+        result_size_estimate=result.get("resultSizeEstimate"),
+    )
+
+
+def _header(headers: list[dict[str, str]], name: str) -> str:
+    for h in headers:
+        if (h.get("name") or "").lower() == name:
+            return h.get("value") or ""
+    return ""
+
+
+def _parse_message(msg: dict[str, Any]) -> SentMessageMeta | None:
+    sent_at = internal_date_to_dt(msg)
+    if not msg.get("id") or sent_at is None:
+        return None
+
+    headers = (msg.get("payload") or {}).get("headers") or []
+    to_raw = _header(headers, "to")
+    addresses = [addr for _, addr in getaddresses([to_raw]) if addr]
+
+    return SentMessageMeta(
+        gmail_message_id=msg["id"],
+        gmail_thread_id=msg.get("threadId") or "",
+        to=(", ".join(addresses) or to_raw)[:320],
+        subject=_header(headers, "subject")[:998],
+        sent_at=sent_at,
+    )
+
+
+def fetch_sent_metadata(
+    service: Resource,
+    message_ids: list[str],
+    batch_size: int = METADATA_BATCH_SIZE,
+) -> tuple[list[SentMessageMeta], int]:
+    """
+    Fetch To/Subject metadata for message_ids using batch HTTP requests.
+
+    Returns the parsed messages and the number of ids that failed.
+    """
+    parsed: list[SentMessageMeta] = []
+    failed = 0
+
+    def on_response(request_id: str, response: dict[str, Any], exception: Exception | None) -> None:
+        nonlocal failed
+        meta = None if exception is not None else _parse_message(response)
+        if meta is None:
+            failed += 1
+        else:
+            parsed.append(meta)
+
+    messages = service.users().messages()
+
+    for start in range(0, len(message_ids), batch_size):
+        chunk = message_ids[start : start + batch_size]
+        batch = service.new_batch_http_request(callback=on_response)
+        for message_id in chunk:
+            batch.add(
+                messages.get(
+                    userId="me",
+                    id=message_id,
+                    format="metadata",
+                    metadataHeaders=["To", "Subject"],
+                )
+            )
+
+        failed_before = failed
+        batch_start = time.perf_counter()
+        batch.execute()
+        record_gmail_batch(
+            "gmail.users.messages.get",
+            len(chunk),
+            time.perf_counter() - batch_start,
+            failed - failed_before,
+        )
+
+    return parsed, failed
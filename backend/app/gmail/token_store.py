@@ -2,8 +2,10 @@ from __future__ import annotations
 
 import json
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from google.oauth2.credentials import Credentials
+if TYPE_CHECKING:
+    from google.oauth2.credentials import Credentials
 
 
 def load_credentials(path: str) -> Credentials | None:
@@ -11,6 +13,8 @@ def load_credentials(path: str) -> Credentials | None:
     if not p.exists():
         return None
 
+    from google.oauth2.credentials import Credentials
+
     data = json.loads(p.read_text(encoding="utf-8"))
     return Credentials.from_authorized_user_info(data)
 
@@ -1,15 +1,58 @@
-from fastapi import FastAPI
+import threading
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from app.api.settings import router as settings_router
 from app.api.templates import router as templates_router
-from app.api.emails import router as emails_router
+from app.api.emails import UPLOAD_DIR, router as emails_router
 from app.api.auth import router as auth_router
 from app.api.gmail import router as gmail_router
+from app.api.recipients import router as recipients_router
+from app.api.uploads import router as uploads_router
+from app.core.compression import CompressionMiddleware
+from app.core.config import get_settings
+from app.core.metrics import REGISTRY, MetricsMiddleware, instrument_engine, track_in_flight
+from app.core.timing import ServerTimingMiddleware
+from app.core.workers import get_mime_executor, shutdown_executors
+from app.db.session import engine, replica_engine
+from app.gmail.gmail_client import warm_gmail_stack
+from app.services.email_service import start_status_event_loop
+from app.services.push_service import start_watch_renewal_loop
+from app.services.retention_service import start_retention_loop
+
+settings = get_settings()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # The Google client stack is imported lazily; warm it in the background
+    # so startup (and /api/health) doesn't wait on it.
+    threading.Thread(target=warm_gmail_stack, name="gmail-warmup", daemon=True).start()
+    mime_executor = get_mime_executor()
+    if mime_executor is not None:
+        # Spawns the MIME workers now instead of on the first send.
+        mime_executor.submit(int)
+    retention_stop = None
+    if settings.retention_interval_hours > 0:
+        retention_stop = start_retention_loop(UPLOAD_DIR, settings.retention_interval_hours)
+    watch_stop = start_watch_renewal_loop() if settings.gmail_pubsub_topic else None
+    status_stop = start_status_event_loop()
+    yield
+    status_stop.set()
+    if watch_stop is not None:
+        watch_stop.set()
+    if retention_stop is not None:
+        retention_stop.set()
+    shutdown_executors()
 
 app = FastAPI(
     title="Mail Orchestrator API",
     version="0.1.0",
     description="Local-first email composer and sent mail tracker powered by Gmail.",
+    dependencies=[Depends(track_in_flight)] if settings.metrics_enabled else [],
+    lifespan=lifespan,
 )
 
 app.include_router(settings_router)
@@ -17,6 +60,8 @@ app.include_router(templates_router)
 app.include_router(emails_router)
 app.include_router(auth_router)
 app.include_router(gmail_router)
+app.include_router(recipients_router)
+app.include_router(uploads_router)
 
 app.add_middleware(
     CORSMiddleware,
@@ -24,8 +69,26 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Resume offset of /api/uploads conflicts, read by the upload client
+    expose_headers=["Upload-Offset"],
 )
 
+app.add_middleware(ServerTimingMiddleware)
+
+if settings.compression_enabled:
+    app.add_middleware(CompressionMiddleware, minimum_size=settings.compression_min_size)
+
+if settings.metrics_enabled:
+    # Added last so it wraps CORS and sees the full request time.
+    app.add_middleware(MetricsMiddleware)
+    instrument_engine(engine)
+    if replica_engine is not None:
+        instrument_engine(replica_engine)
+
+    @app.get("/metrics", include_in_schema=False)
+    def metrics() -> PlainTextResponse:
+        return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
 
 @app.get("/api/health")
 def health() -> dict:
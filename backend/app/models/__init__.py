@@ -1,13 +1,33 @@
+from app.models.archived_email import ArchivedEmail
 from app.models.email import Email
 from app.models.email_attachment import EmailAttachment
+from app.models.email_body import EmailBody
+from app.models.email_recipient import EmailRecipient
+from app.models.gmail_account import GmailAccount
+from app.models.import_job import ImportJob
+from app.models.recent_send import RecentSend
+from app.models.recipient import Recipient
+from app.models.row_deletion import RowDeletion
 from app.models.settings import Settings
 from app.models.template import Template
 from app.models.template_placeholder import TemplatePlaceholder
+from app.models.template_revision import TemplateRevision
+from app.models.upload_session import UploadSession
 
 __all__ = [
+    "ArchivedEmail",
     "Email",
     "EmailAttachment",
+    "EmailBody",
+    "EmailRecipient",
+    "GmailAccount",
+    "ImportJob",
+    "RecentSend",
+    "Recipient",
+    "RowDeletion",
     "Settings",
     "Template",
     "TemplatePlaceholder",
+    "TemplateRevision",
+    "UploadSession",
 ]
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import Boolean, DateTime, Integer, LargeBinary, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class ArchivedEmail(Base):
+    """
+    Emails moved out of the live tables by the retention job
+    (app/services/retention_service.py). Keeps the original id, bodies still
+    compressed as in email_bodies, and attachment metadata as JSON.
+    On Postgres the table is range-partitioned by sent_at, one partition per year.
+    The partitioning is declared in the migration only: a postgresql_* table
+    argument here would load the Postgres dialect on every import of the models.
+    """
+
+    __tablename__ = "archived_emails"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+
+    gmail_message_id: Mapped[str | None] = mapped_column(String(128), nullable=True)
+    gmail_thread_id: Mapped[str | None] = mapped_column(String(128), nullable=True)
+    account_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+
+    to: Mapped[str] = mapped_column(String(320), nullable=False)
+    subject: Mapped[str] = mapped_column(String(998), nullable=False)
+
+    # Part of the key because a partitioned table's key must include the partition column
+    sent_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True, index=True)
+    send_count: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    responded: Mapped[bool] = mapped_column(Boolean, nullable=False)
+    responded_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    responded_source: Mapped[str | None] = mapped_column(String(16), nullable=True)
+
+    template_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    template_version: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    template_values: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    body_encoding: Mapped[str | None] = mapped_column(String(16), nullable=True)
+    body_text_data: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)
+    body_html_data: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)
+
+    # [{"filename", "mime_type", "size_bytes", "storage_path", "disposition", "content_id"}]
+    attachments: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    archived_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
@@ -2,27 +2,33 @@ from __future__ import annotations
 
 from datetime import datetime
 
-from sqlalchemy import Boolean, DateTime, Integer, String, Text
+import orjson
+from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
+from app.core.templating import render_template_text
+from app.core.time_utils import utcnow
 from app.db.base import Base
+from app.models.email_body import EmailBody
 
 
 class Email(Base):
     __tablename__ = "emails"
+    # Ids are never reused, so they stay unique across emails and archived_emails
+    __table_args__ = {"sqlite_autoincrement": True}
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
 
-    gmail_message_id: Mapped[str | None] = mapped_column(String(128), nullable=True)
-    gmail_thread_id: Mapped[str | None] = mapped_column(String(128), nullable=True)
+    gmail_message_id: Mapped[str | None] = mapped_column(String(128), nullable=True, index=True)
+    gmail_thread_id: Mapped[str | None] = mapped_column(String(128), nullable=True, index=True)
+
+    # Sender account; None for mail sent with the default token or imported.
+    account_id: Mapped[int | None] = mapped_column(ForeignKey("gmail_accounts.id"), nullable=True, index=True)
 
     to: Mapped[str] = mapped_column(String(320), nullable=False)
     subject: Mapped[str] = mapped_column(String(998), nullable=False)
 
-    body_text: Mapped[str | None] = mapped_column(Text, nullable=True)
-    body_html: Mapped[str | None] = mapped_column(Text, nullable=True)
-
-    sent_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    sent_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
     send_count: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
 
     responded: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
@@ -31,9 +37,78 @@ class Email(Base):
     responded_source: Mapped[str | None] = mapped_column(String(16), nullable=True)
     last_checked_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
 
+    # Templated sends keep the template reference and compact JSON values
+    # instead of rendered bodies; see body_text/body_html.
+    template_id: Mapped[int | None] = mapped_column(Integer, nullable=True, index=True)
+    template_version: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    template_values: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    # Set on every INSERT/UPDATE, ORM or Core; its max is the history ETag marker
+    # (app/db/table_markers.py).
+    updated_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True, index=True, default=utcnow, onupdate=utcnow
+    )
+
     attachments = relationship(
         "EmailAttachment",
         back_populates="email",
         cascade="all, delete-orphan",
         lazy="selectin",
     )
+
+    # Bodies live compressed in email_bodies and load on first access.
+    body = relationship(
+        "EmailBody",
+        back_populates="email",
+        cascade="all, delete-orphan",
+        uselist=False,
+        lazy="select",
+    )
+
+    template_revision = relationship(
+        "TemplateRevision",
+        primaryjoin=(
+            "and_(foreign(Email.template_id) == TemplateRevision.template_id, "
+            "foreign(Email.template_version) == TemplateRevision.version)"
+        ),
+        viewonly=True,
+        uselist=False,
+        lazy="select",
+    )
+
+    def _render(self, field: str) -> str | None:
+        revision = self.template_revision
+        if revision is None:
+            return None
+        values = orjson.loads(self.template_values) if self.template_values else {}
+        return render_template_text(revision.template_id, revision.version, field, getattr(revision, field), values)
+
+    def _body_for_write(self, value: str | None) -> EmailBody | None:
+        # No row at all for an email without bodies
+        if self.body is None and value is not None:
+            self.body = EmailBody()
+        return self.body
+
+    @property
+    def body_text(self) -> str | None:
+        if self.body is not None:
+            return self.body.text
+        return self._render("body_text_template") if self.template_id is not None else None
+
+    @body_text.setter
+    def body_text(self, value: str | None) -> None:
+        body = self._body_for_write(value)
+        if body is not None:
+            body.text = value
+
+    @property
+    def body_html(self) -> str | None:
+        if self.body is not None:
+            return self.body.html
+        return self._render("body_html_template") if self.template_id is not None else None
+
+    @body_html.setter
+    def body_html(self, value: str | None) -> None:
+        body = self._body_for_write(value)
+        if body is not None:
+            body.html = value
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import zlib
+
+from sqlalchemy import ForeignKey, LargeBinary, String
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from app.db.base import Base
+
+BODY_ENCODING = "zlib"
+BODY_COMPRESS_LEVEL = 6
+
+
+def compress_body(value: str | None) -> bytes | None:
+    if value is None:
+        return None
+    return zlib.compress(value.encode("utf-8"), BODY_COMPRESS_LEVEL)
+
+
+def decompress_body(data: bytes | None, encoding: str = BODY_ENCODING) -> str | None:
+    if data is None:
+        return None
+    if encoding != BODY_ENCODING:
+        raise ValueError(f"Unsupported email body encoding: {encoding}")
+    return zlib.decompress(data).decode("utf-8")
+
+
+class EmailBody(Base):
+    """
+    Compressed text/HTML bodies, kept out of the emails table so history scans
+    stay small. Loaded only when Email.body_text / body_html are read.
+    """
+
+    __tablename__ = "email_bodies"
+
+    email_id: Mapped[int] = mapped_column(ForeignKey("emails.id"), primary_key=True)
+
+    encoding: Mapped[str] = mapped_column(String(16), nullable=False, default=BODY_ENCODING)
+    text_data: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)
+    html_data: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)
+
+    email = relationship("Email", back_populates="body")
+
+    @property
+    def text(self) -> str | None:
+        return decompress_body(self.text_data, self.encoding)
+
+    @text.setter
+    def text(self, value: str | None) -> None:
+        self.encoding = BODY_ENCODING
+        self.text_data = compress_body(value)
+
+    @property
+    def html(self) -> str | None:
+        return decompress_body(self.html_data, self.encoding)
+
+    @html.setter
+    def html(self, value: str | None) -> None:
+        self.encoding = BODY_ENCODING
+        self.html_data = compress_body(value)
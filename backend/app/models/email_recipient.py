@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+from sqlalchemy import ForeignKey, Index, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class EmailRecipient(Base):
+    """
+    Links an email to each of its recipients. No foreign key on email_id:
+    links stay when an email moves to archived_emails (ids are shared).
+    """
+
+    __tablename__ = "email_recipients"
+    __table_args__ = (Index("ix_email_recipients_recipient_email", "recipient_id", "email_id"),)
+
+    email_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    recipient_id: Mapped[int] = mapped_column(ForeignKey("recipients.id"), primary_key=True)
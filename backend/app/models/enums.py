@@ -11,3 +11,10 @@ class RespondedSource(str, enum.Enum):
 class AttachmentDisposition(str, enum.Enum):
     attachment = "attachment"
     inline = "inline"
+
+
+class ImportJobStatus(str, enum.Enum):
+    pending = "pending"
+    running = "running"
+    completed = "completed"
+    failed = "failed"
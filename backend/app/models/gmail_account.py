@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from datetime import date, datetime
+
+from sqlalchemy import Boolean, Date, DateTime, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class GmailAccount(Base):
+    __tablename__ = "gmail_accounts"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+
+    email_address: Mapped[str] = mapped_column(String(320), nullable=False, unique=True)
+    token_file: Mapped[str] = mapped_column(String(1024), nullable=False)
+
+    active: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
+
+    # Daily quota bucket. sends_today counts for quota_date only and resets on a new (UTC) day.
+    daily_send_limit: Mapped[int] = mapped_column(Integer, nullable=False)
+    sends_today: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    quota_date: Mapped[date | None] = mapped_column(Date, nullable=True)
+
+    # Push sync checkpoint: replies are synced from this historyId on the next notification
+    history_id: Mapped[str | None] = mapped_column(String(32), nullable=True)
+    watch_expires_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    last_used_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
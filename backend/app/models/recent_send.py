@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class RecentSend(Base):
+    """
+    Fingerprints of sends within the duplicate-send window. A row is written
+    before the Gmail call (email_id still null) and completed with the new
+    email's id afterwards; expired rows are pruned by dedup_service.
+    """
+
+    __tablename__ = "recent_sends"
+
+    # sha256 hex of recipients, subject, bodies and attachments
+    fingerprint: Mapped[str] = mapped_column(String(64), primary_key=True)
+    email_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class Recipient(Base):
+    """
+    One row per lower-cased address we have sent to, with running counters
+    kept up to date by recipient_service. Counters are lifetime totals:
+    deleting or archiving an email does not change them.
+    """
+
+    __tablename__ = "recipients"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+
+    address: Mapped[str] = mapped_column(String(320), nullable=False, unique=True)
+    domain: Mapped[str] = mapped_column(String(255), nullable=False, index=True)
+    # Latest display name seen ("Bob" in "Bob <bob@example.com>")
+    name: Mapped[str | None] = mapped_column(String(255), nullable=True)
+
+    sent_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    replied_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # Sum of (responded_at - sent_at) over replied emails, for the average
+    response_seconds_total: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+    first_sent_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_sent_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_replied_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    @property
+    def avg_response_seconds(self) -> float | None:
+        if not self.replied_count:
+            return None
+        return self.response_seconds_total / self.replied_count
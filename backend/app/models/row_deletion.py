@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class RowDeletion(Base):
+    """
+    Append-only record of DELETEs on tables with ETag markers, written in the
+    deleting transaction (see app.db.table_markers). Only ever inserted, so
+    concurrent writers never wait on each other here.
+    """
+
+    __tablename__ = "row_deletions"
+    # The marker is the newest id per table, so ids must never be reused
+    __table_args__ = (Index("ix_row_deletions_table_name_id", "table_name", "id"), {"sqlite_autoincrement": True})
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    table_name: Mapped[str] = mapped_column(String(64), nullable=False)
+    deleted_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
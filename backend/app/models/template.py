@@ -1,22 +1,35 @@
 from __future__ import annotations
 
-from sqlalchemy import Integer, String, Text
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
+from app.core.time_utils import utcnow
 from app.db.base import Base
 
 
 class Template(Base):
     __tablename__ = "templates"
+    # Ids are never reused, so (id, version) always names the same template revision
+    __table_args__ = {"sqlite_autoincrement": True}
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
 
     name: Mapped[str] = mapped_column(String(160), nullable=False)
 
+    # Incremented on every change to the template or its placeholders
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+
     subject_template: Mapped[str | None] = mapped_column(Text, nullable=True)
     body_text_template: Mapped[str | None] = mapped_column(Text, nullable=True)
     body_html_template: Mapped[str | None] = mapped_column(Text, nullable=True)
 
+    # Set on every write, like emails.updated_at; the template list ETag marker
+    updated_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True, index=True, default=utcnow, onupdate=utcnow
+    )
+
     placeholders = relationship(
         "TemplatePlaceholder",
         back_populates="template",
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer, Text, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class TemplateRevision(Base):
+    """
+    Immutable snapshot of a template version, written the first time that
+    version is used to send. Templated emails re-render their bodies from it.
+    No foreign key: revisions outlive a deleted template.
+    """
+
+    __tablename__ = "template_revisions"
+    __table_args__ = (UniqueConstraint("template_id", "version"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+
+    template_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    version: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    subject_template: Mapped[str | None] = mapped_column(Text, nullable=True)
+    body_text_template: Mapped[str | None] = mapped_column(Text, nullable=True)
+    body_html_template: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class UploadSession(Base):
+    """
+    A resumable upload: created with the file's size, filled with ranged PUTs
+    in order, then completed. Once complete, its id is the blob id sends
+    reference; the file stays in the uploads directory under storage_path.
+    """
+
+    __tablename__ = "upload_sessions"
+
+    # uuid4 hex, also the blob id
+    id: Mapped[str] = mapped_column(String(32), primary_key=True)
+
+    filename: Mapped[str] = mapped_column(String(512), nullable=False)
+    mime_type: Mapped[str] = mapped_column(String(128), nullable=False)
+    size_bytes: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    received_bytes: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    # Expected sha256 if the client gave one, the verified one once complete
+    sha256: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    storage_path: Mapped[str] = mapped_column(String(1024), nullable=False)
+    # "<end>:<sha256>" per recorded range, one per line, as computed from the
+    # received bytes; completion checks the file against them.
+    range_digests: Mapped[str] = mapped_column(Text, nullable=False, default="")
+
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
+    completed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
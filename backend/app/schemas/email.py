@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from datetime import datetime
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 
 class EmailAttachmentIn(BaseModel):
@@ -18,18 +18,42 @@ class EmailAttachmentIn(BaseModel):
     )
 
 
+class EmailUploadRef(BaseModel):
+    """A completed upload session (/api/uploads) to attach by id."""
+
+    upload_id: str = Field(..., min_length=1, max_length=32)
+    disposition: str = Field(default="attachment", pattern="^(attachment|inline)$")
+    content_id: str | None = Field(default=None, max_length=256)
+
+
 class EmailSendRequest(BaseModel):
     to: str = Field(..., min_length=3, max_length=320)
-    subject: str = Field(..., min_length=1, max_length=998)
+    subject: str | None = Field(default=None, min_length=1, max_length=998)
     body_text: str | None = None
     body_html: str | None = None
     attachments: list[EmailAttachmentIn] = Field(default_factory=list)
+    uploads: list[EmailUploadRef] = Field(default_factory=list)
+
+    # Send from a template: the server renders subject and bodies from these
+    # and stores only the template reference and values.
+    template_id: int | None = None
+    template_values: dict[str, str] = Field(default_factory=dict)
+
+    @model_validator(mode="after")
+    def check_content(self):
+        if self.template_id is None:
+            if self.subject is None:
+                raise ValueError("subject is required unless template_id is given")
+        elif self.subject is not None or self.body_text is not None or self.body_html is not None:
+            raise ValueError("subject and bodies come from the template when template_id is given")
+        return self
 
 
 class EmailSendResponse(BaseModel):
     id: int
     sent_at: datetime
     send_count: int
+    account_id: int | None = None
 
     class Config:
         from_attributes = True
@@ -42,6 +66,9 @@ class EmailHistoryItem(BaseModel):
     sent_at: datetime
     send_count: int
     responded: bool
+    account_id: int | None = None
+    # True for rows served from archived_emails (history?include_archived=true)
+    archived: bool = False
 
     relative_time: str
     status_emoji: str
@@ -56,6 +83,14 @@ class EmailHistoryResponse(BaseModel):
     offset: int
     total: int
 
+class RetentionRunResponse(BaseModel):
+    archived: int
+    batches: int
+    remaining: bool
+    files_deleted: int
+    bytes_freed: int
+
+
 class EmailMarkRespondedRequest(BaseModel):
     responded: bool = True
 
@@ -64,6 +99,53 @@ class EmailActionResponse(BaseModel):
     id: int
     sent_at: datetime
     send_count: int
+    account_id: int | None = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class EmailBulkFilter(BaseModel):
+    responded: bool | None = None
+    to: str | None = Field(default=None, min_length=1, max_length=320)
+    sent_before: datetime | None = None
+    sent_after: datetime | None = None
+
+    @model_validator(mode="after")
+    def check_criteria(self):
+        # An empty filter would select every email
+        if all(value is None for value in self.model_dump().values()):
+            raise ValueError("Filter needs at least one of responded, to, sent_before, sent_after")
+        return self
+
+
+class EmailBulkRequest(BaseModel):
+    ids: list[int] | None = Field(default=None, min_length=1, max_length=1000)
+    filter: EmailBulkFilter | None = None
+
+    @model_validator(mode="after")
+    def check_selection(self):
+        if self.ids is None and self.filter is None:
+            raise ValueError("Provide ids, filter, or both")
+        return self
+
+
+class EmailBulkMarkRespondedRequest(EmailBulkRequest):
+    responded: bool = True
+
+
+class EmailBulkResult(BaseModel):
+    id: int
+    status: str
+    detail: str | None = None
+
+
+class EmailBulkResponse(BaseModel):
+    matched: int
+    results: list[EmailBulkResult]
+
+
+class EmailBulkResendResponse(EmailBulkResponse):
+    job_id: str
+    # Emails still queued or being sent; their results say "queued"
+    pending: int
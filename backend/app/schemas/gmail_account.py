@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from datetime import date, datetime
+
+from pydantic import BaseModel, Field
+
+
+class GmailAccountRead(BaseModel):
+    id: int
+    email_address: str
+    active: bool
+    daily_send_limit: int
+    sends_today: int
+    quota_date: date | None
+    remaining_today: int = 0
+    created_at: datetime
+    last_used_at: datetime | None
+    history_id: str | None = None
+    watch_expires_at: datetime | None = None
+
+    class Config:
+        from_attributes = True
+
+
+class GmailAccountUpdate(BaseModel):
+    daily_send_limit: int | None = Field(default=None, ge=0)
+    active: bool | None = None
+
+
+class GmailWatchResult(BaseModel):
+    account_id: int
+    status: str
+    expires_at: datetime | None = None
+    error: str | None = None
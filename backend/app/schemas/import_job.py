@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class ImportJobRead(BaseModel):
+    id: int
+    status: str
+    running: bool = False
+    pages_done: int
+    imported_count: int
+    skipped_count: int
+    failed_count: int
+    estimated_total: int | None
+    error: str | None
+    started_at: datetime
+    updated_at: datetime
+    finished_at: datetime | None
+
+    class Config:
+        from_attributes = True
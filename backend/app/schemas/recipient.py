@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class RecipientRead(BaseModel):
+    id: int
+    address: str
+    domain: str
+    name: str | None
+    sent_count: int
+    replied_count: int
+    avg_response_seconds: float | None
+    first_sent_at: datetime | None
+    last_sent_at: datetime | None
+    last_replied_at: datetime | None
+
+    class Config:
+        from_attributes = True
+
+
+class RecipientEmailRead(BaseModel):
+    id: int
+    subject: str
+    sent_at: datetime
+    send_count: int
+    responded: bool
+    responded_at: datetime | None
+    archived: bool
+
+
+class RecipientDetail(RecipientRead):
+    emails: list[RecipientEmailRead]
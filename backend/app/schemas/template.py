@@ -20,6 +20,7 @@ class TemplateUpdate(TemplateBase):
 
 class TemplateRead(TemplateBase):
     id: int
+    version: int
 
     class Config:
         from_attributes = True
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+
+class UploadCreate(BaseModel):
+    filename: str = Field(..., min_length=1, max_length=512)
+    mime_type: str = Field(default="application/octet-stream", min_length=1, max_length=128)
+    size_bytes: int = Field(..., gt=0)
+    sha256: str | None = Field(
+        default=None,
+        pattern=r"^[0-9a-fA-F]{64}$",
+        description="Hex sha256 of the whole file, checked when the upload is completed.",
+    )
+
+
+class UploadRead(BaseModel):
+    id: str
+    filename: str
+    mime_type: str
+    size_bytes: int
+    received_bytes: int
+    sha256: str | None
+    created_at: datetime
+    completed_at: datetime | None
+
+    class Config:
+        from_attributes = True
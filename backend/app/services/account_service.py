@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import re
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from fastapi import HTTPException
+from sqlalchemy import case, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.gmail.gmail_client import forget_gmail_service, get_gmail_service
+from app.gmail.send_limiter import get_send_bucket
+from app.gmail.token_store import delete_credentials, save_credentials
+from app.models.gmail_account import GmailAccount
+
+if TYPE_CHECKING:
+    from google.oauth2.credentials import Credentials
+    from googleapiclient.discovery import Resource
+
+
+def _today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+def remaining_quota(account: GmailAccount, today: date | None = None) -> int:
+    if account.quota_date != (today or _today()):
+        return account.daily_send_limit
+    return max(0, account.daily_send_limit - account.sends_today)
+
+
+def list_accounts(db: Session) -> list[GmailAccount]:
+    return list(db.scalars(select(GmailAccount).order_by(GmailAccount.id.asc())))
+
+
+def get_account(db: Session, account_id: int) -> GmailAccount | None:
+    return db.get(GmailAccount, account_id)
+
+
+def _token_file_for(email_address: str) -> str:
+    name = re.sub(r"[^a-z0-9._@-]", "_", email_address.lower())
+    return str(Path(get_settings().google_oauth_accounts_dir) / f"{name}.json")
+
+
+def register_account(db: Session, email_address: str, creds: Credentials) -> GmailAccount:
+    """
+    Store creds as a sender account, or refresh the token of an existing one.
+    """
+    email_address = email_address.strip().lower()
+    account = db.scalars(select(GmailAccount).where(GmailAccount.email_address == email_address)).first()
+
+    token_file = account.token_file if account is not None else _token_file_for(email_address)
+    save_credentials(token_file, creds)
+    forget_gmail_service(token_file)
+
+    if account is None:
+        account = GmailAccount(
+            email_address=email_address,
+            token_file=token_file,
+            daily_send_limit=get_settings().gmail_daily_send_limit,
+            sends_today=0,
+            created_at=datetime.now(timezone.utc),
+        )
+        db.add(account)
+
+    account.active = True
+    db.commit()
+    db.refresh(account)
+    return account
+
+
+def update_account(db: Session, account: GmailAccount, data: dict) -> GmailAccount:
+    for key, value in data.items():
+        setattr(account, key, value)
+    db.commit()
+    db.refresh(account)
+    return account
+
+
+def remove_account(db: Session, account: GmailAccount) -> None:
+    """
+    Deactivate the account and delete its token. The row is kept so emails
+    it sent stay attributed to it.
+    """
+    delete_credentials(account.token_file)
+    forget_gmail_service(account.token_file)
+    account.active = False
+    db.commit()
+
+
+def _reserve_quota(db: Session, account_id: int, today: date) -> bool:
+    """Atomically take one send from the account's daily quota."""
+    same_day = GmailAccount.quota_date == today
+    result = db.execute(
+        update(GmailAccount)
+        .where(
+            GmailAccount.id == account_id,
+            GmailAccount.active.is_(True),
+            or_(
+                GmailAccount.quota_date.is_(None),
+                GmailAccount.quota_date != today,
+                GmailAccount.sends_today < GmailAccount.daily_send_limit,
+            ),
+        )
+        .values(
+            sends_today=case((same_day, GmailAccount.sends_today + 1), else_=1),
+            quota_date=today,
+            last_used_at=datetime.now(timezone.utc),
+        ),
+        execution_options={"synchronize_session": False},
+    )
+    db.commit()
+    return result.rowcount == 1
+
+
+def release_send_quota(db: Session, account_id: int) -> None:
+    """Give back a reserved send that never reached Gmail."""
+    db.execute(
+        update(GmailAccount)
+        .where(
+            GmailAccount.id == account_id,
+            GmailAccount.quota_date == _today(),
+            GmailAccount.sends_today > 0,
+        )
+        .values(sends_today=GmailAccount.sends_today - 1),
+        execution_options={"synchronize_session": False},
+    )
+    db.commit()
+
+
+def reserve_send_account(db: Session) -> GmailAccount | None:
+    """
+    Pick the active account with the most quota left today and reserve one send on it.
+
+    Accounts whose rate bucket is empty are skipped when another one can send
+    right away; otherwise this waits on the best account's bucket.
+    Returns None when no sender accounts are configured.
+    """
+    accounts = list(db.scalars(select(GmailAccount).where(GmailAccount.active.is_(True))))
+    if not accounts:
+        return None
+
+    today = _today()
+    candidates = sorted(
+        (a for a in accounts if remaining_quota(a, today) > 0),
+        key=lambda a: remaining_quota(a, today),
+        reverse=True,
+    )
+
+    # A rate token taken for an account whose quota reservation then fails
+    # (used up or deactivated meanwhile) goes back, since nothing was sent.
+    for account in candidates:
+        bucket = get_send_bucket(account.id)
+        if bucket.try_acquire():
+            if _reserve_quota(db, account.id, today):
+                return account
+            bucket.release()
+
+    for account in candidates:
+        bucket = get_send_bucket(account.id)
+        bucket.acquire()
+        if _reserve_quota(db, account.id, today):
+            return account
+        bucket.release()
+
+    raise HTTPException(status_code=429, detail="Daily send quota exhausted on every Gmail account.")
+
+
+def acquire_send_service(db: Session) -> tuple[Resource, GmailAccount | None]:
+    """
+    Gmail service to send one message with, routed across sender accounts by
+    remaining quota. Falls back to the default token when no accounts are set up.
+    """
+    account = reserve_send_account(db)
+    if account is None:
+        service = get_gmail_service()
+        if not service:
+            raise HTTPException(status_code=401, detail="Not authenticated. Complete OAuth login first.")
+        return service, None
+
+    service = get_gmail_service(account.token_file)
+    if not service:
+        release_send_quota(db, account.id)
+        get_send_bucket(account.id).release()
+        raise HTTPException(
+            status_code=401,
+            detail=f"Gmail account {account.email_address} needs to be re-authenticated.",
+        )
+    return service, account
+
+
+def can_send(db: Session) -> bool:
+    has_accounts = db.scalar(select(GmailAccount.id).where(GmailAccount.active.is_(True)).limit(1)) is not None
+    return has_accounts or get_gmail_service() is not None
+
+
+def get_account_service(db: Session, account_id: int | None) -> Resource | None:
+    """Gmail service for the mailbox an email was sent from."""
+    if account_id is None:
+        return get_gmail_service()
+
+    account = db.get(GmailAccount, account_id)
+    if account is None or not account.active:
+        return None
+    return get_gmail_service(account.token_file)
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from collections.abc import Iterable
+from datetime import datetime, timedelta, timezone
+from typing import BinaryIO
+
+from fastapi import HTTPException
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.core.metrics import DUPLICATE_SENDS
+from app.models.email import Email
+from app.models.recent_send import RecentSend
+from app.services.recipient_service import parse_recipients
+
+# Expired fingerprints are deleted at most this often per process
+PRUNE_INTERVAL_SECONDS = 60
+
+_prune_lock = threading.Lock()
+_last_prune = 0.0
+
+
+def attachment_digest(attachment: dict) -> str:
+    """Digest of attachment metadata, for JSON sends that reference stored files."""
+    keys = ("filename", "mime_type", "size_bytes", "disposition", "content_id", "storage_path")
+    return hashlib.sha256(json.dumps([attachment.get(k) for k in keys]).encode()).hexdigest()
+
+
+def file_digest(file: BinaryIO) -> str:
+    """sha256 of an uploaded file's content; the file is rewound afterwards."""
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: file.read(1024 * 1024), b""):
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def send_fingerprint(
+    to: str,
+    subject: str | None,
+    body_text: str | None,
+    body_html: str | None,
+    attachments: Iterable[tuple[str, str]] = (),
+) -> str:
+    """
+    sha256 over the recipient set (order and case insensitive), subject,
+    bodies and (filename, digest) of each attachment.
+    """
+    parts = [
+        ",".join(sorted(p.address for p in parse_recipients(to))),
+        subject or "",
+        body_text or "",
+        body_html or "",
+        *(f"{name}\0{digest}" for name, digest in sorted(attachments)),
+    ]
+    digest = hashlib.sha256()
+    for part in parts:
+        # Length-prefixed so field boundaries cannot be shifted
+        encoded = part.encode()
+        digest.update(len(encoded).to_bytes(8, "big"))
+        digest.update(encoded)
+    return digest.hexdigest()
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def _prune(db: Session, cutoff: datetime) -> None:
+    global _last_prune
+    with _prune_lock:
+        if time.monotonic() - _last_prune < PRUNE_INTERVAL_SECONDS:
+            return
+        _last_prune = time.monotonic()
+    db.execute(
+        delete(RecentSend).where(RecentSend.created_at < cutoff).execution_options(synchronize_session=False)
+    )
+
+
+def claim_send(db: Session, fingerprint: str) -> Email | None:
+    """
+    Reserve a fingerprint before sending. Returns None if the caller may send,
+    or the earlier email when an identical send within the window is collapsed
+    into it. Raises 409 for duplicates under the reject action and for
+    duplicates of a send that has not finished yet.
+    """
+    settings = get_settings()
+    window = settings.duplicate_send_window_seconds
+    if window <= 0:
+        return None
+
+    now = datetime.now(timezone.utc)
+    cutoff = now - timedelta(seconds=window)
+    _prune(db, cutoff)
+    try:
+        db.add(RecentSend(fingerprint=fingerprint, email_id=None, created_at=now))
+        db.commit()
+        return None
+    except IntegrityError:
+        db.rollback()
+
+    existing = db.get(RecentSend, fingerprint)
+    if existing is None:
+        # Pruned between the insert and this read, so it was stale anyway
+        return None
+    if _as_utc(existing.created_at) < cutoff:
+        # Stale row not pruned yet: take it over unless another request just did
+        taken = db.execute(
+            update(RecentSend)
+            .where(RecentSend.fingerprint == fingerprint, RecentSend.created_at < cutoff)
+            .values(email_id=None, created_at=now)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        if taken:
+            return None
+        db.refresh(existing)
+
+    age = int((now - _as_utc(existing.created_at)).total_seconds())
+    if existing.email_id is None:
+        DUPLICATE_SENDS.inc("in_flight")
+        raise HTTPException(status_code=409, detail="An identical email is already being sent")
+
+    email = db.get(Email, existing.email_id)
+    if settings.duplicate_send_action == "reject" or email is None:
+        DUPLICATE_SENDS.inc("rejected")
+        raise HTTPException(
+            status_code=409,
+            detail=f"Identical to email {existing.email_id} sent {age}s ago",
+        )
+
+    DUPLICATE_SENDS.inc("collapsed")
+    return email
+
+
+def complete_send(db: Session, fingerprint: str, email_id: int) -> None:
+    """Attach the sent email to its reservation so later duplicates collapse into it."""
+    if get_settings().duplicate_send_window_seconds <= 0:
+        return
+    db.execute(update(RecentSend).where(RecentSend.fingerprint == fingerprint).values(email_id=email_id))
+    db.commit()
+
+
+def release_send(db: Session, fingerprint: str) -> None:
+    """Drop a reservation whose send failed, so a retry goes through."""
+    if get_settings().duplicate_send_window_seconds <= 0:
+        return
+    db.rollback()
+    db.execute(delete(RecentSend).where(RecentSend.fingerprint == fingerprint, RecentSend.email_id.is_(None)))
+    db.commit()
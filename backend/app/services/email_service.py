@@ -2,20 +2,63 @@ from __future__ import annotations
 
 from fastapi import HTTPException
 
-from datetime import datetime, timezone
-
-from sqlalchemy import func, select
+import logging
+import threading
+import uuid
+from collections import OrderedDict
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from functools import partial
+
+from sqlalchemy import DateTime, and_, bindparam, delete, func, literal, or_, select, union_all, update
 from sqlalchemy.orm import Session
 
-from app.core.time_utils import format_relative_time, pick_status_emoji
+from app.core.events import BROKER
+from app.core.time_utils import (
+    RESPONDED_EMOJI,
+    STATUS_EMOJIS,
+    batch_status_and_relative_time,
+    status_change_minutes,
+    to_epoch,
+)
+from app.core.timing import timed
+from app.core.workers import get_send_executor
+from app.db.session import SessionLocal
+from app.models.archived_email import ArchivedEmail
 from app.models.email import Email
 from app.models.email_attachment import EmailAttachment
-from app.services.settings_service import get_or_create_settings
+from app.models.email_body import EmailBody
+from app.services.settings_service import get_settings_or_default
+from app.services.template_service import render_for_send
 from app.models.email_attachment import EmailAttachment
 
 from app.gmail.reply_detector import check_thread_for_reply
-from app.gmail.gmail_client import get_gmail_service
-from app.gmail.gmail_sender import send_email_via_gmail
+from app.gmail.gmail_sender import prepare_raw_message, send_raw_message, send_was_rejected
+from app.services.account_service import acquire_send_service, get_account_service, release_send_quota
+from app.services.recipient_service import ReplyChange, record_replies, record_resend, record_sends, unlink_emails
+from app.services.reply_search_service import detect_replies_by_search
+
+logger = logging.getLogger(__name__)
+
+# How often the stream checks for emails that moved to the next status color
+STATUS_TICK_SECONDS = 30
+
+
+def apply_template(db: Session, data: dict) -> dict:
+    """
+    Fill subject and bodies of a send request from its template, if it names one.
+    Also adds the template_version and compact template_values stored on the email.
+    """
+    template_id = data.get("template_id")
+    if template_id is None:
+        return data
+
+    rendered = render_for_send(db, template_id, data.get("template_values") or {})
+    if rendered is None:
+        raise HTTPException(status_code=404, detail="Template not found")
+    data.update(rendered)
+    return data
 
 
 def create_email(
@@ -24,14 +67,17 @@ def create_email(
     *,
     gmail_message_id: str | None = None,
     gmail_thread_id: str | None = None,
+    account_id: int | None = None,
 ) -> Email:
     attachments = data.pop("attachments", [])
+    # Templated sends re-render their bodies from the template revision
+    templated = data.get("template_id") is not None
 
     email = Email(
         to=data["to"],
         subject=data["subject"],
-        body_text=data.get("body_text"),
-        body_html=data.get("body_html"),
+        body_text=None if templated else data.get("body_text"),
+        body_html=None if templated else data.get("body_html"),
         sent_at=datetime.now(timezone.utc),
         responded=False,
         responded_at=None,
@@ -39,11 +85,16 @@ def create_email(
         last_checked_at=None,
         gmail_message_id=gmail_message_id,
         gmail_thread_id=gmail_thread_id,
+        account_id=account_id,
+        template_id=data.get("template_id"),
+        template_version=data.get("template_version") if templated else None,
+        template_values=data.get("template_values") if templated else None,
     )
 
     db.add(email)
-    db.commit()
-    db.refresh(email)
+    with timed("db_commit"):
+        db.commit()
+        db.refresh(email)
 
     for a in attachments:
         db.add(
@@ -57,19 +108,65 @@ def create_email(
                 content_id=a.get("content_id"),
             )
         )
+    record_sends(db, [(email.id, email.to, email.sent_at)])
 
-    db.commit()
-    db.refresh(email)
+    with timed("db_commit"):
+        db.commit()
+        db.refresh(email)
+    publish_email_events(db, "sent", [email.id])
     return email
 
 
-def list_history(db: Session, limit: int, offset: int) -> dict:
-    total = db.scalar(select(func.count()).select_from(Email)) or 0
+def send_with_account_pool(
+    db: Session,
+    *,
+    to: str,
+    subject: str,
+    body_text: str | None,
+    body_html: str | None,
+    attachments: list[dict] | None = None,
+) -> tuple[dict[str, str], int | None]:
+    """
+    Send through the sender account with the most quota left.
+    Returns the Gmail ids and the account id (None for the default token).
+    """
+    service, account = acquire_send_service(db)
+    try:
+        raw = prepare_raw_message(
+            to=to,
+            subject=subject,
+            body_text=body_text,
+            body_html=body_html,
+            attachments=attachments,
+        )
+    except Exception:
+        # Nothing reached Gmail
+        if account is not None:
+            release_send_quota(db, account.id)
+        raise
+
+    try:
+        ids = send_raw_message(service, raw)
+    except Exception as exc:
+        # Keep the reservation unless Gmail certainly refused the message:
+        # after a timeout or 5xx it may have gone out and counts against the quota.
+        if account is not None and send_was_rejected(exc):
+            release_send_quota(db, account.id)
+        raise
+
+    return ids, account.id if account is not None else None
+
+
+_HISTORY_COLUMNS = ("id", "to", "subject", "sent_at", "send_count", "responded", "account_id")
 
-    stmt = select(Email).order_by(Email.id.desc()).limit(limit).offset(offset)
-    emails = list(db.scalars(stmt).all())
 
-    settings = get_or_create_settings(db)
+def _live_history_select():
+    return select(*(getattr(Email, c) for c in _HISTORY_COLUMNS), literal(False).label("archived"))
+
+
+def _history_items(db: Session, rows: Sequence) -> list[dict]:
+    """History items (status emoji and relative time included) for rows of _HISTORY_COLUMNS + archived."""
+    settings = get_settings_or_default(db)
     thresholds = {
         "t_white_minutes": settings.t_white_minutes,
         "t_blue_minutes": settings.t_blue_minutes,
@@ -77,25 +174,14 @@ def list_history(db: Session, limit: int, offset: int) -> dict:
         "t_red_minutes": settings.t_red_minutes,
     }
 
-    now = datetime.now(timezone.utc)
-    items = []
-
-    for e in emails:
-        sent_at = e.sent_at
-        if sent_at.tzinfo is None:
-            sent_at = sent_at.replace(tzinfo=timezone.utc)
-
-        elapsed_minutes = int((now - sent_at).total_seconds() // 60)
-        if elapsed_minutes < 0:
-            elapsed_minutes = 0
-
-        relative_time = format_relative_time(sent_at, now=now)
+    buckets, relative_times = batch_status_and_relative_time(
+        [to_epoch(e.sent_at) for e in rows],
+        thresholds,
+    )
 
-        if e.responded:
-            status_emoji = "🟢"
-        else:
-            status_emoji = pick_status_emoji(elapsed_minutes, thresholds)
+    items = []
 
+    for e, bucket, relative_time in zip(rows, buckets, relative_times):
         items.append(
             {
                 "id": e.id,
@@ -104,23 +190,114 @@ def list_history(db: Session, limit: int, offset: int) -> dict:
                 "sent_at": e.sent_at,
                 "send_count": e.send_count,
                 "responded": e.responded,
+                "account_id": e.account_id,
+                "archived": e.archived,
                 "relative_time": relative_time,
-                "status_emoji": status_emoji,
+                "status_emoji": RESPONDED_EMOJI if e.responded else STATUS_EMOJIS[bucket],
             }
         )
+    return items
+
+
+def list_history(db: Session, limit: int, offset: int, include_archived: bool = False) -> dict:
+    live = _live_history_select()
+    total = db.scalar(select(func.count()).select_from(Email)) or 0
+
+    if include_archived:
+        archived = select(
+            *(getattr(ArchivedEmail, c) for c in _HISTORY_COLUMNS), literal(True).label("archived")
+        )
+        total += db.scalar(select(func.count()).select_from(ArchivedEmail)) or 0
+        rows = union_all(live, archived).subquery()
+        stmt = select(rows).order_by(rows.c.id.desc()).limit(limit).offset(offset)
+    else:
+        stmt = live.order_by(Email.id.desc()).limit(limit).offset(offset)
+    emails = db.execute(stmt).all()
 
     return {
-        "items": items,
+        "items": _history_items(db, emails),
         "limit": limit,
         "offset": offset,
         "total": total,
     }
 
+
+def _read_history_items(db: Session, ids: list[int]) -> Iterator[dict]:
+    # A generator, so the rows are only read if someone is subscribed
+    for start in range(0, len(ids), 1000):
+        chunk = ids[start : start + 1000]
+        rows = db.execute(_live_history_select().where(Email.id.in_(chunk)).order_by(Email.id)).all()
+        yield from _history_items(db, rows)
+
+
+def publish_email_events(db: Session, event_type: str, ids: list[int]) -> None:
+    """
+    Push change events for the given emails to stream subscribers: the row as
+    a history item, or just {"id"} for rows that left the table. Call after commit.
+    """
+    if not ids:
+        return
+    if event_type in ("deleted", "archived"):
+        BROKER.publish(event_type, ({"id": i} for i in ids))
+    else:
+        BROKER.publish(event_type, _read_history_items(db, ids))
+
+
+def publish_status_changes(db: Session, since: datetime, now: datetime) -> None:
+    """
+    Publish "status" events for unanswered emails whose status color changed
+    between since and now. A color changes once the elapsed minutes exceed a
+    threshold, so each threshold maps to one sent_at range (uses the sent_at index).
+    """
+    if not BROKER.listening():
+        return
+    settings = get_settings_or_default(db)
+    change_minutes = status_change_minutes(
+        {
+            "t_white_minutes": settings.t_white_minutes,
+            "t_blue_minutes": settings.t_blue_minutes,
+            "t_yellow_minutes": settings.t_yellow_minutes,
+        }
+    )
+    ranges = []
+    for minutes in change_minutes:
+        crossed_after = timedelta(minutes=minutes + 1)
+        ranges.append(and_(Email.sent_at > since - crossed_after, Email.sent_at <= now - crossed_after))
+    ids = list(db.scalars(select(Email.id).where(Email.responded.is_(False), or_(*ranges)).order_by(Email.id)))
+    publish_email_events(db, "status", ids)
+
+
+def start_status_event_loop() -> threading.Event:
+    """Publish status color changes every STATUS_TICK_SECONDS in a daemon thread; set the event to stop."""
+    stop = threading.Event()
+
+    def loop() -> None:
+        since = datetime.now(timezone.utc)
+        while not stop.wait(STATUS_TICK_SECONDS):
+            now = datetime.now(timezone.utc)
+            db = SessionLocal()
+            try:
+                publish_status_changes(db, since, now)
+            except Exception:
+                logger.exception("status event tick failed")
+            finally:
+                db.close()
+            since = now
+
+    threading.Thread(target=loop, name="status-events", daemon=True).start()
+    return stop
+
+
 def mark_responded(db: Session, email_id: int, responded: bool = True) -> Email | None:
     email = db.get(Email, email_id)
     if email is None:
         return None
 
+    if responded and not email.responded:
+        record_replies(db, [ReplyChange(email.id, email.sent_at, datetime.now(timezone.utc), 1)])
+    elif not responded and email.responded:
+        record_replies(db, [ReplyChange(email.id, email.sent_at, email.responded_at, -1)])
+
     if responded:
         email.responded = True
         email.responded_at = datetime.now(timezone.utc)
@@ -132,6 +309,7 @@ def mark_responded(db: Session, email_id: int, responded: bool = True) -> Email
 
     db.commit()
     db.refresh(email)
+    publish_email_events(db, "responded", [email.id])
     return email
 
 
@@ -145,13 +323,9 @@ def resend_email(db: Session, email_id: int) -> Email | None:
     if email is None:
         return None
     
-    service = get_gmail_service()
-    if not service:
-        raise HTTPException(status_code=401, detail="Not authenticated. Complete OAuth login first.")
-    
     # Send via Gmail (same content, new message)
-    ids = send_email_via_gmail(
-        service=service,
+    ids, account_id = send_with_account_pool(
+        db,
         to=email.to,
         subject=email.subject,
         body_text=email.body_text,
@@ -169,18 +343,25 @@ def resend_email(db: Session, email_id: int) -> Email | None:
         ],
     )
     
+    if email.responded:
+        record_replies(db, [ReplyChange(email.id, email.sent_at, email.responded_at, -1)])
+
     # Update the SAME row
     email.sent_at = datetime.now(timezone.utc)
     email.send_count = (email.send_count or 1) + 1
     email.gmail_message_id = ids.get("gmail_message_id")
     email.gmail_thread_id = ids.get("gmail_thread_id")
+    email.account_id = account_id
     email.responded = False
     email.responded_at = None
     email.last_checked_at = None
-    
-    db.commit()
-    db.refresh(email)
-    
+    record_resend(db, email.id, email.sent_at)
+
+    with timed("db_commit"):
+        db.commit()
+        db.refresh(email)
+    publish_email_events(db, "resent", [email.id])
+
     return email
 
 def check_reply(db: Session, email_id: int) -> dict:
@@ -198,7 +379,8 @@ def check_reply(db: Session, email_id: int) -> dict:
         db.commit()
         return {"ok": False, "status": "missing_thread_id"}
 
-    service = get_gmail_service()
+    # Threads belong to the mailbox that sent the email
+    service = get_account_service(db, email.account_id)
     if not service:
         db.commit()
         return {"ok": False, "status": "not_authenticated"}
@@ -213,9 +395,13 @@ def check_reply(db: Session, email_id: int) -> dict:
         email.responded = True
         email.responded_source = "gmail"
         email.responded_at = datetime.now(timezone.utc)
+        record_replies(db, [ReplyChange(email.id, email.sent_at, email.responded_at, 1)])
 
-    db.commit()
-    db.refresh(email)
+    with timed("db_commit"):
+        db.commit()
+        db.refresh(email)
+    if result.replied:
+        publish_email_events(db, "responded", [email.id])
 
     return {
         "ok": True,
@@ -237,5 +423,262 @@ def delete_email(db: Session, email_id: int) -> bool:
     
     # Delete attachments automatically (cascade delete)
     db.delete(email)
+    unlink_emails(db, [email_id])
     db.commit()
+    publish_email_events(db, "deleted", [email_id])
     return True
+
+
+BULK_RESEND_LIMIT = 500
+# Finished bulk resend jobs are kept in memory for polling; the oldest go first
+BULK_RESEND_JOBS_KEPT = 100
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _bulk_conditions(ids: list[int] | None, filters: dict | None) -> list:
+    """
+    WHERE conditions for a bulk selection. Never empty: a selection without
+    ids or any filter criterion would hit every email.
+    """
+    conditions = []
+    if ids is not None:
+        conditions.append(Email.id.in_(ids))
+
+    filters = filters or {}
+    if filters.get("responded") is not None:
+        conditions.append(Email.responded == filters["responded"])
+    if filters.get("to"):
+        conditions.append(Email.to == filters["to"])
+    if filters.get("sent_before"):
+        conditions.append(Email.sent_at < _as_utc(filters["sent_before"]))
+    if filters.get("sent_after"):
+        conditions.append(Email.sent_at > _as_utc(filters["sent_after"]))
+
+    if not conditions:
+        raise HTTPException(status_code=400, detail="Bulk actions need ids or at least one filter criterion")
+    return conditions
+
+
+def _select_bulk_ids(db: Session, conditions: list) -> list[int]:
+    return list(db.scalars(select(Email.id).where(*conditions).order_by(Email.id.asc())))
+
+
+def _bulk_response(
+    ids: list[int] | None,
+    filters: dict | None,
+    matched: list[int],
+    results: list[dict],
+) -> dict:
+    if ids is not None:
+        # With a filter, a missing id may exist but simply not match it
+        missing_status = "not_matched" if filters else "not_found"
+        found = set(matched)
+        results += [{"id": i, "status": missing_status} for i in dict.fromkeys(ids) if i not in found]
+    return {"matched": len(matched), "results": results}
+
+
+def bulk_mark_responded(
+    db: Session,
+    *,
+    ids: list[int] | None,
+    filters: dict | None,
+    responded: bool = True,
+) -> dict:
+    """
+    Set-based version of mark_responded: one UPDATE and one commit for every
+    row selected by ids and/or filters.
+    """
+    conditions = _bulk_conditions(ids, filters)
+    matched = _select_bulk_ids(db, conditions)
+
+    if matched:
+        # Rows whose flag actually flips, for the recipient counters
+        flipping = db.execute(
+            select(Email.id, Email.sent_at, Email.responded_at).where(*conditions, Email.responded.is_(not responded))
+        ).all()
+        if responded:
+            values = {
+                "responded": True,
+                "responded_at": datetime.now(timezone.utc),
+                "responded_source": "manual",
+            }
+            record_replies(db, [ReplyChange(i, sent_at, values["responded_at"], 1) for i, sent_at, _ in flipping])
+        else:
+            values = {"responded": False, "responded_at": None, "responded_source": None}
+            record_replies(db, [ReplyChange(i, sent_at, at, -1) for i, sent_at, at in flipping])
+
+        db.execute(
+            update(Email).where(*conditions).values(**values),
+            execution_options={"synchronize_session": False},
+        )
+        db.commit()
+        publish_email_events(db, "responded", matched)
+
+    results = [{"id": i, "status": "updated"} for i in matched]
+    return _bulk_response(ids, filters, matched, results)
+
+
+def bulk_delete(db: Session, *, ids: list[int] | None, filters: dict | None) -> dict:
+    """
+    Set-based version of delete_email. Attachments and bodies are removed with
+    a DELETE each first, since the ORM cascade does not apply to bulk statements.
+    """
+    conditions = _bulk_conditions(ids, filters)
+    matched = _select_bulk_ids(db, conditions)
+
+    if matched:
+        selected = select(Email.id).where(*conditions)
+        db.execute(
+            delete(EmailAttachment).where(EmailAttachment.email_id.in_(selected)),
+            execution_options={"synchronize_session": False},
+        )
+        db.execute(
+            delete(EmailBody).where(EmailBody.email_id.in_(selected)),
+            execution_options={"synchronize_session": False},
+        )
+        unlink_emails(db, selected)
+        db.execute(
+            delete(Email).where(*conditions),
+            execution_options={"synchronize_session": False},
+        )
+        db.commit()
+        publish_email_events(db, "deleted", matched)
+
+    results = [{"id": i, "status": "deleted"} for i in matched]
+    return _bulk_response(ids, filters, matched, results)
+
+
+def _resend_in_worker(email_id: int) -> dict:
+    # Each worker gets its own session and Gmail service; neither is thread-safe.
+    db = SessionLocal()
+    try:
+        email = resend_email(db, email_id=email_id)
+        if email is None:
+            return {"id": email_id, "status": "not_found"}
+        return {"id": email_id, "status": "resent"}
+    except HTTPException as e:
+        return {"id": email_id, "status": "error", "detail": str(e.detail)}
+    except Exception as e:
+        return {"id": email_id, "status": "error", "detail": str(e)}
+    finally:
+        db.close()
+
+
+@dataclass
+class BulkResendJob:
+    id: str
+    # email id -> result; "queued" until its send finishes
+    results: dict[int, dict]
+    # not_found / not_matched entries for requested ids outside the selection
+    missing: list[dict]
+
+
+_bulk_resend_jobs: OrderedDict[str, BulkResendJob] = OrderedDict()
+_bulk_resend_lock = threading.Lock()
+
+
+def _bulk_resend_snapshot(job: BulkResendJob) -> dict:
+    with _bulk_resend_lock:
+        results = [dict(r) for r in job.results.values()]
+    return {
+        "job_id": job.id,
+        "matched": len(results),
+        "pending": sum(r["status"] == "queued" for r in results),
+        "results": results + job.missing,
+    }
+
+
+def bulk_resend(db: Session, *, ids: list[int] | None, filters: dict | None) -> dict | None:
+    """
+    Queue every selected email on the shared send worker pool and return at
+    once with a job id; get_bulk_resend_job reports per-id results as the
+    sends finish. Returns None if the selection is larger than BULK_RESEND_LIMIT.
+    """
+    matched = _select_bulk_ids(db, _bulk_conditions(ids, filters))
+    if len(matched) > BULK_RESEND_LIMIT:
+        return None
+
+    job = BulkResendJob(
+        id=uuid.uuid4().hex,
+        results={i: {"id": i, "status": "queued"} for i in matched},
+        missing=_bulk_response(ids, filters, matched, [])["results"],
+    )
+    with _bulk_resend_lock:
+        _bulk_resend_jobs[job.id] = job
+        while len(_bulk_resend_jobs) > BULK_RESEND_JOBS_KEPT:
+            _bulk_resend_jobs.popitem(last=False)
+
+    def record(email_id: int, future) -> None:
+        if future.cancelled():
+            # Pool shut down before the send started
+            result = {"id": email_id, "status": "error", "detail": "cancelled"}
+        else:
+            result = future.result()
+        with _bulk_resend_lock:
+            job.results[email_id] = result
+
+    executor = get_send_executor()
+    for email_id in matched:
+        executor.submit(_resend_in_worker, email_id).add_done_callback(partial(record, email_id))
+    return _bulk_resend_snapshot(job)
+
+
+def get_bulk_resend_job(job_id: str) -> dict | None:
+    """Progress of a bulk resend queued by this process, or None if unknown or expired."""
+    with _bulk_resend_lock:
+        job = _bulk_resend_jobs.get(job_id)
+    return _bulk_resend_snapshot(job) if job is not None else None
+
+
+def bulk_check_replies(db: Session, *, ids: list[int] | None, filters: dict | None) -> dict:
+    """
+    Reply check for every selected email through Gmail searches grouped by
+    recipient and send window (reply_search_service) instead of one thread
+    fetch per email. Replies get the reply's receive time as responded_at.
+    """
+    conditions = _bulk_conditions(ids, filters)
+    rows = db.execute(
+        select(Email.id, Email.to, Email.sent_at, Email.gmail_thread_id, Email.account_id, Email.responded)
+        .where(*conditions)
+        .order_by(Email.id.asc())
+    ).all()
+    matched = [r.id for r in rows]
+    open_rows = [r for r in rows if not r.responded and r.gmail_thread_id]
+    outcomes = detect_replies_by_search(db, open_rows) if open_rows else {}
+
+    now = datetime.now(timezone.utc)
+    if open_rows:
+        db.execute(
+            update(Email).where(*conditions, Email.responded.is_(False), Email.gmail_thread_id.is_not(None))
+            .values(last_checked_at=now),
+            execution_options={"synchronize_session": False},
+        )
+    replied = [(r, outcomes[r.id].replied_at) for r in open_rows if outcomes[r.id].status == "replied"]
+    if replied:
+        responded_at = bindparam("responded_at_value", type_=DateTime(timezone=True))
+        table = Email.__table__
+        db.execute(
+            table.update()
+            .where(table.c.id == bindparam("email_id"), table.c.responded.is_(False))
+            .values(responded=True, responded_source="gmail", responded_at=responded_at),
+            [{"email_id": r.id, "responded_at_value": at} for r, at in replied],
+        )
+        record_replies(db, [ReplyChange(r.id, r.sent_at, at, 1) for r, at in replied])
+    db.commit()
+    publish_email_events(db, "responded", [r.id for r, _ in replied])
+
+    results = []
+    for r in rows:
+        if r.responded:
+            results.append({"id": r.id, "status": "already_responded"})
+        elif not r.gmail_thread_id:
+            results.append({"id": r.id, "status": "missing_thread_id"})
+        else:
+            outcome = outcomes[r.id]
+            results.append({"id": r.id, "status": outcome.status, "detail": outcome.detail})
+    return _bulk_response(ids, filters, matched, results)
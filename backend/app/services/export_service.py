@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import csv
+import io
+from collections.abc import Iterator
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, noload, selectinload
+
+from app.core.responses import dumps
+from app.models.email import Email
+
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+BASE_FIELDS = [
+    "id",
+    "to",
+    "subject",
+    "sent_at",
+    "send_count",
+    "responded",
+    "responded_at",
+    "responded_source",
+    "last_checked_at",
+    "gmail_message_id",
+    "gmail_thread_id",
+]
+
+
+def _iso(value: datetime | None) -> str | None:
+    return value.isoformat() if value else None
+
+
+def export_fields(*, include_bodies: bool, include_attachments: bool) -> list[str]:
+    fields = list(BASE_FIELDS)
+    if include_bodies:
+        fields += ["body_text", "body_html"]
+    if include_attachments:
+        fields.append("attachments")
+    return fields
+
+
+def iter_export_rows(
+    db: Session,
+    *,
+    include_bodies: bool = False,
+    include_attachments: bool = False,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> Iterator[dict]:
+    """
+    Stream every email as a plain dict, oldest first.
+
+    Rows are fetched through a server-side cursor in batches of batch_size,
+    so memory stays flat no matter how large the table is.
+    """
+    stmt = select(Email).order_by(Email.id.asc()).execution_options(yield_per=batch_size)
+
+    if include_attachments:
+        stmt = stmt.options(selectinload(Email.attachments))
+    else:
+        stmt = stmt.options(noload(Email.attachments))
+
+    if include_bodies:
+        # One IN query per batch instead of a lazy load per row
+        stmt = stmt.options(selectinload(Email.body), selectinload(Email.template_revision))
+
+    for e in db.scalars(stmt):
+        row = {
+            "id": e.id,
+            "to": e.to,
+            "subject": e.subject,
+            "sent_at": _iso(e.sent_at),
+            "send_count": e.send_count,
+            "responded": e.responded,
+            "responded_at": _iso(e.responded_at),
+            "responded_source": e.responded_source,
+            "last_checked_at": _iso(e.last_checked_at),
+            "gmail_message_id": e.gmail_message_id,
+            "gmail_thread_id": e.gmail_thread_id,
+        }
+
+        if include_bodies:
+            row["body_text"] = e.body_text
+            row["body_html"] = e.body_html
+
+        if include_attachments:
+            row["attachments"] = [
+                {
+                    "filename": a.filename,
+                    "mime_type": a.mime_type,
+                    "size_bytes": a.size_bytes,
+                    "disposition": a.disposition,
+                    "content_id": a.content_id,
+                }
+                for a in e.attachments
+            ]
+
+        yield row
+
+
+def _chunked(rows: Iterator[dict], size: int) -> Iterator[list[dict]]:
+    chunk: list[dict] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def encode_ndjson(rows: Iterator[dict], batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[bytes]:
+    for chunk in _chunked(rows, batch_size):
+        yield b"".join(dumps(row) + b"\n" for row in chunk)
+
+
+def encode_csv(
+    rows: Iterator[dict],
+    fields: list[str],
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields)
+    writer.writeheader()
+
+    for chunk in _chunked(rows, batch_size):
+        for row in chunk:
+            if "attachments" in row:
+                row = {**row, "attachments": dumps(row["attachments"]).decode("utf-8")}
+            writer.writerow(row)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate(0)
+
+    # Header only, for an empty table
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
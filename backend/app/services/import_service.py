@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import threading
+from datetime import datetime, timezone
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.core.events import BROKER
+from app.core.metrics import BACKGROUND_QUEUE_DEPTH
+from app.db.session import SessionLocal
+from app.gmail.gmail_client import get_gmail_service
+from app.gmail.sent_importer import fetch_sent_metadata, list_sent_page
+from app.models.email import Email
+from app.models.enums import ImportJobStatus
+from app.models.import_job import ImportJob
+from app.services.recipient_service import record_sends
+
+_active_jobs: set[int] = set()
+_active_lock = threading.Lock()
+
+BACKGROUND_QUEUE_DEPTH.set_function("gmail_import", fn=lambda: len(_active_jobs))
+
+
+def get_import_job(db: Session, job_id: int) -> ImportJob | None:
+    return db.get(ImportJob, job_id)
+
+
+def get_or_create_import_job(db: Session) -> ImportJob:
+    """
+    Return the latest unfinished import job so it resumes from its checkpoint,
+    or create a new one if every previous job completed.
+    """
+    stmt = (
+        select(ImportJob)
+        .where(ImportJob.status != ImportJobStatus.completed.value)
+        .order_by(ImportJob.id.desc())
+        .limit(1)
+    )
+    job = db.scalars(stmt).first()
+    if job is not None:
+        return job
+
+    now = datetime.now(timezone.utc)
+    job = ImportJob(
+        status=ImportJobStatus.pending.value,
+        page_token=None,
+        pages_done=0,
+        imported_count=0,
+        skipped_count=0,
+        failed_count=0,
+        started_at=now,
+        updated_at=now,
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def is_import_running(job_id: int) -> bool:
+    with _active_lock:
+        return job_id in _active_jobs
+
+
+def _import_page(db: Session, service, job: ImportJob) -> bool:
+    """
+    Import one messages.list page and advance the checkpoint in the same commit.
+    Returns False once there are no more pages.
+    """
+    page = list_sent_page(service, page_token=job.page_token)
+    if job.estimated_total is None:
+        job.estimated_total = page.result_size_estimate
+
+    existing = set()
+    if page.message_ids:
+        existing = set(
+            db.scalars(select(Email.gmail_message_id).where(Email.gmail_message_id.in_(page.message_ids)))
+        )
+    new_ids = [m for m in page.message_ids if m not in existing]
+
+    metas, failed = fetch_sent_metadata(service, new_ids) if new_ids else ([], 0)
+
+    if metas:
+        inserted = db.execute(
+            insert(Email).returning(Email.id, Email.to, Email.sent_at),
+            [
+                {
+                    "gmail_message_id": m.gmail_message_id,
+                    "gmail_thread_id": m.gmail_thread_id or None,
+                    "to": m.to,
+                    "subject": m.subject,
+                    "sent_at": m.sent_at,
+                    "send_count": 1,
+                    "responded": False,
+                }
+                for m in metas
+            ],
+        )
+        record_sends(db, inserted.all())
+
+    job.imported_count += len(metas)
+    job.skipped_count += len(existing)
+    job.failed_count += failed
+    job.pages_done += 1
+    job.page_token = page.next_page_token
+    job.updated_at = datetime.now(timezone.utc)
+    db.commit()
+    if metas:
+        # Imported rows are older sends scattered through history; clients reload
+        BROKER.publish("imported", [{"count": len(metas)}])
+
+    return page.next_page_token is not None
+
+
+def run_import_job(job_id: int) -> None:
+    """
+    Page through the Gmail SENT label and bulk-insert missing emails.
+
+    Meant to run in the background. Each page commits its rows together with
+    the next page token, so a crashed or interrupted job resumes where it stopped.
+    """
+    with _active_lock:
+        if job_id in _active_jobs:
+            return
+        _active_jobs.add(job_id)
+
+    db = SessionLocal()
+    try:
+        job = db.get(ImportJob, job_id)
+        if job is None or job.status == ImportJobStatus.completed.value:
+            return
+
+        service = get_gmail_service()
+        if not service:
+            job.status = ImportJobStatus.failed.value
+            job.error = "not_authenticated"
+            job.updated_at = datetime.now(timezone.utc)
+            db.commit()
+            return
+
+        job.status = ImportJobStatus.running.value
+        job.error = None
+        db.commit()
+
+        try:
+            while _import_page(db, service, job):
+                pass
+        except Exception as e:
+            db.rollback()
+            job.status = ImportJobStatus.failed.value
+            job.error = str(e)[:2000]
+            job.updated_at = datetime.now(timezone.utc)
+            db.commit()
+            return
+
+        job.status = ImportJobStatus.completed.value
+        job.finished_at = datetime.now(timezone.utc)
+        job.updated_at = job.finished_at
+        db.commit()
+    finally:
+        db.close()
+        with _active_lock:
+            _active_jobs.discard(job_id)
@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.db.session import SessionLocal
+from app.gmail.gmail_client import get_gmail_service
+from app.gmail.history_sync import HistoryExpired, fetch_incoming_meta, list_history_since, start_watch
+from app.models.email import Email
+from app.models.enums import RespondedSource
+from app.models.gmail_account import GmailAccount
+from app.services.email_service import publish_email_events
+from app.services.recipient_service import ReplyChange, record_replies
+
+logger = logging.getLogger(__name__)
+
+# Gmail watches expire after 7 days; renew any that lapse within a day.
+WATCH_RENEW_BEFORE = timedelta(days=1)
+WATCH_CHECK_INTERVAL_SECONDS = 3600
+
+
+def decode_push_message(payload: dict) -> tuple[str, int] | None:
+    """
+    (emailAddress, historyId) from a Pub/Sub push body:
+    {"message": {"data": base64({"emailAddress": ..., "historyId": ...}), ...}, "subscription": ...}
+    """
+    data = (payload.get("message") or {}).get("data")
+    if not data:
+        return None
+    try:
+        decoded = json.loads(base64.b64decode(data + "=" * (-len(data) % 4), altchars=b"-_"))
+        return str(decoded["emailAddress"]).strip().lower(), int(decoded["historyId"])
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        return None
+
+
+def _mark_replies(db: Session, account: GmailAccount, incoming) -> list[int]:
+    """Mark unanswered emails in the threads of incoming messages as responded; returns their ids."""
+    thread_ids = {m.thread_id for m in incoming if m.thread_id}
+    if not thread_ids:
+        return []
+
+    emails = list(
+        db.scalars(
+            select(Email).where(
+                Email.gmail_thread_id.in_(thread_ids),
+                Email.responded.is_(False),
+                or_(Email.account_id == account.id, Email.account_id.is_(None)),
+            )
+        )
+    )
+    if not emails:
+        return []
+
+    # Only messages in threads we track are worth a metadata fetch
+    by_thread: dict[str, list[Email]] = {}
+    for e in emails:
+        by_thread.setdefault(e.gmail_thread_id, []).append(e)
+    service = get_gmail_service(account.token_file)
+    metas = fetch_incoming_meta(service, [m.id for m in incoming if m.thread_id in by_thread])
+
+    now = datetime.now(timezone.utc)
+    changes: list[ReplyChange] = []
+    for meta in metas:
+        if not meta.from_addr or meta.from_addr == account.email_address or meta.received_at is None:
+            continue
+        for e in by_thread.get(meta.thread_id, []):
+            sent_at = e.sent_at if e.sent_at.tzinfo else e.sent_at.replace(tzinfo=timezone.utc)
+            if not e.responded and meta.received_at > sent_at:
+                e.responded = True
+                e.responded_source = RespondedSource.gmail.value
+                # The reply's own receive time, so response times are exact
+                e.responded_at = meta.received_at
+                e.last_checked_at = now
+                changes.append(ReplyChange(e.id, sent_at, meta.received_at, 1))
+    record_replies(db, changes)
+    return [c.email_id for c in changes]
+
+
+def sync_account_history(db: Session, account: GmailAccount, notified_history_id: int) -> dict:
+    """
+    Incremental reply sync for one mailbox from its stored historyId up to now.
+    The first notification for an account only records the baseline.
+    """
+    service = get_gmail_service(account.token_file)
+    if service is None:
+        return {"status": "not_authenticated", "marked": 0}
+
+    if account.history_id is None:
+        account.history_id = str(notified_history_id)
+        db.commit()
+        return {"status": "baseline", "marked": 0}
+
+    if notified_history_id <= int(account.history_id):
+        return {"status": "up_to_date", "marked": 0}
+
+    try:
+        changes = list_history_since(service, account.history_id)
+    except HistoryExpired:
+        # Too far behind for history.list; restart from here and leave older
+        # replies to the per-email check.
+        logger.warning("history %s expired for %s; resetting baseline", account.history_id, account.email_address)
+        account.history_id = str(notified_history_id)
+        db.commit()
+        return {"status": "history_expired", "marked": 0}
+
+    marked = _mark_replies(db, account, changes.incoming)
+    account.history_id = str(max(int(changes.history_id), notified_history_id))
+    db.commit()
+    publish_email_events(db, "responded", marked)
+    return {"status": "synced", "marked": len(marked)}
+
+
+def sync_mailbox(email_address: str, history_id: int) -> dict:
+    db = SessionLocal()
+    try:
+        account = db.scalars(
+            select(GmailAccount).where(GmailAccount.email_address == email_address, GmailAccount.active.is_(True))
+        ).first()
+        if account is None:
+            return {"status": "unknown_account", "marked": 0}
+        return sync_account_history(db, account, history_id)
+    finally:
+        db.close()
+
+
+class PushCoalescer:
+    """
+    Debounces push notifications per mailbox: the first one schedules a sync
+    after `delay` seconds and later ones in that window only raise the target
+    historyId, so a burst costs one history.list. Syncs of one mailbox never overlap.
+    """
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self._pending: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._sync_locks: dict[str, threading.Lock] = {}
+
+    def notify(self, email_address: str, history_id: int) -> bool:
+        """Queue a sync; returns False if one was already scheduled (coalesced)."""
+        with self._lock:
+            scheduled = email_address in self._pending
+            self._pending[email_address] = max(history_id, self._pending.get(email_address, 0))
+            self._sync_locks.setdefault(email_address, threading.Lock())
+        if not scheduled:
+            timer = threading.Timer(self.delay, self._flush, args=(email_address,))
+            timer.daemon = True
+            timer.start()
+        return not scheduled
+
+    def _flush(self, email_address: str) -> None:
+        with self._sync_locks[email_address]:
+            with self._lock:
+                history_id = self._pending.pop(email_address, None)
+            if history_id is None:
+                return
+            try:
+                result = sync_mailbox(email_address, history_id)
+                logger.info("push sync %s@%s: %s", email_address, history_id, result)
+            except Exception:
+                logger.exception("push sync failed for %s", email_address)
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+
+_coalescer: PushCoalescer | None = None
+
+
+def get_push_coalescer() -> PushCoalescer:
+    global _coalescer
+    if _coalescer is None:
+        _coalescer = PushCoalescer(get_settings().gmail_push_debounce_seconds)
+    return _coalescer
+
+
+def renew_watches(db: Session, force: bool = False) -> list[dict]:
+    """(Re)start users.watch on active accounts whose watch is missing or expires within a day."""
+    topic = get_settings().gmail_pubsub_topic
+    if not topic:
+        return []
+
+    now = datetime.now(timezone.utc)
+    results = []
+    for account in list(db.scalars(select(GmailAccount).where(GmailAccount.active.is_(True)))):
+        expires_at = account.watch_expires_at
+        if expires_at is not None and expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        if not force and expires_at is not None and expires_at - now > WATCH_RENEW_BEFORE:
+            continue
+
+        service = get_gmail_service(account.token_file)
+        if service is None:
+            results.append({"account_id": account.id, "status": "not_authenticated"})
+            continue
+        try:
+            state = start_watch(service, topic)
+        except Exception as exc:
+            logger.exception("users.watch failed for %s", account.email_address)
+            results.append({"account_id": account.id, "status": "failed", "error": str(exc)})
+            continue
+
+        account.watch_expires_at = state.expires_at
+        if account.history_id is None:
+            account.history_id = state.history_id
+        db.commit()
+        results.append({"account_id": account.id, "status": "watching", "expires_at": state.expires_at})
+    return results
+
+
+def start_watch_renewal_loop() -> threading.Event:
+    """Check watches hourly in a daemon thread; set the event to stop."""
+    stop = threading.Event()
+
+    def loop() -> None:
+        while not stop.is_set():
+            db = SessionLocal()
+            try:
+                renew_watches(db)
+            except Exception:
+                logger.exception("watch renewal failed")
+            finally:
+                db.close()
+            stop.wait(WATCH_CHECK_INTERVAL_SECONDS)
+
+    threading.Thread(target=loop, name="gmail-watch-renewal", daemon=True).start()
+    return stop
@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import getaddresses
+
+from sqlalchemy import DateTime, bindparam, case, delete, insert, literal, select, union_all
+from sqlalchemy.orm import Session
+
+from app.models.archived_email import ArchivedEmail
+from app.models.email import Email
+from app.models.email_recipient import EmailRecipient
+from app.models.recipient import Recipient
+
+_recipients = Recipient.__table__
+
+
+@dataclass(frozen=True)
+class ParsedAddress:
+    address: str
+    domain: str
+    name: str | None
+
+
+@dataclass(frozen=True)
+class ReplyChange:
+    """An email whose responded flag flipped: delta is +1 (replied) or -1 (unmarked)."""
+
+    email_id: int
+    sent_at: datetime
+    responded_at: datetime | None
+    delta: int
+
+
+def parse_recipients(to: str) -> list[ParsedAddress]:
+    """Lower-cased, de-duplicated addresses from a To value ("a@x.com, Bob <b@y.com>")."""
+    parsed: dict[str, ParsedAddress] = {}
+    for name, addr in getaddresses([to or ""]):
+        address = addr.strip().lower()
+        local, _, domain = address.rpartition("@")
+        if not local or not domain or address in parsed:
+            continue
+        parsed[address] = ParsedAddress(address[:320], domain[:255], name.strip()[:255] or None)
+    return list(parsed.values())
+
+
+def _utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def _insert_missing(db: Session, rows: list[dict]) -> None:
+    # Concurrent sends to a new address may race; let the unique index decide.
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        db.execute(insert(Recipient), rows)
+        return
+    db.execute(dialect_insert(Recipient).on_conflict_do_nothing(index_elements=["address"]), rows)
+
+
+def _recipient_ids(db: Session, parsed: Iterable[ParsedAddress]) -> dict[str, int]:
+    """address -> recipient id, creating missing recipients."""
+    by_address = {p.address: p for p in parsed}
+    if not by_address:
+        return {}
+
+    ids = dict(db.execute(select(Recipient.address, Recipient.id).where(Recipient.address.in_(by_address))).all())
+    missing = [p for a, p in by_address.items() if a not in ids]
+    if missing:
+        _insert_missing(db, [{"address": p.address, "domain": p.domain, "name": p.name} for p in missing])
+        ids.update(
+            db.execute(
+                select(Recipient.address, Recipient.id).where(Recipient.address.in_([p.address for p in missing]))
+            ).all()
+        )
+    return ids
+
+
+def _count_sends(db: Session, sends: dict[int, list[datetime]]) -> None:
+    """Add len(times) sends per recipient id and widen first/last_sent_at."""
+    rows = [
+        {"rid": rid, "n": len(times), "first": min(times), "last": max(times)}
+        for rid, times in sends.items()
+        if times
+    ]
+    if not rows:
+        return
+    first = bindparam("first", type_=DateTime(timezone=True))
+    last = bindparam("last", type_=DateTime(timezone=True))
+    db.execute(
+        _recipients.update()
+        .where(_recipients.c.id == bindparam("rid"))
+        .values(
+            sent_count=_recipients.c.sent_count + bindparam("n"),
+            first_sent_at=case(
+                (_recipients.c.first_sent_at.is_(None) | (_recipients.c.first_sent_at > first), first),
+                else_=_recipients.c.first_sent_at,
+            ),
+            last_sent_at=case(
+                (_recipients.c.last_sent_at.is_(None) | (_recipients.c.last_sent_at < last), last),
+                else_=_recipients.c.last_sent_at,
+            ),
+        ),
+        rows,
+    )
+
+
+def record_sends(db: Session, emails: Iterable[tuple[int, str, datetime]]) -> None:
+    """
+    Link new emails, given as (id, to, sent_at), to their recipients and count
+    the sends. Does not commit; call it before the caller's commit.
+    """
+    parsed = {email_id: (parse_recipients(to), sent_at) for email_id, to, sent_at in emails}
+    ids = _recipient_ids(db, (p for addrs, _ in parsed.values() for p in addrs))
+    if not ids:
+        return
+
+    links = []
+    sends: dict[int, list[datetime]] = {}
+    names: dict[int, str] = {}
+    for email_id, (addrs, sent_at) in parsed.items():
+        for p in addrs:
+            rid = ids[p.address]
+            links.append({"email_id": email_id, "recipient_id": rid})
+            sends.setdefault(rid, []).append(_utc(sent_at))
+            if p.name:
+                names[rid] = p.name
+
+    db.execute(insert(EmailRecipient), links)
+    _count_sends(db, sends)
+    if names:
+        db.execute(
+            _recipients.update().where(_recipients.c.id == bindparam("rid")).values(name=bindparam("new_name")),
+            [{"rid": rid, "new_name": name} for rid, name in names.items()],
+        )
+
+
+def _recipients_of(db: Session, email_ids: list[int]) -> dict[int, list[int]]:
+    links: dict[int, list[int]] = {}
+    for email_id, rid in db.execute(
+        select(EmailRecipient.email_id, EmailRecipient.recipient_id).where(EmailRecipient.email_id.in_(email_ids))
+    ):
+        links.setdefault(email_id, []).append(rid)
+    return links
+
+
+def record_resend(db: Session, email_id: int, sent_at: datetime) -> None:
+    """Count a resend of an already linked email. Does not commit."""
+    rids = _recipients_of(db, [email_id]).get(email_id, [])
+    _count_sends(db, {rid: [_utc(sent_at)] for rid in rids})
+
+
+def record_replies(db: Session, changes: list[ReplyChange]) -> None:
+    """Apply responded flips to replied_count, response time totals and last_replied_at. Does not commit."""
+    if not changes:
+        return
+    links = _recipients_of(db, [c.email_id for c in changes])
+
+    totals: dict[int, dict] = {}
+    for c in changes:
+        seconds = 0
+        if c.responded_at is not None:
+            seconds = max(0, int((_utc(c.responded_at) - _utc(c.sent_at)).total_seconds()))
+        for rid in links.get(c.email_id, []):
+            t = totals.setdefault(rid, {"rid": rid, "n": 0, "seconds": 0, "replied_at": None})
+            t["n"] += c.delta
+            t["seconds"] += c.delta * seconds
+            if c.delta > 0 and c.responded_at is not None:
+                replied_at = _utc(c.responded_at)
+                t["replied_at"] = max(t["replied_at"] or replied_at, replied_at)
+    if not totals:
+        return
+
+    replied_at = bindparam("replied_at", type_=DateTime(timezone=True))
+    db.execute(
+        _recipients.update()
+        .where(_recipients.c.id == bindparam("rid"))
+        .values(
+            replied_count=_recipients.c.replied_count + bindparam("n"),
+            response_seconds_total=_recipients.c.response_seconds_total + bindparam("seconds"),
+            last_replied_at=case(
+                (
+                    replied_at.is_not(None)
+                    & (_recipients.c.last_replied_at.is_(None) | (_recipients.c.last_replied_at < replied_at)),
+                    replied_at,
+                ),
+                else_=_recipients.c.last_replied_at,
+            ),
+        ),
+        list(totals.values()),
+    )
+
+
+def unlink_emails(db: Session, email_ids) -> None:
+    """Drop recipient links of deleted emails (ids or a select of ids). Counters are kept."""
+    db.execute(delete(EmailRecipient).where(EmailRecipient.email_id.in_(email_ids)))
+
+
+def search_recipients(db: Session, q: str | None, limit: int) -> list[Recipient]:
+    """
+    Autocomplete: recipients whose address or domain starts with q, most
+    contacted first. Prefix matches are range scans on the unique and
+    domain indexes.
+    """
+    stmt = select(Recipient)
+    prefix = (q or "").strip().lower()
+    if prefix:
+        # U+FFFF sorts after any character an address can contain
+        upper = prefix + "\uffff"
+        stmt = stmt.where(
+            ((Recipient.address >= prefix) & (Recipient.address < upper))
+            | ((Recipient.domain >= prefix) & (Recipient.domain < upper))
+        )
+    return list(db.scalars(stmt.order_by(Recipient.sent_count.desc(), Recipient.address).limit(limit)))
+
+
+def get_recipient(db: Session, address: str) -> Recipient | None:
+    return db.scalars(select(Recipient).where(Recipient.address == address.strip().lower())).first()
+
+
+def recipient_emails(db: Session, recipient_id: int, limit: int) -> list[dict]:
+    """Emails sent to a recipient, newest first, including archived ones."""
+    ids = select(EmailRecipient.email_id).where(EmailRecipient.recipient_id == recipient_id)
+    columns = ("id", "subject", "sent_at", "send_count", "responded", "responded_at")
+    live = select(*(getattr(Email, c) for c in columns), literal(False).label("archived")).where(Email.id.in_(ids))
+    archived = select(*(getattr(ArchivedEmail, c) for c in columns), literal(True).label("archived")).where(
+        ArchivedEmail.id.in_(ids)
+    )
+    rows = union_all(live, archived).subquery()
+    return [dict(r._mapping) for r in db.execute(select(rows).order_by(rows.c.id.desc()).limit(limit))]
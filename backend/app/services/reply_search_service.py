@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import logging
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from sqlalchemy.orm import Session
+
+from app.gmail.reply_detector import get_my_email
+from app.gmail.reply_search import build_reply_queries, fetch_message_dates, search_messages
+from app.services.account_service import get_account_service
+from app.services.recipient_service import parse_recipients
+
+logger = logging.getLogger(__name__)
+
+# Emails sent within the same window share their searches, with the window's
+# earliest send as the after: date.
+SEARCH_WINDOW_DAYS = 7
+
+
+@dataclass(frozen=True)
+class SearchOutcome:
+    status: str
+    replied_at: datetime | None = None
+    detail: str | None = None
+
+
+def _utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def _search_account(service, emails: Sequence) -> dict[int, datetime]:
+    """email id -> newest reply time, for one mailbox's emails."""
+    window_seconds = SEARCH_WINDOW_DAYS * 86400
+    windows: dict[int, list] = {}
+    for e in emails:
+        windows.setdefault(int(_utc(e.sent_at).timestamp()) // window_seconds, []).append(e)
+
+    # thread id -> candidate reply message ids (newest match of each search)
+    candidates: dict[str, list[str]] = {}
+    for window in windows.values():
+        thread_ids = {e.gmail_thread_id for e in window}
+        addresses = [p.address for e in window for p in parse_recipients(e.to)]
+        after = min(_utc(e.sent_at) for e in window)
+        for query in build_reply_queries(addresses, after):
+            seen: set[str] = set()
+            # Results are newest first: the first hit per thread is enough
+            for m in search_messages(service, query):
+                if m.thread_id in thread_ids and m.thread_id not in seen:
+                    seen.add(m.thread_id)
+                    candidates.setdefault(m.thread_id, []).append(m.id)
+
+    if not candidates:
+        return {}
+    dates = fetch_message_dates(service, [i for ids in candidates.values() for i in ids])
+    newest = {
+        thread_id: max(dates[i] for i in ids if i in dates)
+        for thread_id, ids in candidates.items()
+        if any(i in dates for i in ids)
+    }
+
+    replied: dict[int, datetime] = {}
+    for e in emails:
+        received_at = newest.get(e.gmail_thread_id)
+        if received_at is not None and received_at > _utc(e.sent_at):
+            replied[e.id] = received_at
+    return replied
+
+
+def detect_replies_by_search(db: Session, emails: Sequence) -> dict[int, SearchOutcome]:
+    """
+    Reply check for many unanswered emails at once. Instead of one threads.get
+    per email, each mailbox runs a few messages.list searches
+    ("from:(a OR b) after:<date>") per sent-date window and maps the returned
+    threadIds back to the emails. emails are rows with id, to, sent_at,
+    gmail_thread_id and account_id. Does not touch the database rows.
+    """
+    by_account: dict[int | None, list] = {}
+    for e in emails:
+        by_account.setdefault(e.account_id, []).append(e)
+
+    outcomes: dict[int, SearchOutcome] = {}
+    for account_id, account_emails in by_account.items():
+        service = get_account_service(db, account_id)
+        if service is None:
+            outcomes.update({e.id: SearchOutcome("not_authenticated") for e in account_emails})
+            continue
+        try:
+            my_email = get_my_email(service)
+            # Mail we sent to ourselves would otherwise match from:me
+            searchable = [e for e in account_emails if my_email not in {p.address for p in parse_recipients(e.to)}]
+            replied = _search_account(service, searchable)
+        except Exception as exc:
+            logger.exception("reply search failed for account %s", account_id)
+            outcomes.update({e.id: SearchOutcome("error", detail=str(exc)) for e in account_emails})
+            continue
+
+        for e in account_emails:
+            replied_at = replied.get(e.id)
+            outcomes[e.id] = SearchOutcome("replied", replied_at) if replied_at else SearchOutcome("not_replied")
+    return outcomes
@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import orjson
+from sqlalchemy import and_, delete, insert, or_, select, text
+from sqlalchemy.orm import Session, selectinload
+
+from app.core.config import get_settings
+from app.db.session import SessionLocal
+from app.models.archived_email import ArchivedEmail
+from app.models.email import Email
+from app.models.email_attachment import EmailAttachment
+from app.models.email_body import EmailBody
+from app.services.email_service import publish_email_events
+from app.services.upload_service import expire_upload_sessions, live_upload_paths
+
+logger = logging.getLogger(__name__)
+
+# Uploads are written before their email row exists; leave recent files alone.
+ORPHAN_GRACE = timedelta(hours=1)
+
+
+def _archive_filter(now: datetime):
+    """Emails due for archival under the configured policy, or None if both rules are off."""
+    settings = get_settings()
+    rules = []
+    if settings.retention_days > 0:
+        rules.append(Email.sent_at < now - timedelta(days=settings.retention_days))
+    if settings.retention_responded_days > 0:
+        rules.append(
+            and_(
+                Email.responded.is_(True),
+                Email.sent_at < now - timedelta(days=settings.retention_responded_days),
+            )
+        )
+    return or_(*rules) if rules else None
+
+
+def _archive_row(email: Email, archived_at: datetime) -> dict:
+    body = email.body
+    attachments = [
+        {
+            "filename": a.filename,
+            "mime_type": a.mime_type,
+            "size_bytes": a.size_bytes,
+            "storage_path": a.storage_path,
+            "disposition": a.disposition,
+            "content_id": a.content_id,
+        }
+        for a in email.attachments
+    ]
+    return {
+        "id": email.id,
+        "gmail_message_id": email.gmail_message_id,
+        "gmail_thread_id": email.gmail_thread_id,
+        "account_id": email.account_id,
+        "to": email.to,
+        "subject": email.subject,
+        "sent_at": email.sent_at,
+        "send_count": email.send_count,
+        "responded": email.responded,
+        "responded_at": email.responded_at,
+        "responded_source": email.responded_source,
+        "template_id": email.template_id,
+        "template_version": email.template_version,
+        "template_values": email.template_values,
+        # Copied still compressed
+        "body_encoding": body.encoding if body is not None else None,
+        "body_text_data": body.text_data if body is not None else None,
+        "body_html_data": body.html_data if body is not None else None,
+        "attachments": orjson.dumps(attachments).decode("utf-8") if attachments else None,
+        "archived_at": archived_at,
+    }
+
+
+def _ensure_year_partitions(db: Session, years: set[int]) -> None:
+    """Create the yearly archived_emails partitions a batch needs (Postgres only)."""
+    for year in sorted(years):
+        db.execute(
+            text(
+                f"CREATE TABLE IF NOT EXISTS archived_emails_y{year} PARTITION OF archived_emails "
+                f"FOR VALUES FROM ('{year}-01-01') TO ('{year + 1}-01-01')"
+            )
+        )
+
+
+def archive_batch(db: Session, now: datetime, batch_size: int) -> int:
+    """
+    Move one batch of emails due for archival into archived_emails, in a
+    single transaction. Returns the number of emails moved.
+    """
+    due = _archive_filter(now)
+    if due is None:
+        return 0
+
+    ids = list(db.scalars(select(Email.id).where(due).order_by(Email.id).limit(batch_size)))
+    if not ids:
+        return 0
+
+    emails = list(
+        db.scalars(
+            select(Email)
+            .where(Email.id.in_(ids))
+            .options(selectinload(Email.body), selectinload(Email.attachments))
+            .execution_options(populate_existing=True)
+        )
+    )
+    rows = [_archive_row(e, now) for e in emails]
+
+    if db.get_bind().dialect.name == "postgresql":
+        _ensure_year_partitions(db, {r["sent_at"].year for r in rows})
+
+    db.execute(insert(ArchivedEmail), rows)
+    db.execute(delete(EmailAttachment).where(EmailAttachment.email_id.in_(ids)))
+    db.execute(delete(EmailBody).where(EmailBody.email_id.in_(ids)))
+    db.execute(delete(Email).where(Email.id.in_(ids)), execution_options={"synchronize_session": False})
+    db.commit()
+    db.expunge_all()
+    publish_email_events(db, "archived", ids)
+    return len(rows)
+
+
+def _referenced_uploads(db: Session) -> set[Path]:
+    paths = set(db.scalars(select(EmailAttachment.storage_path).distinct()))
+    paths.update(live_upload_paths(db))
+    for raw in db.scalars(select(ArchivedEmail.attachments).where(ArchivedEmail.attachments.is_not(None))):
+        paths.update(a.get("storage_path") for a in orjson.loads(raw))
+    return {Path(p).resolve() for p in paths if p and p != "pending"}
+
+
+def prune_orphan_uploads(db: Session, upload_dir: Path, now: datetime) -> tuple[int, int]:
+    """
+    Delete files in upload_dir that no email or archived email references.
+    Returns (files deleted, bytes freed).
+    """
+    if not upload_dir.is_dir():
+        return 0, 0
+
+    referenced = _referenced_uploads(db)
+    cutoff = (now - ORPHAN_GRACE).timestamp()
+    deleted = freed = 0
+    for path in upload_dir.iterdir():
+        if not path.is_file() or path.resolve() in referenced:
+            continue
+        stat = path.stat()
+        if stat.st_mtime > cutoff:
+            continue
+        path.unlink(missing_ok=True)
+        deleted += 1
+        freed += stat.st_size
+    return deleted, freed
+
+
+def run_retention(db: Session, upload_dir: Path, max_batches: int | None = None) -> dict:
+    """
+    Apply the retention policy: archive due emails batch by batch, then prune
+    orphaned uploads. With max_batches, stops early and reports remaining=True.
+    """
+    now = datetime.now(timezone.utc)
+    batch_size = get_settings().retention_batch_size
+
+    archived = batches = 0
+    remaining = False
+    while True:
+        if max_batches is not None and batches >= max_batches:
+            remaining = True
+            break
+        moved = archive_batch(db, now, batch_size)
+        if moved == 0:
+            break
+        archived += moved
+        batches += 1
+        if moved < batch_size:
+            break
+
+    files_deleted = bytes_freed = 0
+    if not remaining:
+        expire_upload_sessions(db, now)
+        files_deleted, bytes_freed = prune_orphan_uploads(db, upload_dir, now)
+    return {
+        "archived": archived,
+        "batches": batches,
+        "remaining": remaining,
+        "files_deleted": files_deleted,
+        "bytes_freed": bytes_freed,
+    }
+
+
+def start_retention_loop(upload_dir: Path, interval_hours: float) -> threading.Event:
+    """Run the retention policy every interval_hours in a daemon thread; set the event to stop."""
+    stop = threading.Event()
+
+    def loop() -> None:
+        while not stop.is_set():
+            started = time.perf_counter()
+            db = SessionLocal()
+            try:
+                result = run_retention(db, upload_dir)
+                logger.info("retention: %s in %.1fs", result, time.perf_counter() - started)
+            except Exception:
+                logger.exception("retention run failed")
+            finally:
+                db.close()
+            stop.wait(interval_hours * 3600)
+
+    threading.Thread(target=loop, name="retention", daemon=True).start()
+    return stop
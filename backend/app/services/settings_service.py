@@ -8,17 +8,26 @@ from app.models.settings import Settings
 DEFAULT_SETTINGS_ID = 1
 
 
+def _default_settings() -> Settings:
+    return Settings(
+        id=DEFAULT_SETTINGS_ID,
+        t_white_minutes=1140,
+        t_blue_minutes=4320,
+        t_yellow_minutes=7200,
+        t_red_minutes=10080,
+    )
+
+
+def get_settings_or_default(db: Session) -> Settings:
+    """Like get_or_create_settings but never writes, for read-only (replica) sessions."""
+    return db.get(Settings, DEFAULT_SETTINGS_ID) or _default_settings()
+
+
 def get_or_create_settings(db: Session) -> Settings:
     settings = db.get(Settings, DEFAULT_SETTINGS_ID)
 
     if settings is None:
-        settings = Settings(
-            id=DEFAULT_SETTINGS_ID,
-            t_white_minutes=1140,
-            t_blue_minutes=4320,
-            t_yellow_minutes=7200,
-            t_red_minutes=10080,
-        )
+        settings = _default_settings()
         db.add(settings)
         db.commit()
         db.refresh(settings)
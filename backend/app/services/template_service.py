@@ -1,14 +1,16 @@
 from __future__ import annotations
 
-import re
+from datetime import datetime, timezone
 
+import orjson
 from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
+from app.core.templating import PLACEHOLDER_RE, render_template_text
 from app.models.template import Template
 from app.models.template_placeholder import TemplatePlaceholder
-
-PLACEHOLDER_RE = re.compile(r"\{\{\s*([a-zA-Z0-9_]+)\s*\}\}")
+from app.models.template_revision import TemplateRevision
 
 
 def _title_from_key(key: str) -> str:
@@ -46,28 +48,46 @@ def parse_placeholders(*texts: str | None) -> list[dict]:
     return result
 
 
-def _sync_placeholders(db: Session, template: Template) -> None:
+def _sync_placeholders(template: Template) -> bool:
+    """
+    Reconcile template.placeholders with its current content by key: add new
+    keys, update label/order of existing ones and drop keys that disappeared.
+    Returns True if anything changed. Nothing is committed here.
+    """
     parsed = parse_placeholders(
         template.subject_template,
         template.body_text_template,
         template.body_html_template,
     )
+    existing = {p.key: p for p in template.placeholders}
+    wanted = {item["key"] for item in parsed}
+    changed = False
 
-    db.execute(
-        select(TemplatePlaceholder).where(TemplatePlaceholder.template_id == template.id)
-    )
-    # Delete existing placeholders and re-create based on current content
-    db.query(TemplatePlaceholder).filter(TemplatePlaceholder.template_id == template.id).delete()
+    for placeholder in list(template.placeholders):
+        if placeholder.key not in wanted:
+            # delete-orphan cascade deletes the row
+            template.placeholders.remove(placeholder)
+            changed = True
 
     for item in parsed:
-        db.add(
-            TemplatePlaceholder(
-                template_id=template.id,
-                key=item["key"],
-                label=item["label"],
-                order_index=item["order_index"],
+        placeholder = existing.get(item["key"])
+        if placeholder is None:
+            template.placeholders.append(
+                TemplatePlaceholder(
+                    key=item["key"],
+                    label=item["label"],
+                    order_index=item["order_index"],
+                )
             )
-        )
+            changed = True
+            continue
+
+        if placeholder.label != item["label"] or placeholder.order_index != item["order_index"]:
+            placeholder.label = item["label"]
+            placeholder.order_index = item["order_index"]
+            changed = True
+
+    return changed
 
 
 def list_templates(db: Session) -> list[Template]:
@@ -79,16 +99,18 @@ def get_template(db: Session, template_id: int) -> Template | None:
     return db.get(Template, template_id)
 
 
+def get_template_version(db: Session, template_id: int) -> int | None:
+    return db.scalar(select(Template.version).where(Template.id == template_id))
+
+
 def create_template(db: Session, data: dict) -> Template:
-    template = Template(**data)
-    db.add(template)
-    db.commit()
-    db.refresh(template)
+    template = Template(**data, version=1)
+    template.placeholders = []
+    _sync_placeholders(template)
 
-    _sync_placeholders(db, template)
+    db.add(template)
     db.commit()
     db.refresh(template)
-
     return template
 
 
@@ -100,13 +122,15 @@ def update_template(db: Session, template_id: int, data: dict) -> Template | Non
     for key, value in data.items():
         setattr(template, key, value)
 
-    db.commit()
-    db.refresh(template)
+    # Clients cache compiled templates and placeholder lists by version,
+    # so bump it only when something actually changed.
+    placeholders_changed = _sync_placeholders(template)
+    if placeholders_changed or db.is_modified(template):
+        # Incremented in SQL so concurrent edits can't hand out the same version
+        template.version = Template.version + 1
 
-    _sync_placeholders(db, template)
     db.commit()
     db.refresh(template)
-
     return template
 
 
@@ -131,3 +155,62 @@ def list_placeholders(db: Session, template_id: int) -> list[TemplatePlaceholder
         .order_by(TemplatePlaceholder.order_index.asc())
     )
     return list(db.scalars(stmt).all())
+
+
+def get_or_create_revision(db: Session, template: Template) -> TemplateRevision:
+    """Snapshot of the template's current version, created on first use."""
+    stmt = select(TemplateRevision).where(
+        TemplateRevision.template_id == template.id,
+        TemplateRevision.version == template.version,
+    )
+    revision = db.scalars(stmt).first()
+    if revision is not None:
+        return revision
+
+    revision = TemplateRevision(
+        template_id=template.id,
+        version=template.version,
+        subject_template=template.subject_template,
+        body_text_template=template.body_text_template,
+        body_html_template=template.body_html_template,
+        created_at=datetime.now(timezone.utc),
+    )
+    db.add(revision)
+    try:
+        db.commit()
+    except IntegrityError:
+        # Another send snapshotted the same version first
+        db.rollback()
+        return db.scalars(stmt).one()
+    return revision
+
+
+def render_revision(revision: TemplateRevision, field: str, values: dict[str, str]) -> str | None:
+    return render_template_text(
+        revision.template_id,
+        revision.version,
+        field,
+        getattr(revision, field),
+        values,
+    )
+
+
+def render_for_send(db: Session, template_id: int, values: dict[str, str]) -> dict | None:
+    """
+    Render the current version of a template for sending.
+    Returns the rendered subject/bodies plus the fields stored on the email
+    instead of the bodies, or None if the template does not exist.
+    """
+    template = get_template(db, template_id)
+    if template is None:
+        return None
+
+    revision = get_or_create_revision(db, template)
+    return {
+        "subject": render_revision(revision, "subject_template", values) or "",
+        "body_text": render_revision(revision, "body_text_template", values),
+        "body_html": render_revision(revision, "body_html_template", values),
+        "template_id": revision.template_id,
+        "template_version": revision.version,
+        "template_values": orjson.dumps(values).decode("utf-8"),
+    }
@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+import uuid
+from collections.abc import AsyncIterator
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from fastapi import HTTPException
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.models.upload_session import UploadSession
+
+_CONTENT_RANGE = re.compile(r"^bytes (\d+)-(\d+)/(\d+|\*)$")
+
+
+def _safe_filename(filename: str) -> str:
+    # Keep only the last path component; the name ends up in a local path
+    return Path(filename.replace("\\", "/")).name or "upload"
+
+
+def create_upload(db: Session, data: dict, upload_dir: Path) -> UploadSession:
+    max_bytes = get_settings().upload_max_bytes
+    if data["size_bytes"] > max_bytes:
+        raise HTTPException(status_code=413, detail=f"Uploads are limited to {max_bytes} bytes")
+
+    upload_id = uuid.uuid4().hex
+    filename = _safe_filename(data["filename"])
+    upload_dir.mkdir(parents=True, exist_ok=True)
+    path = upload_dir / f"{upload_id}_{filename}"
+    path.touch()
+
+    upload = UploadSession(
+        id=upload_id,
+        filename=filename,
+        mime_type=data["mime_type"],
+        size_bytes=data["size_bytes"],
+        received_bytes=0,
+        sha256=(data.get("sha256") or "").lower() or None,
+        storage_path=str(path),
+        created_at=datetime.now(timezone.utc),
+    )
+    db.add(upload)
+    db.commit()
+    db.refresh(upload)
+    return upload
+
+
+def get_upload(db: Session, upload_id: str) -> UploadSession | None:
+    return db.get(UploadSession, upload_id)
+
+
+def get_open_upload(db: Session, upload_id: str) -> UploadSession:
+    upload = db.get(UploadSession, upload_id)
+    if upload is None:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    if upload.completed_at is not None:
+        raise HTTPException(status_code=409, detail="Upload is already complete")
+    return upload
+
+
+def parse_content_range(value: str, size_bytes: int) -> tuple[int, int]:
+    """(start, end exclusive) from "bytes <first>-<last>/<total>"."""
+    match = _CONTENT_RANGE.match(value.strip())
+    if match is None:
+        raise HTTPException(status_code=400, detail="Content-Range must look like 'bytes 0-1048575/5242880'")
+    first, last, total = int(match.group(1)), int(match.group(2)), match.group(3)
+    if last < first or last >= size_bytes or (total != "*" and int(total) != size_bytes):
+        raise HTTPException(status_code=416, detail=f"Range does not fit an upload of {size_bytes} bytes")
+    return first, last + 1
+
+
+def offset_conflict(upload: UploadSession) -> HTTPException:
+    return HTTPException(
+        status_code=409,
+        detail=f"Upload continues at byte {upload.received_bytes}",
+        headers={"Upload-Offset": str(upload.received_bytes)},
+    )
+
+
+async def receive_range(
+    path: Path,
+    start: int,
+    end: int,
+    chunks: AsyncIterator[bytes],
+    expected_sha256: str | None = None,
+) -> tuple[Path, str]:
+    """
+    Stream a request body for [start, end) into a part file of its own next to
+    path; the upload file itself is only touched by record_range. Returns the
+    part file and the sha256 of its bytes. If the body is short, too long or
+    does not match expected_sha256, the part file is dropped and the range has
+    to be sent again.
+    """
+    length = end - start
+    digest = hashlib.sha256()
+    written = 0
+    fd, name = tempfile.mkstemp(dir=path.parent, prefix=f"{path.name}.{start}.", suffix=".part")
+    part = Path(name)
+    # Chunks land in the page cache, so plain writes do not hold up the loop
+    # for long; the request body, which can be slow, is awaited.
+    try:
+        with os.fdopen(fd, "wb") as f:
+            async for chunk in chunks:
+                written += len(chunk)
+                if written > length:
+                    raise HTTPException(status_code=400, detail=f"Body is longer than the {length} byte range")
+                f.write(chunk)
+                digest.update(chunk)
+        if written != length:
+            raise HTTPException(status_code=400, detail=f"Body has {written} of the {length} byte range")
+        if expected_sha256 and digest.hexdigest() != expected_sha256.lower():
+            raise HTTPException(status_code=400, detail="Chunk does not match X-Chunk-SHA256")
+    except BaseException:
+        part.unlink(missing_ok=True)
+        raise
+    return part, digest.hexdigest()
+
+
+def _splice(part: Path, path: Path, start: int, end: int) -> None:
+    with part.open("rb") as src, path.open("r+b") as dest:
+        dest.seek(start)
+        shutil.copyfileobj(src, dest, 1024 * 1024)
+        # Drop anything past the range left by a splice whose transaction rolled back
+        dest.truncate(end)
+
+
+def record_range(db: Session, upload_id: str, start: int, end: int, part: Path, sha256: str) -> UploadSession:
+    """
+    Splice a received part file in at start and move received_bytes from start
+    to end, in one transaction. The conditional UPDATE runs first and holds the
+    row (SQLite: the database) locked until the commit, so only the writer that
+    moved received_bytes writes the range; a concurrent or stale writer for the
+    same start gets a 409 and leaves the file alone.
+    """
+    try:
+        moved = db.execute(
+            update(UploadSession)
+            .where(UploadSession.id == upload_id, UploadSession.received_bytes == start)
+            .values(received_bytes=end, range_digests=UploadSession.range_digests + f"{end}:{sha256}\n")
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if moved:
+            storage_path = db.scalar(select(UploadSession.storage_path).where(UploadSession.id == upload_id))
+            _splice(part, Path(storage_path), start, end)
+        db.commit()
+    except BaseException:
+        db.rollback()
+        raise
+    finally:
+        part.unlink(missing_ok=True)
+    upload = db.get(UploadSession, upload_id)
+    db.refresh(upload)
+    if not moved:
+        raise offset_conflict(upload)
+    return upload
+
+
+def _check_ranges(path: Path, range_digests: str) -> tuple[str, int | None]:
+    """sha256 of the file, and the start of the first range that differs from its recorded digest."""
+    whole = hashlib.sha256()
+    start = 0
+    with path.open("rb") as f:
+        for line in range_digests.splitlines():
+            end, expected = line.split(":")
+            end = int(end)
+            digest = hashlib.sha256()
+            remaining = end - start
+            while remaining:
+                block = f.read(min(remaining, 1024 * 1024))
+                if not block:
+                    break
+                digest.update(block)
+                whole.update(block)
+                remaining -= len(block)
+            if remaining or digest.hexdigest() != expected:
+                return whole.hexdigest(), start
+            start = end
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            whole.update(block)
+    return whole.hexdigest(), None
+
+
+def complete_upload(db: Session, upload: UploadSession) -> UploadSession:
+    """Check the whole file against its size and sha256 and make it usable by sends."""
+    if upload.received_bytes != upload.size_bytes:
+        raise offset_conflict(upload)
+
+    path = Path(upload.storage_path)
+    actual, changed_at = _check_ranges(path, upload.range_digests)
+    if changed_at is None and upload.sha256 and actual != upload.sha256:
+        # The client's bytes arrived as sent, but are not the file it described
+        changed_at = 0
+    if changed_at is not None:
+        # Cut back to the first range that no longer matches; the client resends from there
+        with path.open("r+b") as f:
+            f.truncate(changed_at)
+        upload.received_bytes = changed_at
+        upload.range_digests = "".join(
+            line + "\n" for line in upload.range_digests.splitlines() if int(line.split(":")[0]) <= changed_at
+        )
+        db.commit()
+        raise HTTPException(
+            status_code=422,
+            detail=f"Upload does not match its checksums from byte {changed_at}; send it again from there",
+            headers={"Upload-Offset": str(changed_at)},
+        )
+
+    upload.sha256 = actual
+    upload.completed_at = datetime.now(timezone.utc)
+    db.commit()
+    db.refresh(upload)
+    return upload
+
+
+def delete_upload(db: Session, upload: UploadSession) -> None:
+    # A completed blob may already be attached to sent emails; the retention
+    # run removes its file once nothing references it.
+    if upload.completed_at is None:
+        Path(upload.storage_path).unlink(missing_ok=True)
+    db.delete(upload)
+    db.commit()
+
+
+def resolve_uploads(db: Session, refs: list[dict]) -> list[dict]:
+    """Attachment dicts, as create_email and the Gmail sender take them, for upload references."""
+    if not refs:
+        return []
+    ids = {r["upload_id"] for r in refs}
+    uploads = {u.id: u for u in db.scalars(select(UploadSession).where(UploadSession.id.in_(ids)))}
+
+    attachments = []
+    for ref in refs:
+        upload = uploads.get(ref["upload_id"])
+        if upload is None:
+            raise HTTPException(status_code=400, detail=f"Unknown upload: {ref['upload_id']}")
+        if upload.completed_at is None:
+            raise HTTPException(status_code=409, detail=f"Upload {upload.id} is not complete")
+        disposition = ref.get("disposition") or "attachment"
+        if disposition == "inline" and not ref.get("content_id"):
+            raise HTTPException(status_code=400, detail=f"Missing content_id for inline upload: {upload.id}")
+        attachments.append(
+            {
+                "filename": upload.filename,
+                "mime_type": upload.mime_type,
+                "size_bytes": upload.size_bytes,
+                "storage_path": upload.storage_path,
+                "disposition": disposition,
+                "content_id": ref.get("content_id") if disposition == "inline" else None,
+            }
+        )
+    return attachments
+
+
+def expire_upload_sessions(db: Session, now: datetime) -> int:
+    """
+    Drop sessions older than UPLOAD_SESSION_TTL_HOURS. Files of unfinished ones
+    are deleted here; completed files are left to the orphaned-upload prune.
+    """
+    cutoff = now - timedelta(hours=get_settings().upload_session_ttl_hours)
+    expired = db.execute(
+        select(UploadSession.id, UploadSession.storage_path, UploadSession.completed_at).where(
+            UploadSession.created_at < cutoff
+        )
+    ).all()
+    if not expired:
+        return 0
+    for _, storage_path, completed_at in expired:
+        if completed_at is None:
+            Path(storage_path).unlink(missing_ok=True)
+    db.execute(
+        delete(UploadSession).where(UploadSession.id.in_([row.id for row in expired])),
+        execution_options={"synchronize_session": False},
+    )
+    db.commit()
+    return len(expired)
+
+
+def live_upload_paths(db: Session) -> set[str]:
+    """Files of sessions that still exist, so the orphan prune leaves them alone."""
+    return set(db.scalars(select(UploadSession.storage_path)))
@@ -0,0 +1,632 @@
+"""
+Local fake of the Gmail API endpoints the backend uses.
+
+Implements messages.send/list/get (list with from:/after:/before: searches),
+threads.get, getProfile, history.list, watch and the batch endpoint, with
+configurable latency, error rate and per-second / daily quota enforcement.
+fields= partial responses and format=minimal are honoured, and /_fake/stats
+reports the response bytes served. Point the backend at it with
+GMAIL_API_ENDPOINT.
+
+With --push-url, every fake reply also POSTs a Pub/Sub push notification
+(the users.watch format) to that URL, e.g. the backend's /api/gmail/push.
+
+Run standalone:
+    python -m bench.fake_gmail --port 8025 --latency-ms 80 --error-rate 0.01
+    python -m bench.fake_gmail --push-url "http://127.0.0.1:8000/api/gmail/push?token=dev"
+
+Test-only hooks (not part of the Gmail API):
+    POST /_fake/reply  {"thread_id": "...", "from": "someone@example.com"}
+    GET  /_fake/stats
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import itertools
+import json
+import random
+import re
+import threading
+import time
+import urllib.request
+from dataclasses import dataclass, field
+from email import message_from_bytes
+from email.parser import BytesParser
+from email.policy import default as default_policy
+from email.utils import parseaddr
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+# Same table as app.gmail.instrumentation; duplicated so the fake has no app imports.
+QUOTA_COST = {
+    "getProfile": 1,
+    "history.list": 2,
+    "messages.get": 5,
+    "messages.list": 5,
+    "messages.send": 100,
+    "threads.get": 10,
+    "watch": 100,
+}
+
+
+@dataclass
+class FakeConfig:
+    email_address: str = "me@example.com"
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    # Gmail allows 250 quota units per user per second; 0 disables the check.
+    quota_units_per_second: int = 0
+    daily_send_limit: int = 0
+    seed: int | None = None
+    # Where to POST Pub/Sub push notifications for new inbox messages
+    push_url: str | None = None
+
+
+@dataclass
+class FakeMessage:
+    id: str
+    thread_id: str
+    history_id: int
+    internal_date_ms: int
+    headers: list[dict[str, str]]
+    label_ids: list[str]
+
+
+@dataclass
+class FakeMailbox:
+    config: FakeConfig
+    messages: dict[str, FakeMessage] = field(default_factory=dict)
+    threads: dict[str, list[str]] = field(default_factory=dict)
+    sent_order: list[str] = field(default_factory=list)
+    history: list[tuple[int, str]] = field(default_factory=list)
+    calls: dict[str, int] = field(default_factory=dict)
+    response_bytes: int = 0
+    sends_today: int = 0
+    # messages.get of these ids fails with backendError (partial batch failures in tests)
+    fail_gets: set[str] = field(default_factory=set)
+
+    def __post_init__(self):
+        self.lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._history_ids = itertools.count(1000)
+        self._window_start = time.monotonic()
+        self._window_units = 0
+        self.random = random.Random(self.config.seed)
+
+    def clear(self) -> None:
+        """Empty the mailbox and its counters, so one running server can serve several tests."""
+        with self.lock:
+            self.messages.clear()
+            self.threads.clear()
+            self.sent_order.clear()
+            self.history.clear()
+            self.calls.clear()
+            self.fail_gets.clear()
+            self.response_bytes = 0
+            self.sends_today = 0
+            self._window_units = 0
+
+    # ----- bookkeeping -----
+
+    def _next_id(self) -> str:
+        return f"{next(self._ids):016x}"
+
+    def charge(self, method: str) -> str | None:
+        """Count a call against quota. Returns an error reason if it is rejected."""
+        units = QUOTA_COST.get(method, 5)
+        with self.lock:
+            self.calls[method] = self.calls.get(method, 0) + 1
+
+            if self.config.quota_units_per_second:
+                now = time.monotonic()
+                if now - self._window_start >= 1.0:
+                    self._window_start = now
+                    self._window_units = 0
+                if self._window_units + units > self.config.quota_units_per_second:
+                    return "rateLimitExceeded"
+                self._window_units += units
+
+            if method == "messages.send" and self.config.daily_send_limit:
+                if self.sends_today >= self.config.daily_send_limit:
+                    return "dailyLimitExceeded"
+                self.sends_today += 1
+
+        if self.config.error_rate and self.random.random() < self.config.error_rate:
+            return "backendError"
+        return None
+
+    def _add(self, thread_id: str | None, headers: list[dict[str, str]], label_ids: list[str]) -> FakeMessage:
+        with self.lock:
+            message_id = self._next_id()
+            thread_id = thread_id or message_id
+            msg = FakeMessage(
+                id=message_id,
+                thread_id=thread_id,
+                history_id=next(self._history_ids),
+                internal_date_ms=int(time.time() * 1000),
+                headers=headers,
+                label_ids=label_ids,
+            )
+            self.messages[message_id] = msg
+            self.threads.setdefault(thread_id, []).append(message_id)
+            self.history.append((msg.history_id, message_id))
+            if "SENT" in label_ids:
+                self.sent_order.append(message_id)
+            return msg
+
+    # ----- API operations -----
+
+    def send(self, raw: str, thread_id: str | None) -> dict:
+        padded = raw + "=" * (-len(raw) % 4)
+        parsed = BytesParser(policy=default_policy).parsebytes(
+            base64.urlsafe_b64decode(padded), headersonly=True
+        )
+        headers = [{"name": "From", "value": self.config.email_address}]
+        for name in ("To", "Subject", "Date", "Message-Id"):
+            if parsed[name]:
+                headers.append({"name": name, "value": str(parsed[name])})
+        msg = self._add(thread_id, headers, ["SENT"])
+        return {"id": msg.id, "threadId": msg.thread_id, "labelIds": msg.label_ids}
+
+    def reply(self, thread_id: str, from_addr: str) -> dict | None:
+        if thread_id not in self.threads:
+            return None
+        headers = [
+            {"name": "From", "value": from_addr},
+            {"name": "To", "value": self.config.email_address},
+            {"name": "Subject", "value": "Re: fake reply"},
+        ]
+        msg = self._add(thread_id, headers, ["INBOX", "UNREAD"])
+        if self.config.push_url:
+            threading.Thread(target=self.push_notification, args=(msg.history_id,), daemon=True).start()
+        return {"id": msg.id, "threadId": msg.thread_id}
+
+    def push_notification(self, history_id: int) -> None:
+        """POST a users.watch notification in the Pub/Sub push format to config.push_url."""
+        data = json.dumps({"emailAddress": self.config.email_address, "historyId": history_id})
+        body = {
+            "message": {
+                "data": base64.b64encode(data.encode()).decode(),
+                "messageId": str(history_id),
+                "publishTime": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            },
+            "subscription": "projects/fake/subscriptions/gmail-push",
+        }
+        request = urllib.request.Request(
+            self.config.push_url,
+            data=json.dumps(body).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        try:
+            urllib.request.urlopen(request, timeout=5).close()
+        except OSError:
+            pass
+
+    def watch(self) -> dict:
+        with self.lock:
+            history_id = self.history[-1][0] if self.history else 999
+        return {"historyId": str(history_id), "expiration": str(int((time.time() + 7 * 86400) * 1000))}
+
+    def message_resource(self, msg: FakeMessage, metadata_headers: list[str] | None) -> dict:
+        headers = msg.headers
+        if metadata_headers:
+            wanted = {h.lower() for h in metadata_headers}
+            headers = [h for h in headers if h["name"].lower() in wanted]
+        return {
+            "id": msg.id,
+            "threadId": msg.thread_id,
+            "labelIds": msg.label_ids,
+            "historyId": str(msg.history_id),
+            "internalDate": str(msg.internal_date_ms),
+            "payload": {"headers": headers},
+        }
+
+    def get_thread(self, thread_id: str, metadata_headers: list[str] | None, minimal: bool = False) -> dict | None:
+        with self.lock:
+            ids = list(self.threads.get(thread_id) or [])
+        if not ids:
+            return None
+        messages = [self.message_resource(self.messages[i], metadata_headers) for i in ids]
+        if minimal:
+            for m in messages:
+                del m["payload"]
+        return {"id": thread_id, "historyId": messages[-1]["historyId"], "messages": messages}
+
+    def list_messages(
+        self, label_ids: list[str], max_results: int, page_token: str | None, query: str | None = None
+    ) -> dict:
+        with self.lock:
+            if "SENT" in label_ids:
+                ids = list(reversed(self.sent_order))
+            else:
+                ids = sorted(self.messages, reverse=True)
+            if query:
+                matches = _search_predicate(query)
+                ids = [i for i in ids if matches(self.messages[i])]
+        start = int(page_token or 0)
+        page = ids[start : start + max_results]
+        result: dict = {
+            "messages": [{"id": i, "threadId": self.messages[i].thread_id} for i in page],
+            "resultSizeEstimate": len(ids),
+        }
+        if start + max_results < len(ids):
+            result["nextPageToken"] = str(start + max_results)
+        return result
+
+    def profile(self) -> dict:
+        with self.lock:
+            history_id = self.history[-1][0] if self.history else 1000
+            return {
+                "emailAddress": self.config.email_address,
+                "messagesTotal": len(self.messages),
+                "threadsTotal": len(self.threads),
+                "historyId": str(history_id),
+            }
+
+    def list_history(self, start_history_id: int, max_results: int, page_token: str | None = None) -> dict:
+        start = int(page_token or 0)
+        with self.lock:
+            newer = [(h, m) for h, m in self.history if h > start_history_id]
+            latest = self.history[-1][0] if self.history else start_history_id
+        page = newer[start : start + max_results]
+        records = [
+            {
+                "id": str(h),
+                "messagesAdded": [
+                    {
+                        "message": {
+                            "id": m,
+                            "threadId": self.messages[m].thread_id,
+                            "labelIds": self.messages[m].label_ids,
+                        }
+                    }
+                ],
+            }
+            for h, m in page
+        ]
+        result: dict = {"history": records, "historyId": str(latest)}
+        if start + max_results < len(newer):
+            result["nextPageToken"] = str(start + max_results)
+        return result
+
+
+def _search_date_ms(value: str) -> int:
+    # after:/before: take epoch seconds or YYYY/MM/DD (UTC here)
+    if value.isdigit():
+        return int(value) * 1000
+    return int(time.mktime(time.strptime(value, "%Y/%m/%d")) - time.timezone) * 1000
+
+
+def _search_predicate(query: str):
+    """The subset of Gmail search the backend uses: from:a, from:(a OR b), after:, before:."""
+    senders: set[str] | None = None
+    after_ms = before_ms = None
+    for grouped, single in re.findall(r"from:\(([^)]*)\)|from:(\S+)", query):
+        senders = (senders or set()) | {a.strip().lower() for a in (grouped or single).split(" OR ") if a.strip()}
+    if m := re.search(r"after:(\S+)", query):
+        after_ms = _search_date_ms(m.group(1))
+    if m := re.search(r"before:(\S+)", query):
+        before_ms = _search_date_ms(m.group(1))
+
+    def matches(msg: FakeMessage) -> bool:
+        if after_ms is not None and msg.internal_date_ms < after_ms:
+            return False
+        if before_ms is not None and msg.internal_date_ms >= before_ms:
+            return False
+        if senders is not None:
+            from_value = next((h["value"] for h in msg.headers if h["name"].lower() == "from"), "")
+            return parseaddr(from_value)[1].lower() in senders
+        return True
+
+    return matches
+
+
+def _parse_fields(spec: str) -> dict:
+    """Gmail fields= syntax ("a,b(c,d/e)") as a tree; a None leaf selects the whole value."""
+    tree: dict = {}
+    pos = 0
+
+    def parse(level: dict) -> None:
+        nonlocal pos
+        while pos < len(spec):
+            start = pos
+            while pos < len(spec) and spec[pos] not in ",()":
+                pos += 1
+            path = [p for p in spec[start:pos].strip().split("/") if p]
+            node = level
+            for name in path[:-1]:
+                if node.get(name) is None:
+                    node[name] = {}
+                node = node[name]
+            if pos < len(spec) and spec[pos] == "(":
+                pos += 1
+                child = node.setdefault(path[-1], {}) if path else node
+                parse(child)
+            elif path:
+                node[path[-1]] = None
+            if pos < len(spec) and spec[pos] == ")":
+                pos += 1
+                return
+            pos += 1
+
+    parse(tree)
+    return tree
+
+
+def _select_fields(value, tree: dict | None):
+    if tree is None:
+        return value
+    if isinstance(value, list):
+        return [_select_fields(v, tree) for v in value]
+    if isinstance(value, dict):
+        return {k: _select_fields(value[k], sub) for k, sub in tree.items() if k in value}
+    return value
+
+
+def _error_body(status: int, reason: str) -> dict:
+    return {"error": {"code": status, "message": reason, "errors": [{"reason": reason}]}}
+
+
+ERROR_STATUS = {
+    "rateLimitExceeded": HTTPStatus.TOO_MANY_REQUESTS,
+    "dailyLimitExceeded": HTTPStatus.TOO_MANY_REQUESTS,
+    "backendError": HTTPStatus.SERVICE_UNAVAILABLE,
+}
+
+
+def dispatch(mailbox: FakeMailbox, method: str, target: str, body: bytes) -> tuple[int, dict]:
+    """Route one API call. Shared by direct HTTP requests and batch parts."""
+    url = urlsplit(target)
+    query = parse_qs(url.query)
+    parts = [p for p in url.path.split("/") if p]
+
+    if parts[:3] != ["gmail", "v1", "users"] or len(parts) < 5:
+        return HTTPStatus.NOT_FOUND, _error_body(404, "notFound")
+
+    route = parts[4:]
+
+    def charged(op: str, handler) -> tuple[int, dict]:
+        reason = mailbox.charge(op)
+        if reason:
+            status = ERROR_STATUS[reason]
+            return status, _error_body(status, reason)
+        status, payload = handler()
+        if status == HTTPStatus.OK and query.get("fields"):
+            payload = _select_fields(payload, _parse_fields(query["fields"][0]))
+        return status, payload
+
+    if method == "GET" and route == ["profile"]:
+        return charged("getProfile", lambda: (HTTPStatus.OK, mailbox.profile()))
+
+    if method == "POST" and route == ["messages", "send"]:
+        payload = json.loads(body or b"{}")
+        if not payload.get("raw"):
+            return HTTPStatus.BAD_REQUEST, _error_body(400, "invalidArgument")
+        return charged(
+            "messages.send",
+            lambda: (HTTPStatus.OK, mailbox.send(payload["raw"], payload.get("threadId"))),
+        )
+
+    if method == "GET" and route == ["messages"]:
+        return charged(
+            "messages.list",
+            lambda: (
+                HTTPStatus.OK,
+                mailbox.list_messages(
+                    query.get("labelIds", []),
+                    int((query.get("maxResults") or ["100"])[0]),
+                    (query.get("pageToken") or [None])[0],
+                    (query.get("q") or [None])[0],
+                ),
+            ),
+        )
+
+    if method == "GET" and len(route) == 2 and route[0] == "messages":
+        msg = mailbox.messages.get(route[1])
+
+        def get_message():
+            if msg is None:
+                return HTTPStatus.NOT_FOUND, _error_body(404, "notFound")
+            if msg.id in mailbox.fail_gets:
+                return HTTPStatus.SERVICE_UNAVAILABLE, _error_body(503, "backendError")
+            return HTTPStatus.OK, mailbox.message_resource(msg, query.get("metadataHeaders"))
+
+        return charged("messages.get", get_message)
+
+    if method == "GET" and len(route) == 2 and route[0] == "threads":
+
+        def get_thread():
+            minimal = (query.get("format") or [""])[0] == "minimal"
+            thread = mailbox.get_thread(route[1], query.get("metadataHeaders"), minimal)
+            if thread is None:
+                return HTTPStatus.NOT_FOUND, _error_body(404, "notFound")
+            return HTTPStatus.OK, thread
+
+        return charged("threads.get", get_thread)
+
+    if method == "GET" and route == ["history"]:
+        start = int((query.get("startHistoryId") or ["0"])[0])
+        max_results = int((query.get("maxResults") or ["100"])[0])
+        page_token = (query.get("pageToken") or [None])[0]
+        return charged(
+            "history.list",
+            lambda: (HTTPStatus.OK, mailbox.list_history(start, max_results, page_token)),
+        )
+
+    if method == "POST" and route == ["watch"]:
+        return charged("watch", lambda: (HTTPStatus.OK, mailbox.watch()))
+
+    return HTTPStatus.NOT_FOUND, _error_body(404, "notFound")
+
+
+def _handle_batch(mailbox: FakeMailbox, content_type: str, body: bytes) -> tuple[str, bytes]:
+    envelope = message_from_bytes(f"Content-Type: {content_type}\r\n\r\n".encode() + body)
+    boundary = f"batch_{mailbox.random.getrandbits(64):016x}"
+    out: list[bytes] = []
+
+    for part in envelope.get_payload():
+        content_id = (part["Content-ID"] or "<x+0>").strip("<>")
+        raw = part.get_payload(decode=True) or b""
+        head, _, inner_body = raw.partition(b"\r\n\r\n")
+        if not _:
+            head, _, inner_body = raw.partition(b"\n\n")
+        request_line = head.splitlines()[0].decode()
+        method, target, _version = request_line.split(" ", 2)
+
+        status, payload = dispatch(mailbox, method, target, inner_body)
+        data = json.dumps(payload)
+        out.append(
+            (
+                f"--{boundary}\r\n"
+                "Content-Type: application/http\r\n"
+                f"Content-ID: <response-{content_id}>\r\n\r\n"
+                f"HTTP/1.1 {int(status)} {HTTPStatus(status).phrase}\r\n"
+                "Content-Type: application/json; charset=UTF-8\r\n"
+                f"Content-Length: {len(data)}\r\n\r\n"
+                f"{data}\r\n"
+            ).encode()
+        )
+
+    out.append(f"--{boundary}--\r\n".encode())
+    return f"multipart/mixed; boundary={boundary}", b"".join(out)
+
+
+def make_handler(mailbox: FakeMailbox) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):  # noqa: A002 - stdlib signature
+            pass
+
+        def _delay(self) -> None:
+            cfg = mailbox.config
+            delay = cfg.latency_ms + (mailbox.random.uniform(-cfg.jitter_ms, cfg.jitter_ms) if cfg.jitter_ms else 0)
+            if delay > 0:
+                time.sleep(delay / 1000)
+
+        def _send(self, status: int, content_type: str, data: bytes) -> None:
+            with mailbox.lock:
+                mailbox.response_bytes += len(data)
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _json(self, status: int, payload: dict) -> None:
+            self._send(status, "application/json; charset=UTF-8", json.dumps(payload).encode())
+
+        def _body(self) -> bytes:
+            length = int(self.headers.get("Content-Length") or 0)
+            return self.rfile.read(length) if length else b""
+
+        def _handle(self, method: str) -> None:
+            body = self._body()
+            path = urlsplit(self.path).path
+
+            if path == "/_fake/stats":
+                with mailbox.lock:
+                    stats = {
+                        "calls": dict(mailbox.calls),
+                        "messages": len(mailbox.messages),
+                        "response_bytes": mailbox.response_bytes,
+                    }
+                self._json(HTTPStatus.OK, stats)
+                return
+
+            if path == "/_fake/reply" and method == "POST":
+                payload = json.loads(body or b"{}")
+                result = mailbox.reply(str(payload.get("thread_id")), parseaddr(payload.get("from") or "")[1])
+                self._json(HTTPStatus.OK if result else HTTPStatus.NOT_FOUND, result or {})
+                return
+
+            self._delay()
+
+            if path.startswith("/batch") and method == "POST":
+                content_type, data = _handle_batch(mailbox, self.headers.get("Content-Type", ""), body)
+                self._send(HTTPStatus.OK, content_type, data)
+                return
+
+            status, payload = dispatch(mailbox, method, self.path, body)
+            self._json(status, payload)
+
+        def do_GET(self):
+            self._handle("GET")
+
+        def do_POST(self):
+            self._handle("POST")
+
+    return Handler
+
+
+class FakeGmailServer:
+    """Threaded fake server; usable as a context manager from benchmarks."""
+
+    def __init__(self, config: FakeConfig | None = None, host: str = "127.0.0.1", port: int = 0):
+        self.mailbox = FakeMailbox(config or FakeConfig())
+        self.httpd = ThreadingHTTPServer((host, port), make_handler(self.mailbox))
+        self.httpd.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> FakeGmailServer:
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> FakeGmailServer:
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fake Gmail API server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8025)
+    parser.add_argument("--email", default="me@example.com")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--quota-units-per-second", type=int, default=0)
+    parser.add_argument("--daily-send-limit", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--push-url", default=None, help="POST Pub/Sub push notifications here on new replies")
+    args = parser.parse_args()
+
+    config = FakeConfig(
+        email_address=args.email,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        quota_units_per_second=args.quota_units_per_second,
+        daily_send_limit=args.daily_send_limit,
+        seed=args.seed,
+        push_url=args.push_url,
+    )
+    server = FakeGmailServer(config, host=args.host, port=args.port)
+    print(f"Fake Gmail API listening on {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Request latency with metrics on and off.
+
+Runs the app (uvicorn, throwaway SQLite, bench.fake_gmail) once with
+METRICS_ENABLED=true and once with false, in separate processes since the
+setting is read at import. Off removes everything metrics adds: the ASGI
+middleware and in-flight dependency, the engine cursor listeners and the
+instrumented Gmail HttpRequest. Rounds alternate which side runs first and
+the best mean per scenario is kept, so both sides see the same machine noise.
+
+    python -m bench.metrics_overhead --rows 10000 --requests 500 --rounds 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_DIR))
+
+from bench.fake_gmail import FakeConfig, FakeGmailServer  # noqa: E402
+from bench.run_benchmarks import (  # noqa: E402
+    _free_port,
+    _json_request,
+    _request,
+    _write_fake_token,
+    seed_emails,
+)
+
+
+def run_child(args: argparse.Namespace) -> None:
+    """One measurement pass with the METRICS_ENABLED this process was started with."""
+    workdir = Path(tempfile.mkdtemp(prefix="mail-orchestrator-metrics-"))
+    token_file = workdir / "token.json"
+    _write_fake_token(token_file)
+    fake = FakeGmailServer(FakeConfig(seed=1)).start()
+
+    os.environ["DATABASE_URL"] = f"sqlite:///{workdir / 'bench.db'}"
+    os.environ["GOOGLE_OAUTH_TOKEN_FILE"] = str(token_file)
+    os.environ["GMAIL_API_ENDPOINT"] = fake.url
+    os.chdir(workdir)
+
+    import uvicorn
+
+    import app.models  # noqa: F401 - registers tables
+    from app.db.base import Base
+    from app.db.session import engine
+    from app.main import app
+
+    Base.metadata.create_all(engine)
+    seed_emails(args.rows)
+
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    base = f"http://127.0.0.1:{port}"
+    _request("GET", f"{base}/api/settings")
+
+    # Sequential requests: the per-request cost is what metrics add to
+    scenarios = {
+        "health": [lambda: _request("GET", f"{base}/api/health")] * args.requests,
+        "history": [lambda: _request("GET", f"{base}/api/emails/history?limit=50")] * args.requests,
+        "send": [
+            (lambda i=i: _json_request(
+                "POST",
+                f"{base}/api/emails/send",
+                {"to": f"m{i}@example.com", "subject": f"Metrics {i}", "body_text": "Hello"},
+            ))
+            for i in range(args.requests)
+        ],
+    }
+    results = {}
+    for name, calls in scenarios.items():
+        warmup = min(20, len(calls) // 10)
+        for call in calls[:warmup]:
+            call()
+        errors = 0
+        start = time.perf_counter()
+        for call in calls[warmup:]:
+            errors += call() >= 400
+        elapsed = time.perf_counter() - start
+        results[name] = {"mean_ms": elapsed / (len(calls) - warmup) * 1000, "errors": errors}
+    results["metrics_endpoint"] = _request("GET", f"{base}/metrics")
+
+    server.should_exit = True
+    fake.stop()
+    print(json.dumps(results))
+
+
+def _measure(enabled: bool, args: argparse.Namespace) -> dict:
+    env = dict(os.environ, METRICS_ENABLED="true" if enabled else "false")
+    command = [sys.executable, "-m", "bench.metrics_overhead", "--child"]
+    command += ["--rows", str(args.rows), "--requests", str(args.requests)]
+    out = subprocess.run(
+        command,
+        cwd=BACKEND_DIR,
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Metrics instrumentation overhead benchmark")
+    parser.add_argument("--rows", type=int, default=10_000, help="emails seeded before the run")
+    parser.add_argument("--requests", type=int, default=300, help="requests per scenario")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args)
+        return 0
+
+    best: dict[bool, dict[str, float]] = {True: {}, False: {}}
+    for round_index in range(args.rounds):
+        # Alternate which side goes first, so neither always gets the cold machine
+        for enabled in (True, False) if round_index % 2 == 0 else (False, True):
+            result = _measure(enabled, args)
+            # /metrics exists only with instrumentation on
+            expected = 200 if enabled else 404
+            if result.pop("metrics_endpoint") != expected:
+                print(f"METRICS_ENABLED={enabled} did not switch instrumentation as expected")
+                return 1
+            for name, r in result.items():
+                if r["errors"]:
+                    print(f"{name}: {r['errors']} failed requests with METRICS_ENABLED={enabled}")
+                    return 1
+                best[enabled][name] = min(best[enabled].get(name, float("inf")), r["mean_ms"])
+
+    print(f"rows={args.rows} requests={args.requests} rounds={args.rounds} (best mean per scenario)")
+    print(f"{'scenario':<10}{'on ms':>10}{'off ms':>10}{'overhead':>10}")
+    for name in best[True]:
+        on, off = best[True][name], best[False][name]
+        print(f"{name:<10}{on:>10.2f}{off:>10.2f}{(on - off) / off * 100 if off else 0.0:>9.1f}%")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
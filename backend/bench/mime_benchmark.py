@@ -0,0 +1,101 @@
+"""
+MIME build + encode throughput by worker count.
+
+Builds raw messages with gmail_sender.build_raw_message (the function the
+MIME_WORKERS process pool runs) in the calling thread, a thread pool and a
+process pool, and reports messages/s and encoded MB/s for each size.
+
+    python -m bench.mime_benchmark --messages 200 --attachment-kb 2048 --max-workers 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_DIR))
+
+from app.gmail.gmail_sender import build_raw_message  # noqa: E402
+
+
+def _messages(count: int, attachment_path: Path) -> list[dict]:
+    return [
+        {
+            "to": f"bench{i}@example.com",
+            "subject": f"Campaign {i}",
+            "body_text": "Hello\n" * 50,
+            "body_html": "<p>Hello</p>" * 50,
+            "attachments": [
+                {
+                    "filename": "report.bin",
+                    "mime_type": "application/octet-stream",
+                    "size_bytes": attachment_path.stat().st_size,
+                    "storage_path": str(attachment_path),
+                    "disposition": "attachment",
+                }
+            ],
+        }
+        for i in range(count)
+    ]
+
+
+def _build(message: dict) -> int:
+    return len(build_raw_message(**message))
+
+
+def _run(executor: Executor | None, messages: list[dict]) -> tuple[float, int]:
+    start = time.perf_counter()
+    if executor is None:
+        total = sum(_build(m) for m in messages)
+    else:
+        total = sum(executor.map(_build, messages, chunksize=max(1, len(messages) // 64)))
+    return time.perf_counter() - start, total
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="MIME build/encode scaling benchmark")
+    parser.add_argument("--messages", type=int, default=100)
+    parser.add_argument("--attachment-kb", type=int, default=1024)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="mail-orchestrator-mime-"))
+    attachment = workdir / "report.bin"
+    attachment.write_bytes(os.urandom(args.attachment_kb * 1024))
+    messages = _messages(args.messages, attachment)
+
+    worker_counts = sorted({1, 2, 4, 8, 16, args.max_workers} & set(range(1, args.max_workers + 1)))
+    spawn = multiprocessing.get_context("spawn")
+
+    print(f"messages={args.messages} attachment_kb={args.attachment_kb} cpus={os.cpu_count()}")
+    print(f"{'mode':<10}{'workers':>8}{'msg/s':>10}{'MB/s':>10}{'speedup':>10}")
+
+    elapsed, total = _run(None, messages)
+    baseline = args.messages / elapsed
+    print(f"{'inline':<10}{1:>8}{baseline:>10.1f}{total / elapsed / 1e6:>10.1f}{1.0:>10.2f}")
+
+    for mode in ("threads", "processes"):
+        for workers in worker_counts:
+            if mode == "threads":
+                executor: Executor = ThreadPoolExecutor(max_workers=workers)
+            else:
+                executor = ProcessPoolExecutor(max_workers=workers, mp_context=spawn)
+                # Start the workers before timing, as the app's long-lived pool would be.
+                list(executor.map(_build, messages[:workers]))
+            with executor:
+                elapsed, total = _run(executor, messages)
+            rate = args.messages / elapsed
+            print(f"{mode:<10}{workers:>8}{rate:>10.1f}{total / elapsed / 1e6:>10.1f}{rate / baseline:>10.2f}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""
+Replay Gmail Pub/Sub push notifications against /api/gmail/push.
+
+Payloads come from a recorded file (one push body as JSON, a JSON list, or
+NDJSON) or are synthesized from --email/--history-id. --repeat sends each
+payload that many times back to back, e.g. to check that a burst is
+coalesced into one history sync.
+
+    python -m bench.replay_push --email me@example.com --history-id 1200 --repeat 20
+    python -m bench.replay_push recorded_pushes.ndjson --token "$GMAIL_PUSH_TOKEN"
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import json
+import sys
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from pathlib import Path
+
+
+def synthesize(email_address: str, history_id: int, message_id: int = 1) -> dict:
+    data = json.dumps({"emailAddress": email_address, "historyId": history_id})
+    return {
+        "message": {
+            "data": base64.b64encode(data.encode()).decode(),
+            "messageId": str(message_id),
+            "publishTime": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        },
+        "subscription": "projects/replay/subscriptions/gmail-push",
+    }
+
+
+def load_payloads(path: Path) -> list[dict]:
+    text = path.read_text(encoding="utf-8").strip()
+    if not text:
+        return []
+    try:
+        loaded = json.loads(text)
+    except json.JSONDecodeError:
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+    return loaded if isinstance(loaded, list) else [loaded]
+
+
+def post(url: str, payload: dict) -> int:
+    request = urllib.request.Request(
+        url,
+        data=json.dumps(payload).encode(),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status
+    except urllib.error.HTTPError as exc:
+        return exc.code
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Replay Gmail push notifications")
+    parser.add_argument("file", nargs="?", type=Path, help="recorded push bodies (JSON or NDJSON)")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--token", default="", help="GMAIL_PUSH_TOKEN of the backend")
+    parser.add_argument("--email", help="synthesize a notification for this mailbox")
+    parser.add_argument("--history-id", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=1, help="send each payload this many times")
+    args = parser.parse_args()
+
+    if args.file is not None:
+        payloads = load_payloads(args.file)
+    elif args.email:
+        payloads = [synthesize(args.email, args.history_id)]
+    else:
+        parser.error("give a file or --email")
+
+    url = f"{args.base_url.rstrip('/')}/api/gmail/push?{urllib.parse.urlencode({'token': args.token})}"
+    statuses: dict[int, int] = {}
+    started = time.perf_counter()
+    for payload in payloads:
+        for _ in range(args.repeat):
+            status = post(url, payload)
+            statuses[status] = statuses.get(status, 0) + 1
+    elapsed = time.perf_counter() - started
+
+    sent = sum(statuses.values())
+    print(f"sent {sent} notifications in {elapsed * 1000:.0f} ms ({elapsed * 1000 / max(sent, 1):.1f} ms each)")
+    for status, count in sorted(statuses.items()):
+        print(f"  HTTP {status}: {count}")
+    return 0 if set(statuses) <= {200, 204} else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,328 @@
+"""
+End-to-end benchmarks against the local fake Gmail server.
+
+Starts bench.fake_gmail and the real FastAPI app (uvicorn) on a throwaway
+SQLite database, seeds it, then reports throughput and p50/p99 latency for:
+send, multipart send, history paging and reply checks (first check and
+recheck of unchanged threads, and a search-based bulk check).
+
+    python -m bench.run_benchmarks --rows 100000 --requests 500 --concurrency 8 --latency-ms 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_DIR))
+
+from bench.fake_gmail import FakeConfig, FakeGmailServer  # noqa: E402
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _write_fake_token(path: Path) -> None:
+    # Never expires, so the credentials provider never tries to refresh it.
+    path.write_text(
+        json.dumps(
+            {
+                "token": "fake-access-token",
+                "refresh_token": "fake-refresh-token",
+                "client_id": "fake.apps.googleusercontent.com",
+                "client_secret": "fake",
+                "token_uri": "http://127.0.0.1:9/token",
+                "expiry": "2999-01-01T00:00:00Z",
+            }
+        ),
+        encoding="utf-8",
+    )
+
+
+def _request(method: str, url: str, body: bytes | None = None, headers: dict | None = None) -> int:
+    req = urllib.request.Request(url, data=body, method=method, headers=headers or {})
+    try:
+        with urllib.request.urlopen(req, timeout=120) as resp:
+            resp.read()
+            return resp.status
+    except urllib.error.HTTPError as e:
+        e.read()
+        return e.code
+
+
+def _json_request(method: str, url: str, payload: dict | None = None) -> int:
+    body = json.dumps(payload).encode() if payload is not None else None
+    return _request(method, url, body, {"Content-Type": "application/json"})
+
+
+def _multipart(fields: dict[str, str], files: list[tuple[str, str, str, bytes]]) -> tuple[bytes, str]:
+    boundary = uuid.uuid4().hex
+    out: list[bytes] = []
+    for name, value in fields.items():
+        out.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+        )
+    for name, filename, mime_type, data in files:
+        out.append(
+            (
+                f"--{boundary}\r\n"
+                f'Content-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+                f"Content-Type: {mime_type}\r\n\r\n"
+            ).encode()
+            + data
+            + b"\r\n"
+        )
+    out.append(f"--{boundary}--\r\n".encode())
+    return b"".join(out), f"multipart/form-data; boundary={boundary}"
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def run_scenario(name: str, calls: list, concurrency: int) -> dict:
+    latencies: list[float] = []
+    errors = 0
+    lock = threading.Lock()
+
+    def timed_call(call) -> None:
+        nonlocal errors
+        start = time.perf_counter()
+        status = call()
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+            if status >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(timed_call, calls))
+    wall = time.perf_counter() - start
+
+    return {
+        "scenario": name,
+        "requests": len(calls),
+        "errors": errors,
+        "throughput_rps": round(len(calls) / wall, 1) if wall else 0.0,
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 1),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 1),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 1) if latencies else 0.0,
+    }
+
+
+def seed_emails(rows: int) -> None:
+    from sqlalchemy import insert
+
+    from app.db.session import engine
+    from app.models.email import Email
+
+    now = datetime.now(timezone.utc)
+    batch = 10_000
+    with engine.begin() as conn:
+        for start in range(0, rows, batch):
+            conn.execute(
+                insert(Email),
+                [
+                    {
+                        "to": f"contact{i}@example.com",
+                        "subject": f"Seeded email {i}",
+                        "sent_at": now - timedelta(minutes=i),
+                        "send_count": 1,
+                        "responded": i % 3 == 0,
+                    }
+                    for i in range(start, min(rows, start + batch))
+                ],
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Mail Orchestrator end-to-end benchmarks")
+    parser.add_argument("--rows", type=int, default=10_000, help="emails seeded before the run")
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="fake Gmail latency per call")
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--attachment-kb", type=int, default=512)
+    parser.add_argument("--page-size", type=int, default=200)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="mail-orchestrator-bench-"))
+    token_file = workdir / "token.json"
+    _write_fake_token(token_file)
+
+    fake = FakeGmailServer(
+        FakeConfig(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate, seed=1)
+    ).start()
+
+    # Settings are read at import time, so configure the environment first.
+    os.environ["DATABASE_URL"] = f"sqlite:///{workdir / 'bench.db'}"
+    os.environ["GOOGLE_OAUTH_TOKEN_FILE"] = str(token_file)
+    os.environ["GMAIL_API_ENDPOINT"] = fake.url
+    os.chdir(workdir)
+
+    import uvicorn
+
+    import app.models  # noqa: F401 - registers tables
+    from app.db.base import Base
+    from app.db.session import engine
+    from app.main import app
+
+    Base.metadata.create_all(engine)
+    seed_emails(args.rows)
+
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+
+    base = f"http://127.0.0.1:{port}"
+    results = []
+
+    # Creates the settings row up front so concurrent first reads don't race on it.
+    _request("GET", f"{base}/api/settings")
+
+    send_calls = [
+        (lambda i=i: _json_request(
+            "POST",
+            f"{base}/api/emails/send",
+            {"to": f"bench{i}@example.com", "subject": f"Bench {i}", "body_text": "Hello", "body_html": "<p>Hello</p>"},
+        ))
+        for i in range(args.requests)
+    ]
+    results.append(run_scenario("send", send_calls, args.concurrency))
+
+    attachment = os.urandom(args.attachment_kb * 1024)
+    inline_image = os.urandom(64 * 1024)
+
+    def multipart_send(i: int) -> int:
+        body, content_type = _multipart(
+            {
+                "to": f"bench{i}@example.com",
+                "subject": f"Multipart {i}",
+                "body_text": "See attached",
+                "body_html": '<p>See attached <img src="cid:logo"></p>',
+                "inline_meta": json.dumps([{"filename": "logo.png", "content_id": "logo"}]),
+            },
+            [
+                ("inline_images", "logo.png", "image/png", inline_image),
+                ("attachments", "report.bin", "application/octet-stream", attachment),
+            ],
+        )
+        return _request("POST", f"{base}/api/emails/send-multipart", body, {"Content-Type": content_type})
+
+    results.append(
+        run_scenario(
+            "multipart_send",
+            [(lambda i=i: multipart_send(i)) for i in range(args.requests)],
+            args.concurrency,
+        )
+    )
+
+    total_rows = args.rows + 2 * args.requests
+    pages = max(1, total_rows // args.page_size)
+    history_calls = [
+        (lambda i=i: _request(
+            "GET",
+            f"{base}/api/emails/history?limit={args.page_size}&offset={(i % pages) * args.page_size}",
+        ))
+        for i in range(args.requests)
+    ]
+    results.append(run_scenario("history_page", history_calls, args.concurrency))
+
+    # Reply checks run against the emails sent above; every other thread gets a
+    # reply from its recipient.
+    from sqlalchemy import select
+
+    from app.db.session import SessionLocal
+    from app.models.email import Email
+
+    with SessionLocal() as db:
+        sent = list(
+            db.execute(
+                select(Email.id, Email.gmail_thread_id, Email.to)
+                .where(Email.gmail_thread_id.is_not(None))
+                .order_by(Email.id.asc())
+            )
+        )
+    checked, rest = sent[: args.requests], sent[args.requests :]
+    for index, (_, thread_id, to) in enumerate(checked):
+        if index % 2 == 0:
+            _json_request("POST", f"{fake.url}/_fake/reply", {"thread_id": thread_id, "from": to})
+
+    def measured(name: str, calls: list) -> dict:
+        before_bytes = fake.mailbox.response_bytes
+        before_calls = sum(fake.mailbox.calls.values())
+        result = run_scenario(name, calls, args.concurrency)
+        result["gmail_response_bytes"] = fake.mailbox.response_bytes - before_bytes
+        result["gmail_calls"] = sum(fake.mailbox.calls.values()) - before_calls
+        return result
+
+    check_calls = [
+        (lambda email_id=email_id: _request("POST", f"{base}/api/emails/{email_id}/check-reply"))
+        for email_id, _, _ in checked
+    ]
+    results.append(measured("reply_check", check_calls))
+    # Unanswered threads again, unchanged since the first check: served from the thread cache
+    recheck_calls = [c for index, c in enumerate(check_calls) if index % 2 == 1]
+    results.append(measured("reply_recheck", recheck_calls))
+
+    # The remaining sent emails, with every other one answered, in one
+    # search-based bulk check
+    for index, (_, thread_id, to) in enumerate(rest):
+        if index % 2 == 0:
+            _json_request("POST", f"{fake.url}/_fake/reply", {"thread_id": thread_id, "from": to})
+    bulk_body = json.dumps({"ids": [email_id for email_id, _, _ in rest]}).encode()
+    bulk_call = lambda: _request(  # noqa: E731
+        "POST", f"{base}/api/emails/bulk/check-replies", bulk_body, {"Content-Type": "application/json"}
+    )
+    results.append(measured("bulk_reply_check", [bulk_call]))
+
+    server.should_exit = True
+    fake.stop()
+
+    if args.json:
+        print(json.dumps({"rows": args.rows, "latency_ms": args.latency_ms, "results": results}, indent=2))
+        return
+
+    print(f"rows={args.rows} requests={args.requests} concurrency={args.concurrency} gmail_latency_ms={args.latency_ms}")
+    print(f"{'scenario':<16}{'reqs':>6}{'errors':>8}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for r in results:
+        print(
+            f"{r['scenario']:<16}{r['requests']:>6}{r['errors']:>8}{r['throughput_rps']:>10}"
+            f"{r['p50_ms']:>10}{r['p99_ms']:>10}"
+        )
+    for r in results:
+        if "gmail_response_bytes" in r:
+            print(
+                f"{r['scenario']}: {r['gmail_calls']} Gmail calls, "
+                f"{r['gmail_response_bytes'] / max(r['requests'], 1):.0f} Gmail response bytes per request"
+            )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
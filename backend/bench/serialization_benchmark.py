@@ -0,0 +1,128 @@
+"""
+Serialization time and bytes on the wire for list responses.
+
+Compares, per page, FastAPI's encoders (jsonable_encoder + json),
+response_model validation + Pydantic JSON, and the orjson FastJSONResponse
+used by the list endpoints, then the compressed size and time with gzip and
+brotli at the CompressionMiddleware settings.
+
+    python -m bench.serialization_benchmark --rows 200 --templates 50 --html-kb 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_DIR))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+
+from app.core.compression import BROTLI_QUALITY, GZIP_LEVEL, brotli  # noqa: E402
+from app.core.responses import dumps  # noqa: E402
+from app.schemas.email import EmailHistoryResponse  # noqa: E402
+from app.schemas.template import TemplateRead  # noqa: E402
+
+
+def history_page(rows: int) -> dict:
+    now = datetime.now(timezone.utc)
+    return {
+        "items": [
+            {
+                "id": i,
+                "to": f"contact{i}@example.com",
+                "subject": f"Following up on our conversation about the proposal #{i}",
+                "sent_at": now - timedelta(minutes=i * 7),
+                "send_count": 1 + i % 3,
+                "responded": i % 4 == 0,
+                "account_id": 1 + i % 2,
+                "relative_time": f"{i} hours ago",
+                "status_emoji": "🟡",
+            }
+            for i in range(rows)
+        ],
+        "limit": rows,
+        "offset": 0,
+        "total": rows * 50,
+    }
+
+
+def templates_page(count: int, html_kb: int) -> list[dict]:
+    html = ("<p>Hello {{name}}, thanks for your interest in {{company}}.</p>\n" * (html_kb * 16))[: html_kb * 1024]
+    return [
+        {
+            "id": i,
+            "version": 3,
+            "name": f"Template {i}",
+            "subject_template": "Hello {{name}}",
+            "body_text_template": "Hello {{name}}\n" * 20,
+            "body_html_template": html,
+        }
+        for i in range(count)
+    ]
+
+
+def _time_per_call(fn, repeat: int) -> tuple[float, bytes]:
+    out = fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat, out
+
+
+def bench_payload(name: str, payload, model_type, repeat: int) -> None:
+    adapter = TypeAdapter(model_type)
+    legacy = JSONResponse(content=None)
+
+    serializers = {
+        "jsonable_encoder+json": lambda: legacy.render(jsonable_encoder(payload)),
+        "response_model": lambda: adapter.dump_json(adapter.validate_python(payload)),
+        "orjson": lambda: dumps(payload),
+    }
+
+    print(f"\n{name}")
+    print(f"{'serializer':<24}{'ms/page':>10}{'bytes':>12}")
+    for label, fn in serializers.items():
+        seconds, out = _time_per_call(fn, repeat)
+        print(f"{label:<24}{seconds * 1000:>10.3f}{len(out):>12}")
+
+    body = dumps(payload)
+    encoders = {"identity": lambda: body, f"gzip-{GZIP_LEVEL}": lambda: gzip.compress(body, GZIP_LEVEL)}
+    if brotli is not None:
+        encoders[f"br-{BROTLI_QUALITY}"] = lambda: brotli.compress(body, quality=BROTLI_QUALITY)
+
+    print(f"{'encoding':<24}{'ms/page':>10}{'bytes':>12}{'ratio':>8}")
+    for label, fn in encoders.items():
+        seconds, out = _time_per_call(fn, repeat)
+        print(f"{label:<24}{seconds * 1000:>10.3f}{len(out):>12}{len(out) / len(body):>8.2f}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="List response serialization and compression benchmark")
+    parser.add_argument("--rows", type=int, default=200, help="history rows per page")
+    parser.add_argument("--templates", type=int, default=50)
+    parser.add_argument("--html-kb", type=int, default=20, help="HTML body size per template")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    bench_payload(f"history page ({args.rows} rows)", history_page(args.rows), EmailHistoryResponse, args.repeat)
+    bench_payload(
+        f"templates ({args.templates} x {args.html_kb} KB HTML)",
+        templates_page(args.templates, args.html_kb),
+        list[TemplateRead],
+        args.repeat,
+    )
+    if brotli is None:
+        print("\nbrotli not installed; pip install brotli to include it")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+"""
+History page status/relative-time computation: per row vs batched.
+
+Runs pick_status_emoji + format_relative_time once per row (how history rows
+were decorated before) against batch_status_and_relative_time on the same
+sent_at values, checks both give the same result and reports the speedup.
+
+    python -m bench.time_utils_benchmark --rows 10000 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_DIR))
+
+from app.core.time_utils import (  # noqa: E402
+    STATUS_EMOJIS,
+    batch_status_and_relative_time,
+    format_relative_time,
+    pick_status_emoji,
+    to_epoch,
+)
+
+THRESHOLDS = {
+    "t_white_minutes": 60,
+    "t_blue_minutes": 24 * 60,
+    "t_yellow_minutes": 3 * 24 * 60,
+    "t_red_minutes": 7 * 24 * 60,
+}
+
+
+def _sent_at(rows: int, now: datetime) -> list[datetime]:
+    # Spread over 30 days, as a mailbox with some history would be
+    rng = random.Random(rows)
+    return [now - timedelta(seconds=rng.randrange(30 * 86400)) for _ in range(rows)]
+
+
+def _scalar(sent_at: list[datetime], now: datetime) -> tuple[list[str], list[str]]:
+    emojis, relative_times = [], []
+    for value in sent_at:
+        elapsed = int((now - value).total_seconds() // 60)
+        emojis.append(pick_status_emoji(elapsed, THRESHOLDS))
+        relative_times.append(format_relative_time(value, now))
+    return emojis, relative_times
+
+
+def _batch(sent_at: list[datetime], now: datetime) -> tuple[list[str], list[str]]:
+    buckets, relative_times = batch_status_and_relative_time([to_epoch(v) for v in sent_at], THRESHOLDS, now)
+    return [STATUS_EMOJIS[b] for b in buckets], relative_times
+
+
+def _best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Status/relative-time scalar vs batch benchmark")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    now = datetime.now(timezone.utc)
+    print(f"{'rows':>8}{'scalar ms':>12}{'batch ms':>12}{'speedup':>10}")
+    for rows in args.rows:
+        sent_at = _sent_at(rows, now)
+        if _scalar(sent_at, now) != _batch(sent_at, now):
+            print(f"{rows:>8}  batch result differs from the per-row functions")
+            return 1
+        scalar = _best_of(lambda: _scalar(sent_at, now), args.repeat)
+        batch = _best_of(lambda: _batch(sent_at, now), args.repeat)
+        print(f"{rows:>8}{scalar * 1000:>12.1f}{batch * 1000:>12.1f}{scalar / batch:>10.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
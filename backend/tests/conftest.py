@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import base64
+import json
+import os
+import tempfile
+from email.message import EmailMessage
+from pathlib import Path
+
+import pytest
+
+from bench.fake_gmail import FakeGmailServer
+
+# Settings are read once at import time, so the environment has to point at
+# the throwaway database and the fake Gmail API before anything imports app.
+WORKDIR = Path(tempfile.mkdtemp(prefix="mail-orchestrator-tests-"))
+TOKEN_FILE = WORKDIR / "token.json"
+TOKEN_FILE.write_text(
+    json.dumps(
+        {
+            # Never expires, so the credentials provider never tries to refresh it
+            "token": "fake-access-token",
+            "refresh_token": "fake-refresh-token",
+            "client_id": "fake.apps.googleusercontent.com",
+            "client_secret": "fake",
+            "token_uri": "http://127.0.0.1:9/token",
+            "expiry": "2999-01-01T00:00:00Z",
+        }
+    ),
+    encoding="utf-8",
+)
+
+FAKE_GMAIL = FakeGmailServer().start()
+
+os.environ["DATABASE_URL"] = f"sqlite:///{WORKDIR / 'test.db'}"
+os.environ["GOOGLE_OAUTH_TOKEN_FILE"] = str(TOKEN_FILE)
+os.environ["GMAIL_API_ENDPOINT"] = FAKE_GMAIL.url
+
+
+@pytest.fixture
+def fake_gmail():
+    """The fake Gmail API with an empty mailbox."""
+    FAKE_GMAIL.mailbox.clear()
+    return FAKE_GMAIL.mailbox
+
+
+@pytest.fixture
+def db():
+    import app.models  # noqa: F401 - registers tables
+    from app.db.base import Base
+    from app.db.session import SessionLocal, engine
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def client(db, fake_gmail):
+    """The API without its lifespan (no background sync or warm-up)."""
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    return TestClient(app)
+
+
+@pytest.fixture
+def send_fake(fake_gmail):
+    """Puts a message in the fake mailbox's SENT label, as messages.send would."""
+
+    def send(to: str, subject: str = "Hello") -> dict:
+        message = EmailMessage()
+        message["To"] = to
+        message["Subject"] = subject
+        message.set_content("Hello")
+        raw = base64.urlsafe_b64encode(message.as_bytes()).decode().rstrip("=")
+        return fake_gmail.send(raw, None)
+
+    return send
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import os
+from datetime import datetime, timezone
+
+import httplib2
+import pytest
+from google.auth.exceptions import RefreshError
+from googleapiclient.errors import HttpError
+
+from app.gmail import send_limiter
+from app.gmail.send_limiter import TokenBucket, get_send_bucket
+from app.models.gmail_account import GmailAccount
+from app.services import account_service, email_service
+from app.services.account_service import reserve_send_account
+from app.services.email_service import send_with_account_pool
+
+
+@pytest.fixture(autouse=True)
+def fresh_buckets():
+    send_limiter._buckets.clear()
+    yield
+    send_limiter._buckets.clear()
+
+
+def _account(db, address: str, limit: int) -> GmailAccount:
+    account = GmailAccount(
+        email_address=address,
+        token_file=f"/nonexistent/{address}.json",
+        active=True,
+        daily_send_limit=limit,
+        sends_today=0,
+        created_at=datetime.now(timezone.utc),
+    )
+    db.add(account)
+    db.commit()
+    return account
+
+
+def _tokens_left(bucket: TokenBucket) -> int:
+    taken = 0
+    while bucket.try_acquire():
+        taken += 1
+    return taken
+
+
+def test_failed_reservation_returns_the_rate_token(db, monkeypatch):
+    busy = _account(db, "busy@example.com", limit=500)
+    spare = _account(db, "spare@example.com", limit=100)
+    full = get_send_bucket(busy.id).capacity
+
+    # busy has the most quota left but loses the reservation race every time
+    reserve = account_service._reserve_quota
+    monkeypatch.setattr(
+        account_service,
+        "_reserve_quota",
+        lambda db, account_id, today: account_id != busy.id and reserve(db, account_id, today),
+    )
+
+    for _ in range(3):
+        assert reserve_send_account(db).id == spare.id
+
+    assert _tokens_left(get_send_bucket(busy.id)) == full
+    assert _tokens_left(get_send_bucket(spare.id)) == full - 3
+
+
+def test_release_never_exceeds_capacity():
+    bucket = TokenBucket(rate=0.001, capacity=2)
+    bucket.release()
+    assert _tokens_left(bucket) == 2
+    bucket.release()
+    assert _tokens_left(bucket) == 1
+
+
+def _http_error(status: int) -> HttpError:
+    return HttpError(httplib2.Response({"status": status}), b"{}")
+
+
+@pytest.mark.parametrize(
+    ("error", "refunded"),
+    [
+        (_http_error(400), True),
+        (_http_error(403), True),
+        (RefreshError("invalid_grant"), True),
+        (_http_error(429), False),
+        (_http_error(500), False),
+        (TimeoutError("timed out"), False),
+        (ConnectionResetError("reset"), False),
+    ],
+)
+def test_failed_send_refunds_quota_only_when_gmail_refused(db, monkeypatch, error, refunded):
+    account = _account(db, "pool@example.com", limit=100)
+    account.token_file = os.environ["GOOGLE_OAUTH_TOKEN_FILE"]
+    db.commit()
+
+    def fail(service, raw):
+        raise error
+
+    monkeypatch.setattr(email_service, "send_raw_message", fail)
+    with pytest.raises(type(error)):
+        send_with_account_pool(db, to="a@example.com", subject="Hi", body_text="Hello", body_html=None)
+
+    db.refresh(account)
+    assert account.sends_today == (0 if refunded else 1)
+
+
+def test_failed_message_build_refunds_quota(db, fake_gmail, monkeypatch):
+    account = _account(db, "pool@example.com", limit=100)
+    account.token_file = os.environ["GOOGLE_OAUTH_TOKEN_FILE"]
+    db.commit()
+
+    def unreadable_attachment(**message):
+        raise PermissionError(13, "Permission denied", "/uploads/report.pdf")
+
+    monkeypatch.setattr(email_service, "prepare_raw_message", unreadable_attachment)
+    with pytest.raises(PermissionError):
+        send_with_account_pool(db, to="a@example.com", subject="Hi", body_text="Hello", body_html=None)
+
+    db.refresh(account)
+    assert account.sends_today == 0
+    assert "messages.send" not in fake_gmail.calls
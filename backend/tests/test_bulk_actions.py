@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import itertools
+import time
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import func, select
+
+from app.models.email import Email
+from app.services.email_service import _bulk_conditions
+
+_subjects = itertools.count()
+
+
+def _send(client, to: str) -> int:
+    # Distinct subjects, so the duplicate-send guard does not collapse them
+    subject = f"Hello {next(_subjects)}"
+    response = client.post("/api/emails/send", json={"to": to, "subject": subject, "body_text": "Hello"})
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        {"filter": {}},
+        {"filter": {"responded": None, "to": None, "sent_before": None, "sent_after": None}},
+        {"filter": {"to": ""}},
+        {},
+    ],
+)
+@pytest.mark.parametrize("action", ["mark-responded", "delete", "resend", "check-replies"])
+def test_rejects_selection_without_criteria(client, db, action, body):
+    ids = [_send(client, "a@example.com"), _send(client, "b@example.com")]
+
+    response = client.post(f"/api/emails/bulk/{action}", json=body)
+
+    assert response.status_code == 422
+    assert db.scalar(select(func.count()).select_from(Email).where(Email.id.in_(ids))) == 2
+    assert db.scalar(select(func.count()).select_from(Email).where(Email.responded.is_(True))) == 0
+
+
+def test_conditions_are_never_empty():
+    with pytest.raises(HTTPException) as exc:
+        _bulk_conditions(None, {"responded": None, "to": None})
+    assert exc.value.status_code == 400
+
+
+def test_filter_selects_only_matching_rows(client, db):
+    kept = _send(client, "keep@example.com")
+    dropped = [_send(client, "drop@example.com") for _ in range(3)]
+
+    response = client.post("/api/emails/bulk/delete", json={"filter": {"to": "drop@example.com"}})
+
+    assert response.status_code == 200
+    assert sorted(r["id"] for r in response.json()["results"]) == dropped
+    assert list(db.scalars(select(Email.id))) == [kept]
+
+
+def test_resend_is_queued_and_reports_per_id_results(client, db, fake_gmail):
+    ids = [_send(client, f"contact{i}@example.com") for i in range(5)]
+    sends_before = fake_gmail.calls["messages.send"]
+
+    response = client.post("/api/emails/bulk/resend", json={"ids": ids + [999999]})
+
+    assert response.status_code == 202
+    job = response.json()
+    assert job["matched"] == 5
+    assert {"id": 999999, "status": "not_found", "detail": None} in job["results"]
+
+    deadline = time.monotonic() + 10
+    while job["pending"] and time.monotonic() < deadline:
+        time.sleep(0.05)
+        job = client.get(f"/api/emails/bulk/resend/{job['job_id']}").json()
+
+    assert job["pending"] == 0
+    assert sorted(r["id"] for r in job["results"] if r["status"] == "resent") == ids
+    assert fake_gmail.calls["messages.send"] - sends_before == 5
+    db.expire_all()
+    assert set(db.scalars(select(Email.send_count).where(Email.id.in_(ids)))) == {2}
+
+
+def test_unknown_resend_job(client):
+    assert client.get("/api/emails/bulk/resend/nope").status_code == 404
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import itertools
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import bindparam, delete, update
+
+from app.api import emails as emails_api
+from app.models.email import Email
+
+_subjects = itertools.count()
+
+
+class _FrozenDatetime(datetime):
+    # The history tag also changes every minute; keep that out of the comparisons
+    @classmethod
+    def now(cls, tz=None):
+        return datetime(2026, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def frozen_minute(monkeypatch):
+    monkeypatch.setattr(emails_api, "datetime", _FrozenDatetime)
+
+
+def _send(client, to: str) -> dict:
+    response = client.post(
+        "/api/emails/send",
+        json={"to": to, "subject": f"Hello {next(_subjects)}", "body_text": "Hello"},
+    )
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+def _etag(client, url: str) -> str:
+    response = client.get(url)
+    assert response.status_code == 200, response.text
+    etag = response.headers["etag"]
+    # Unchanged content answers the tag with a 304
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+    return etag
+
+
+def _assert_changed(client, url: str, etag: str) -> str:
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    return response.headers["etag"]
+
+
+def test_history_tag_changes_on_core_reply_update(client, db, fake_gmail, frozen_minute):
+    sent = [_send(client, f"contact{i}@example.com") for i in range(3)]
+    url = "/api/emails/history"
+    etag = _etag(client, url)
+
+    # check-replies flips responded with a Core executemany on emails.__table__
+    fake_gmail.reply(db.get(Email, sent[1]["id"]).gmail_thread_id, "contact1@example.com")
+    response = client.post("/api/emails/bulk/check-replies", json={"ids": [e["id"] for e in sent]})
+    assert response.status_code == 200
+    assert [r["status"] for r in response.json()["results"]] == ["not_replied", "replied", "not_replied"]
+
+    _assert_changed(client, url, etag)
+    assert [row["responded"] for row in client.get(url).json()["items"]][::-1] == [False, True, False]
+
+
+def test_history_tag_changes_on_bulk_statements(client, db, frozen_minute):
+    ids = [_send(client, f"contact{i}@example.com")["id"] for i in range(3)]
+    url = "/api/emails/history"
+    etag = _etag(client, url)
+
+    db.execute(
+        update(Email).where(Email.id == ids[0]).values(send_count=2),
+        execution_options={"synchronize_session": False},
+    )
+    db.commit()
+    etag = _assert_changed(client, url, etag)
+
+    table = Email.__table__
+    db.execute(
+        table.update().where(table.c.id == bindparam("email_id")).values(subject="Edited"),
+        [{"email_id": ids[1]}],
+    )
+    db.commit()
+    etag = _assert_changed(client, url, etag)
+
+    _send(client, "new@example.com")
+    etag = _assert_changed(client, url, etag)
+
+
+def test_history_tag_changes_on_deletes_of_older_rows(client, db, frozen_minute):
+    # Deleting rows other than the newest leaves max(updated_at) alone
+    ids = [_send(client, f"contact{i}@example.com")["id"] for i in range(4)]
+    url = "/api/emails/history"
+    etag = _etag(client, url)
+
+    response = client.post("/api/emails/bulk/delete", json={"ids": [ids[0]]})
+    assert response.status_code == 200
+    etag = _assert_changed(client, url, etag)
+
+    assert client.delete(f"/api/emails/{ids[1]}").status_code == 204
+    etag = _assert_changed(client, url, etag)
+
+    table = Email.__table__
+    db.execute(table.delete().where(table.c.id == ids[2]))
+    db.commit()
+    etag = _assert_changed(client, url, etag)
+
+    # A rolled back delete leaves the tag as it was
+    db.execute(delete(Email).where(Email.id == ids[3]))
+    db.rollback()
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_settings_tag_changes_with_thresholds(client):
+    url = "/api/settings"
+    current = client.get(url).json()
+    etag = _etag(client, url)
+
+    # Writing the same values keeps the tag
+    assert client.put(url, json=current).status_code == 200
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    assert client.put(url, json={**current, "t_red_minutes": current["t_red_minutes"] + 1}).status_code == 200
+    _assert_changed(client, url, etag)
+
+
+def test_template_list_tag_changes_on_every_write(client):
+    url = "/api/templates"
+    etag = _etag(client, url)
+
+    first = client.post(url, json={"name": "First", "subject_template": "Hi {{name}}"}).json()
+    second = client.post(url, json={"name": "Second", "subject_template": "Hi"}).json()
+    etag = _assert_changed(client, url, etag)
+
+    # Renames the placeholder
+    response = client.put(f"{url}/{first['id']}", json={"name": "First", "subject_template": "Hi {{first_name}}"})
+    assert response.status_code == 200
+    etag = _assert_changed(client, url, etag)
+
+    # Not the most recently written template
+    assert client.delete(f"{url}/{second['id']}").status_code == 204
+    _assert_changed(client, url, etag)
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import io
+import threading
+
+import pytest
+
+from app.gmail.image_optimizer import optimize_inline_image
+
+PIL = pytest.importorskip("PIL.Image")
+
+
+@pytest.fixture(scope="module")
+def photo() -> bytes:
+    # Noisy and wider than INLINE_IMAGE_MAX_WIDTH, so the downscaled JPEG is smaller
+    img = PIL.effect_noise((2400, 1600), 64).convert("RGB")
+    out = io.BytesIO()
+    img.save(out, "JPEG", quality=95)
+    return out.getvalue()
+
+
+def test_concurrent_writers_share_the_cache(tmp_path, photo):
+    writers = 8
+    barrier = threading.Barrier(writers)
+    results, errors = [], []
+
+    def send():
+        barrier.wait()
+        try:
+            results.append(optimize_inline_image(photo, "image/jpeg", "photo.jpg", tmp_path))
+        except Exception as exc:  # noqa: BLE001 - reported below
+            errors.append(exc)
+
+    threads = [threading.Thread(target=send) for _ in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(results) == writers
+    assert len({r.data for r in results}) == 1
+    assert results[0].mime_type == "image/jpeg"
+    assert len(results[0].data) < len(photo)
+    # One complete entry, no temp files left behind
+    assert [p.suffix for p in tmp_path.iterdir()] == [".jpg"]
+    assert optimize_inline_image(photo, "image/jpeg", "photo.jpg", tmp_path) == results[0]
+
+
+def test_cache_write_failure_still_returns_the_optimized_image(tmp_path, photo, caplog):
+    # A file where the cache directory should be: every cache read and write fails
+    cache_dir = tmp_path / "cache"
+    cache_dir.write_bytes(b"")
+
+    result = optimize_inline_image(photo, "image/jpeg", "photo.jpg", cache_dir)
+
+    assert result is not None
+    assert result.filename == "photo.jpg"
+    assert len(result.data) < len(photo)
+    assert "inline image cache write failed" in caplog.text
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+# Best of IMPORT_RUNS cold imports of app.main must stay under this. It is
+# about 680 ms on the reference machine (FastAPI, SQLAlchemy and Pydantic are
+# most of it); set IMPORT_BUDGET_MS for a slower one.
+IMPORT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "1000"))
+IMPORT_RUNS = 5
+
+# Only needed once Gmail is called or an inline image is sent; the Google
+# stack is warmed in the background on startup. The Postgres dialect has no
+# business loading while DATABASE_URL is SQLite.
+LAZY_MODULES = (
+    "googleapiclient",
+    "google_auth_oauthlib",
+    "google.oauth2",
+    "google.auth.transport",
+    "PIL",
+    "sqlalchemy.dialects.postgresql",
+    "psycopg",
+)
+
+
+def measure_imports(module: str = "app.main") -> dict[str, int]:
+    """Cumulative import time in microseconds of every module imported by `module`, from -X importtime."""
+    env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    timings: dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        timings[name.strip()] = int(cumulative)
+    return timings
+
+
+def test_lazy_modules_are_not_imported_eagerly():
+    assert os.environ["DATABASE_URL"].startswith("sqlite")
+    eager = sorted(name for name in measure_imports() if name.startswith(LAZY_MODULES))
+    assert eager == []
+
+
+def test_app_import_time_within_budget():
+    # Best of several runs: a cold import is CPU bound, so a busy machine only ever adds time
+    best_ms = min(measure_imports()["app.main"] for _ in range(IMPORT_RUNS)) / 1000
+    assert best_ms <= IMPORT_BUDGET_MS, f"app.main import took {best_ms:.0f} ms (budget {IMPORT_BUDGET_MS:.0f} ms)"
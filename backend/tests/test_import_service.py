@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import func, select
+
+from app.models.email import Email
+from app.models.enums import ImportJobStatus
+from app.services import import_service
+from app.services.import_service import get_or_create_import_job, run_import_job
+
+
+def _imported_ids(db) -> list[str]:
+    return list(db.scalars(select(Email.gmail_message_id).order_by(Email.id)))
+
+
+def _run(db, job_id: int):
+    run_import_job(job_id)
+    db.expire_all()
+    return import_service.get_import_job(db, job_id)
+
+
+def test_imports_every_sent_page(db, fake_gmail, send_fake):
+    sent = [send_fake(f"contact{i}@example.com", f"Subject {i}") for i in range(230)]
+
+    job = _run(db, get_or_create_import_job(db).id)
+
+    assert job.status == ImportJobStatus.completed.value
+    assert (job.pages_done, job.imported_count, job.skipped_count, job.failed_count) == (3, 230, 0, 0)
+    assert job.page_token is None
+    assert sorted(_imported_ids(db)) == sorted(m["id"] for m in sent)
+
+    email = db.scalars(select(Email).where(Email.gmail_message_id == sent[7]["id"])).one()
+    assert (email.to, email.subject, email.gmail_thread_id) == ("contact7@example.com", "Subject 7", sent[7]["threadId"])
+
+
+def test_resumes_from_checkpointed_page_token(db, fake_gmail, send_fake, monkeypatch):
+    sent = [send_fake(f"contact{i}@example.com") for i in range(250)]
+    fetch = import_service.fetch_sent_metadata
+    pages = []
+
+    def crash_on_second_page(service, message_ids):
+        pages.append(message_ids)
+        if len(pages) == 2:
+            raise RuntimeError("connection reset")
+        return fetch(service, message_ids)
+
+    monkeypatch.setattr(import_service, "fetch_sent_metadata", crash_on_second_page)
+    job_id = get_or_create_import_job(db).id
+    job = _run(db, job_id)
+
+    assert job.status == ImportJobStatus.failed.value
+    assert job.error == "connection reset"
+    assert (job.pages_done, job.imported_count) == (1, 100)
+    checkpoint = job.page_token
+    assert checkpoint is not None
+
+    monkeypatch.setattr(import_service, "fetch_sent_metadata", fetch)
+    lists_before = fake_gmail.calls["messages.list"]
+    # The unfinished job is picked up again rather than a new one started
+    assert get_or_create_import_job(db).id == job_id
+    job = _run(db, job_id)
+
+    assert job.status == ImportJobStatus.completed.value
+    assert (job.pages_done, job.imported_count, job.skipped_count) == (3, 250, 0)
+    # Only the two remaining pages were listed again
+    assert fake_gmail.calls["messages.list"] - lists_before == 2
+    assert sorted(_imported_ids(db)) == sorted(m["id"] for m in sent)
+
+
+def test_skips_messages_already_stored(db, fake_gmail, send_fake):
+    sent = [send_fake(f"contact{i}@example.com") for i in range(20)]
+    db.add(
+        Email(
+            gmail_message_id=sent[3]["id"],
+            gmail_thread_id=sent[3]["threadId"],
+            to="contact3@example.com",
+            subject="Sent from the app",
+            sent_at=datetime.now(timezone.utc),
+            send_count=1,
+            responded=False,
+        )
+    )
+    db.commit()
+
+    job = _run(db, get_or_create_import_job(db).id)
+
+    assert (job.imported_count, job.skipped_count) == (19, 1)
+    # Stored messages are not fetched again
+    assert fake_gmail.calls["messages.get"] == 19
+    assert db.scalar(select(func.count()).select_from(Email)) == 20
+    assert db.scalar(select(Email.subject).where(Email.gmail_message_id == sent[3]["id"])) == "Sent from the app"
+
+    # A second full run imports nothing new
+    job = _run(db, get_or_create_import_job(db).id)
+    assert (job.imported_count, job.skipped_count) == (0, 20)
+    assert db.scalar(select(func.count()).select_from(Email)) == 20
+
+
+@pytest.mark.parametrize("failing", [1, 60])
+def test_counts_failed_metadata_fetches(db, fake_gmail, send_fake, failing):
+    sent = [send_fake(f"contact{i}@example.com") for i in range(80)]
+    # Spread over both 50-message batches of the page
+    fake_gmail.fail_gets.update(m["id"] for m in sent[:failing])
+
+    job = _run(db, get_or_create_import_job(db).id)
+
+    assert job.status == ImportJobStatus.completed.value
+    assert (job.imported_count, job.failed_count) == (80 - failing, failing)
+    assert sorted(_imported_ids(db)) == sorted(m["id"] for m in sent[failing:])
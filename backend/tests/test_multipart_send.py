@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+from sqlalchemy import func, select
+
+from app.api import emails as emails_api
+from app.models.recent_send import RecentSend
+
+URL = "/api/emails/send-multipart"
+FORM = {"to": "alice@example.com", "subject": "Logo", "body_html": '<img src="cid:logo">'}
+LOGO = ("logo.gif", b"GIF89a-not-really", "image/gif")
+GOOD_META = json.dumps([{"filename": "logo.gif", "content_id": "logo"}])
+
+
+def _pending(db) -> int:
+    db.expire_all()
+    return db.scalar(select(func.count()).select_from(RecentSend).where(RecentSend.email_id.is_(None)))
+
+
+@pytest.mark.parametrize(
+    "bad_meta",
+    [
+        "{not json",
+        json.dumps([{"filename": "logo.gif"}]),
+        json.dumps([{"filename": "other.gif", "content_id": "logo"}]),
+    ],
+)
+def test_rejected_inline_meta_leaves_no_reservation(client, db, bad_meta):
+    response = client.post(URL, data={**FORM, "inline_meta": bad_meta}, files={"inline_images": LOGO})
+    assert response.status_code == 400
+    assert _pending(db) == 0
+
+    # The corrected request is the same send by fingerprint, and goes through
+    response = client.post(URL, data={**FORM, "inline_meta": GOOD_META}, files={"inline_images": LOGO})
+    assert response.status_code == 201, response.text
+
+
+def test_failed_file_write_releases_the_reservation(client, db, monkeypatch):
+    def disk_full(*args, **kwargs):
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr(emails_api, "optimize_inline_image", disk_full)
+    with pytest.raises(OSError):
+        client.post(URL, data={**FORM, "inline_meta": GOOD_META}, files={"inline_images": LOGO})
+    assert _pending(db) == 0
+
+    monkeypatch.undo()
+    response = client.post(URL, data={**FORM, "inline_meta": GOOD_META}, files={"inline_images": LOGO})
+    assert response.status_code == 201, response.text
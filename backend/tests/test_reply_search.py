@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import os
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.gmail.reply_search import MAX_QUERY_CHARS, build_reply_queries
+from app.models.gmail_account import GmailAccount
+from app.services import reply_search_service
+from app.services.reply_search_service import SEARCH_WINDOW_DAYS, detect_replies_by_search
+
+WINDOW = timedelta(days=SEARCH_WINDOW_DAYS)
+
+
+@dataclass
+class Row:
+    id: int
+    to: str
+    sent_at: datetime
+    gmail_thread_id: str
+    account_id: int | None = None
+
+
+def _window_start(windows_ago: int) -> datetime:
+    seconds = int(WINDOW.total_seconds())
+    now = int(datetime.now(timezone.utc).timestamp())
+    return datetime.fromtimestamp((now // seconds - windows_ago) * seconds, tz=timezone.utc)
+
+
+def _ms(value: datetime) -> int:
+    return int(value.timestamp() * 1000)
+
+
+@pytest.fixture
+def mailbox(db, fake_gmail, send_fake):
+    """Sends and replies in the fake mailbox, dated as the test says."""
+
+    class Mailbox:
+        def __init__(self):
+            self.rows: list[Row] = []
+
+        def send(self, to: str, sent_at: datetime, thread_id: str | None = None, account_id: int | None = None) -> Row:
+            message = send_fake(to, f"Hello {len(self.rows)}")
+            msg = fake_gmail.messages[message["id"]]
+            msg.internal_date_ms = _ms(sent_at)
+            if thread_id:
+                # Follow-up in an existing thread
+                fake_gmail.threads[thread_id].append(fake_gmail.threads.pop(msg.thread_id).pop())
+                msg.thread_id = thread_id
+            row = Row(len(self.rows) + 1, to, sent_at, msg.thread_id, account_id)
+            self.rows.append(row)
+            return row
+
+        def reply(self, row: Row, received_at: datetime, from_addr: str | None = None) -> None:
+            reply = fake_gmail.reply(row.gmail_thread_id, from_addr or row.to)
+            fake_gmail.messages[reply["id"]].internal_date_ms = _ms(received_at)
+
+    return Mailbox()
+
+
+@pytest.fixture
+def queries(monkeypatch):
+    """Every search query sent, in order."""
+    sent: list[str] = []
+    search = reply_search_service.search_messages
+
+    def record(service, query):
+        sent.append(query)
+        return search(service, query)
+
+    monkeypatch.setattr(reply_search_service, "search_messages", record)
+    return sent
+
+
+def _after(query: str) -> datetime:
+    return datetime.fromtimestamp(int(re.search(r"after:(\d+)", query).group(1)), tz=timezone.utc)
+
+
+def test_queries_split_at_max_query_chars():
+    addresses = [f"contact{i:04d}@{'long-domain-' * 3}example.com" for i in range(300)]
+    after = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+    queries = build_reply_queries(addresses + addresses[:10], after)
+
+    assert len(queries) > 1
+    assert all(len(q) <= MAX_QUERY_CHARS for q in queries)
+    # A full chunk: one more address would have crossed the limit
+    assert all(len(q) + len(" OR ") + len(addresses[0]) > MAX_QUERY_CHARS for q in queries[:-1])
+    found = [a for q in queries for a in re.fullmatch(r"from:\((.*)\) after:(\d+)", q).group(1).split(" OR ")]
+    assert found == sorted(addresses)
+    assert {_after(q) for q in queries} == {after}
+
+
+def test_split_queries_find_replies_in_every_chunk(db, mailbox, queries):
+    start = _window_start(1)
+    addresses = [f"contact{i:04d}@{'long-domain-' * 3}example.com" for i in range(120)]
+    rows = [mailbox.send(address, start + timedelta(hours=1)) for address in addresses]
+    replied = rows[0], rows[60], rows[119]
+    for row in replied:
+        mailbox.reply(row, start + timedelta(days=2))
+
+    outcomes = detect_replies_by_search(db, rows)
+
+    assert len(queries) == len(build_reply_queries(addresses, start)) > 1
+    assert {i for i, o in outcomes.items() if o.status == "replied"} == {r.id for r in replied}
+    assert outcomes[rows[60].id].replied_at == start + timedelta(days=2)
+
+
+def test_thread_hits_map_back_to_their_emails(db, mailbox):
+    start = _window_start(1)
+    first = mailbox.send("alice@example.com", start + timedelta(hours=1))
+    second = mailbox.send("alice@example.com", start + timedelta(hours=2))
+    cc = mailbox.send("bob@example.com, carol@example.com", start + timedelta(hours=3))
+    mailbox.reply(first, start + timedelta(days=1))
+    mailbox.reply(first, start + timedelta(days=3))
+    # Any recipient of a multi-recipient email counts
+    mailbox.reply(cc, start + timedelta(days=1), from_addr="carol@example.com")
+    # Same sender, but in a thread none of the checked emails belongs to
+    other = mailbox.send("dave@example.com", start)
+    mailbox.reply(other, start + timedelta(days=4), from_addr="alice@example.com")
+
+    outcomes = detect_replies_by_search(db, [first, second, cc])
+
+    assert outcomes[first.id].status == "replied"
+    # The newest reply in the thread
+    assert outcomes[first.id].replied_at == start + timedelta(days=3)
+    assert outcomes[second.id].status == "not_replied"
+    assert outcomes[cc.id].status == "replied"
+
+
+def test_reply_before_the_email_does_not_count(db, mailbox, queries):
+    start = _window_start(1)
+    first = mailbox.send("alice@example.com", start + timedelta(hours=1))
+    mailbox.reply(first, start + timedelta(days=1))
+    # A follow-up in the same thread, sent after that reply and never answered
+    follow_up = mailbox.send("alice@example.com", start + timedelta(days=2), thread_id=first.gmail_thread_id)
+    # Another thread whose only reply predates the window's after: date
+    early = mailbox.send("bob@example.com", start + timedelta(days=3))
+    mailbox.reply(early, start - timedelta(days=1))
+
+    outcomes = detect_replies_by_search(db, [first, follow_up, early])
+
+    assert [_after(q) for q in queries] == [start + timedelta(hours=1)]
+    assert outcomes[first.id].status == "replied"
+    assert outcomes[follow_up.id].status == "not_replied"
+    assert outcomes[early.id].status == "not_replied"
+
+
+def test_searches_per_account_and_window(db, mailbox, queries):
+    token_file = os.environ["GOOGLE_OAUTH_TOKEN_FILE"]
+    accounts = [
+        GmailAccount(
+            email_address=address,
+            token_file=token_file,
+            active=active,
+            daily_send_limit=100,
+            created_at=datetime.now(timezone.utc),
+        )
+        for address, active in (("second@example.com", True), ("off@example.com", False))
+    ]
+    db.add_all(accounts)
+    db.commit()
+    second, off = (a.id for a in accounts)
+
+    old, recent = _window_start(3), _window_start(1)
+    rows = [
+        mailbox.send("alice@example.com", old + timedelta(days=1)),
+        mailbox.send("bob@example.com", old + timedelta(days=2)),
+        mailbox.send("alice@example.com", recent + timedelta(hours=5)),
+        mailbox.send("alice@example.com", recent + timedelta(hours=6), account_id=second),
+        mailbox.send("alice@example.com", recent + timedelta(hours=7), account_id=off),
+    ]
+    mailbox.reply(rows[1], old + timedelta(days=3))
+    mailbox.reply(rows[3], recent + timedelta(days=1))
+
+    outcomes = detect_replies_by_search(db, rows)
+
+    # One search per (account, window), each from that window's earliest send
+    assert sorted((_after(q), "bob" in q) for q in queries) == [
+        (old + timedelta(days=1), True),
+        (recent + timedelta(hours=5), False),
+        (recent + timedelta(hours=6), False),
+    ]
+    assert [outcomes[r.id].status for r in rows] == [
+        "not_replied",
+        "replied",
+        "not_replied",
+        "replied",
+        "not_authenticated",
+    ]
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+from pathlib import Path
+
+import pytest
+from fastapi import HTTPException
+
+from app.models.upload_session import UploadSession
+from app.services.upload_service import receive_range, record_range
+
+DATA = bytes(range(1, 21))
+
+
+def _create(client, data: bytes = DATA) -> dict:
+    response = client.post("/api/uploads", json={"filename": "report.pdf", "size_bytes": len(data)})
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+def _put(client, upload_id: str, data: bytes, start: int, end: int):
+    return client.put(
+        f"/api/uploads/{upload_id}",
+        content=data[start:end],
+        headers={"Content-Range": f"bytes {start}-{end - 1}/{len(data)}"},
+    )
+
+
+async def _body(data: bytes):
+    yield data
+
+
+def _parts(path: Path) -> list[Path]:
+    return list(path.parent.glob(f"{path.name}.*.part"))
+
+
+def test_stalled_put_does_not_touch_accepted_ranges(client, db):
+    upload = _create(client)
+    path = Path(db.get(UploadSession, upload["id"]).storage_path)
+
+    async def scenario():
+        resume = asyncio.Event()
+
+        async def stalled_body():
+            # The first PUT of range 0-9 stalls half way, then its connection drops
+            yield b"\0" * 5
+            await resume.wait()
+            raise ConnectionResetError("client went away")
+
+        stale = asyncio.create_task(receive_range(path, 0, 10, stalled_body()))
+        await asyncio.sleep(0)
+
+        # The client retried: both ranges go through
+        for start, end in ((0, 10), (10, 20)):
+            part, sha256 = await receive_range(path, start, end, _body(DATA[start:end]))
+            record_range(db, upload["id"], start, end, part, sha256)
+
+        resume.set()
+        with pytest.raises(ConnectionResetError):
+            await stale
+
+        # A stale PUT that does finish loses the race for the offset instead
+        part, sha256 = await receive_range(path, 0, 10, _body(b"\0" * 10))
+        with pytest.raises(HTTPException) as exc:
+            record_range(db, upload["id"], 0, 10, part, sha256)
+        assert exc.value.status_code == 409
+
+    asyncio.run(scenario())
+
+    assert path.read_bytes() == DATA
+    assert _parts(path) == []
+    response = client.post(f"/api/uploads/{upload['id']}/complete")
+    assert response.status_code == 200, response.text
+    assert response.json()["sha256"] == hashlib.sha256(DATA).hexdigest()
+
+
+def test_complete_resends_from_the_first_changed_range(client, db):
+    upload = _create(client)
+    for start, end in ((0, 8), (8, 16), (16, 20)):
+        assert _put(client, upload["id"], DATA, start, end).status_code == 200
+
+    # No whole-file sha256 was given; the recorded range digests still catch this
+    path = Path(db.get(UploadSession, upload["id"]).storage_path)
+    with path.open("r+b") as f:
+        f.seek(12)
+        f.write(b"\xff")
+
+    response = client.post(f"/api/uploads/{upload['id']}/complete")
+    assert response.status_code == 422
+    assert response.headers["Upload-Offset"] == "8"
+    assert client.get(f"/api/uploads/{upload['id']}").json()["received_bytes"] == 8
+    assert path.read_bytes() == DATA[:8]
+
+    for start, end in ((8, 16), (16, 20)):
+        assert _put(client, upload["id"], DATA, start, end).status_code == 200
+    response = client.post(f"/api/uploads/{upload['id']}/complete")
+    assert response.status_code == 200, response.text
+    assert path.read_bytes() == DATA
+
+
+def test_rejected_range_leaves_no_part_file(client, db):
+    upload = _create(client)
+    path = Path(db.get(UploadSession, upload["id"]).storage_path)
+
+    response = client.put(
+        f"/api/uploads/{upload['id']}",
+        content=DATA[:10],
+        headers={"Content-Range": "bytes 0-9/20", "X-Chunk-SHA256": hashlib.sha256(b"other").hexdigest()},
+    )
+
+    assert response.status_code == 400
+    assert _parts(path) == []
+    assert path.read_bytes() == b""
+    assert client.get(f"/api/uploads/{upload['id']}").json()["received_bytes"] == 0
@@ -23,6 +23,64 @@ async function request(path, options = {}) {
   return res.json();
 }
 
+// Files at least this large go through resumable upload sessions
+export const CHUNKED_UPLOAD_THRESHOLD = 1024 * 1024;
+const UPLOAD_CHUNK_SIZE = 2 * 1024 * 1024;
+const UPLOAD_RETRIES = 3;
+
+async function sha256Hex(buffer) {
+  const digest = await crypto.subtle.digest("SHA-256", buffer);
+  return Array.from(new Uint8Array(digest), (b) => b.toString(16).padStart(2, "0")).join("");
+}
+
+async function putRange(id, file, start, end) {
+  const chunk = await file.slice(start, end).arrayBuffer();
+  const res = await fetch(`${API_BASE}/api/uploads/${id}`, {
+    method: "PUT",
+    headers: {
+      "Content-Range": `bytes ${start}-${end - 1}/${file.size}`,
+      "X-Chunk-SHA256": await sha256Hex(chunk),
+    },
+    body: chunk,
+  });
+  const serverOffset = res.headers.get("Upload-Offset");
+  if (res.status === 409 && serverOffset !== null) {
+    // Server is elsewhere (e.g. an earlier attempt did land): continue from there
+    return Number(serverOffset);
+  }
+  if (!res.ok) throw new Error(`${res.status} ${res.statusText}: ${await res.text()}`);
+  return (await res.json()).received_bytes;
+}
+
+// Create a session, send the file in ranges (retrying and resuming on
+// failures), then complete it. Returns the upload id for send requests.
+async function uploadFile(file, onProgress) {
+  const session = await request("/api/uploads", {
+    method: "POST",
+    body: JSON.stringify({
+      filename: file.name,
+      mime_type: file.type || "application/octet-stream",
+      size_bytes: file.size,
+      sha256: await sha256Hex(await file.arrayBuffer()),
+    }),
+  });
+
+  let offset = 0;
+  let failures = 0;
+  while (offset < file.size) {
+    try {
+      offset = await putRange(session.id, file, offset, Math.min(offset + UPLOAD_CHUNK_SIZE, file.size));
+      failures = 0;
+      onProgress?.(offset / file.size);
+    } catch (err) {
+      if (++failures > UPLOAD_RETRIES) throw err;
+      offset = (await request(`/api/uploads/${session.id}`)).received_bytes;
+    }
+  }
+  await request(`/api/uploads/${session.id}/complete`, { method: "POST" });
+  return session.id;
+}
+
 export const api = {
   templates: {
     list: () => request("/api/templates"),
@@ -72,6 +130,17 @@ export const api = {
       return res.json();
     },
     delete: (id) => request(`/api/emails/${id}`, { method: "DELETE" }),
+    // Server-sent change events for history rows (EventSource reconnects by itself)
+    stream: () => new EventSource(`${API_BASE}/api/emails/stream`),
+  },
+  uploads: {
+    upload: uploadFile,
+    remove: (id) => request(`/api/uploads/${id}`, { method: "DELETE" }),
+  },
+  recipients: {
+    search: (q, limit = 8) =>
+      request(`/api/recipients?q=${encodeURIComponent(q)}&limit=${limit}`),
+    get: (address) => request(`/api/recipients/${encodeURIComponent(address)}`),
   },
   settings: {
     get: () => request("/api/settings"),
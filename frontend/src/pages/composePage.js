@@ -1,4 +1,4 @@
-import { api } from "../lib/api";
+import { api, CHUNKED_UPLOAD_THRESHOLD } from "../lib/api";
 
 function escapeHtml(s) {
   return (s || "")
@@ -68,7 +68,8 @@ export function renderComposePage(root) {
               <div class="cols cols--2">
                 <label class="field">
                   <span class="label">To</span>
-                  <input class="input" name="to" placeholder="someone@example.com" autocomplete="off" />
+                  <input class="input" name="to" placeholder="someone@example.com" autocomplete="off" list="to-suggestions" />
+                  <datalist id="to-suggestions" data-role="to-suggestions"></datalist>
                 </label>
 
                 <label class="field">
@@ -193,8 +194,30 @@ export function renderComposePage(root) {
       '[data-action="templates-refresh"]',
     ),
     btnTemplateClear: root.querySelector('[data-action="template-clear"]'),
+    toSuggestions: root.querySelector('[data-role="to-suggestions"]'),
   };
 
+  // Recipient autocomplete from previously used addresses, most contacted first.
+  let suggestTimer = null;
+  els.form.to.addEventListener("input", () => {
+    clearTimeout(suggestTimer);
+    const q = els.form.to.value.trim();
+    if (q.length < 2) return;
+    suggestTimer = setTimeout(async () => {
+      try {
+        const recipients = await api.recipients.search(q);
+        els.toSuggestions.innerHTML = recipients
+          .map(
+            (r) =>
+              `<option value="${escapeHtml(r.address)}">${escapeHtml(r.name || "")} · sent ${r.sent_count}, replied ${r.replied_count}</option>`,
+          )
+          .join("");
+      } catch {
+        // Suggestions are optional
+      }
+    }, 150);
+  });
+
   let activeTab = "html";
 
   const state = {
@@ -526,10 +549,24 @@ export function renderComposePage(root) {
         form.append("inline_images", blob, img.filename);
       }
 
-      // Append attachment files to form for multipart encoding
+      // Large attachments are uploaded first in resumable chunks and sent by
+      // id; a retried send reuses the finished upload. Small ones go inline.
+      const uploads = [];
       for (const a of state.attachments) {
-        if (a.file) form.append("attachments", a.file, a.filename);
+        if (!a.file) continue;
+        if (a.file.size < CHUNKED_UPLOAD_THRESHOLD) {
+          form.append("attachments", a.file, a.filename);
+          continue;
+        }
+        if (!a.upload_id) {
+          a.upload_id = await api.uploads.upload(a.file, (done) =>
+            setStatus(`Uploading ${a.filename}… ${Math.round(done * 100)}%`, "muted"),
+          );
+        }
+        uploads.push({ upload_id: a.upload_id, disposition: "attachment" });
       }
+      if (uploads.length) form.append("uploads", JSON.stringify(uploads));
+      setStatus("Sending…", "muted");
 
       // Send the email with all attachments and inline images via multipart form
       await api.emails.sendMultipart(form);
@@ -201,6 +201,58 @@ export async function renderHistoryPage(root) {
     }
   }
 
+  function setCounts() {
+    offset = items.length;
+    setStatus(`${items.length} shown of ${total}`, "ok");
+    els.btnLoadMore.disabled = items.length >= total;
+    els.btnLoadMore.textContent = items.length >= total ? "No more" : "Load more";
+  }
+
+  // Live updates: changed rows are patched in place instead of reloading the page.
+  const stream = api.emails.stream();
+  let reloadTimer = null;
+
+  function isLive() {
+    return stream.readyState === EventSource.OPEN;
+  }
+
+  function scheduleReload() {
+    clearTimeout(reloadTimer);
+    reloadTimer = setTimeout(() => loadPage({ reset: true }), 300);
+  }
+
+  function applyRow(event) {
+    const row = JSON.parse(event.data);
+    const index = items.findIndex((e) => e.id === row.id);
+    if (index >= 0) {
+      items[index] = row;
+    } else if (event.type === "sent" && (!items.length || row.id > items[0].id)) {
+      items.unshift(row);
+      total += 1;
+    } else {
+      return;
+    }
+    render();
+    setCounts();
+  }
+
+  function removeRow(event) {
+    const { id } = JSON.parse(event.data);
+    const index = items.findIndex((e) => e.id === id);
+    if (index < 0) return;
+    items.splice(index, 1);
+    total = Math.max(0, total - 1);
+    render();
+    setCounts();
+  }
+
+  ["sent", "resent", "responded", "status"].forEach((type) => stream.addEventListener(type, applyRow));
+  ["deleted", "archived"].forEach((type) => stream.addEventListener(type, removeRow));
+  // Events were missed (slow connection or server restart): fall back to a reload.
+  ["resync", "imported"].forEach((type) => stream.addEventListener(type, scheduleReload));
+
+  window.addEventListener("hashchange", () => stream.close(), { once: true });
+
   async function handleCheckReply(id) {
     // Create unique operation key for this specific item action to prevent concurrent operations on the same item
     const operationKey = `check_reply_${id}`;
@@ -215,7 +267,7 @@ export async function renderHistoryPage(root) {
 
     try {
       const result = await api.emails.checkReply(id);
-      await loadPage({ reset: true });
+      if (!isLive()) await loadPage({ reset: true });
 
       if (result.responded) toast("Reply detected", "ok");
       else toast("No reply found", "muted");
@@ -242,7 +294,7 @@ export async function renderHistoryPage(root) {
 
     try {
       await api.emails.resend(id);
-      await loadPage({ reset: true });
+      if (!isLive()) await loadPage({ reset: true });
       toast("Email resent", "ok");
       setStatus("Resent", "ok");
     } catch (err) {
@@ -268,7 +320,7 @@ export async function renderHistoryPage(root) {
 
     try {
       await api.emails.markResponded(id, responded);
-      await loadPage({ reset: true });
+      if (!isLive()) await loadPage({ reset: true });
       toast(responded ? "Marked as replied" : "Marked as not replied", "ok");
       setStatus("Updated", "ok");
     } catch (err) {
@@ -296,7 +348,7 @@ export async function renderHistoryPage(root) {
 
     try {
       await api.emails.delete(id);
-      await loadPage({ reset: true });
+      if (!isLive()) await loadPage({ reset: true });
       toast("Email deleted", "ok");
       setStatus("Deleted", "ok");
     } catch (err) {